@@ -0,0 +1,237 @@
+# Shared bulk-write path for the loaders: streams Arrow/pandas batches into Postgres via COPY ... FROM STDIN
+from __future__ import annotations
+import io
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+BATCH_ROWS = 100_000
+COPY_READ_SIZE = 1 << 20
+
+INT_TYPES   = {"smallint", "integer", "bigint"}
+FLOAT_TYPES = {"real", "double precision", "numeric"}
+
+
+def _split_name(table: str) -> tuple[str, str]:
+    schema, _, name = table.rpartition(".")
+    return (schema or "public"), name
+
+
+def _quote(ident: str) -> str:
+    return '"' + ident.replace('"', '""') + '"'
+
+
+def table_columns(con, table: str) -> dict[str, str]:
+    """Ordered {column_name: data_type} of an existing table (empty if it does not exist)."""
+    schema, name = _split_name(table)
+    rows = con.execute(text("""
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema=:s AND table_name=:t
+        ORDER BY ordinal_position
+    """), {"s": schema, "t": name}).fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
+def _create_table(con, table: str, empty: pd.DataFrame, if_exists: str):
+    """Create/replace the target with the same pandas type mapping `to_sql` has always used."""
+    schema, name = _split_name(table)
+    empty.to_sql(name, con, schema=None if schema == "public" else schema,
+                 if_exists=if_exists, index=False)
+
+
+def _conform(batch: pa.RecordBatch, cols: list[str], types: dict[str, str]) -> pa.RecordBatch:
+    """Reorder to the table's column order and cast where the CSV text would not parse (e.g. 3.0 -> integer)."""
+    arrays = []
+    for c in cols:
+        arr = batch.column(c)
+        if pa.types.is_dictionary(arr.type):
+            arr = arr.dictionary_decode()
+        pg_type = types.get(c)
+        if pg_type in INT_TYPES and pa.types.is_floating(arr.type):
+            arr = pc.cast(arr, pa.int64())
+        elif pg_type in FLOAT_TYPES and pa.types.is_boolean(arr.type):
+            arr = pc.cast(arr, pa.int8())
+        arrays.append(arr)
+    return pa.RecordBatch.from_arrays(arrays, names=cols)
+
+
+class _CsvStream(io.RawIOBase):
+    """File-like reader that renders record batches to CSV lazily, so COPY never needs the whole frame in memory."""
+
+    def __init__(self, batches: Iterator[pa.RecordBatch]):
+        self._batches = batches
+        self._buf = b""
+        self._pos = 0
+        self._opts = pacsv.WriteOptions(include_header=False)
+        self.rows = 0
+
+    def readable(self):
+        return True
+
+    def _fill(self) -> bool:
+        batch = next(self._batches, None)
+        if batch is None:
+            return False
+        sink = io.BytesIO()
+        pacsv.write_csv(batch, sink, self._opts)
+        self._buf = self._buf[self._pos:] + sink.getvalue()
+        self._pos = 0
+        self.rows += batch.num_rows
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) - self._pos < size:
+            if not self._fill():
+                break
+        end = len(self._buf) if size < 0 else min(len(self._buf), self._pos + size)
+        out = self._buf[self._pos:end]
+        self._pos = end
+        return out
+
+
+def copy_batches(engine, table: str, batches: Iterable[pa.RecordBatch], empty: pd.DataFrame,
+                 if_exists: str = "append", types: dict[str, str] | None = None) -> int:
+    """
+    COPY a stream of Arrow record batches into `table` inside one transaction.
+    `empty` is a zero-row frame with the source dtypes, used to (re)create the table when needed.
+    `types` is the table's {column: data_type} if the caller already has it cached (skips the catalog query).
+    Returns rows written and prints a rows/sec report.
+    """
+    t0 = time.perf_counter()
+    with engine.begin() as con:
+        types = types if types and if_exists != "replace" else table_columns(con, table)
+        if if_exists == "replace" or not types:
+            _create_table(con, table, empty, "replace" if if_exists == "replace" else "fail")
+            types = table_columns(con, table)
+        elif if_exists == "fail":
+            raise ValueError(f"Table '{table}' already exists.")
+
+        extra = [c for c in empty.columns if c not in types]
+        if extra:
+            raise ValueError(f"{table}: columns not in table: {extra[:8]}{'...' if len(extra)>8 else ''}")
+        src = set(empty.columns)
+        cols = [c for c in types if c in src]
+
+        stream = _CsvStream(_conform(b, cols, types) for b in batches if b.num_rows)
+        schema, name = _split_name(table)
+        sql = (f"COPY {_quote(schema)}.{_quote(name)} ({', '.join(_quote(c) for c in cols)}) "
+               f"FROM STDIN WITH (FORMAT csv)")
+        cur = con.connection.cursor()
+        try:
+            cur.copy_expert(sql, stream, size=COPY_READ_SIZE)
+        finally:
+            cur.close()
+
+    secs = max(time.perf_counter() - t0, 1e-9)
+    print(f"[copy] {table}: {stream.rows:,} rows in {secs:.1f}s ({stream.rows/secs:,.0f} rows/s)")
+    return stream.rows
+
+
+def copy_df(engine, table: str, df: pd.DataFrame, if_exists: str = "append", batch_rows: int = BATCH_ROWS,
+            types: dict[str, str] | None = None) -> int:
+    tbl = pa.Table.from_pandas(df, preserve_index=False)
+    return copy_batches(engine, table, iter(tbl.to_batches(max_chunksize=batch_rows)), df.head(0), if_exists, types)
+
+
+def to_arrow(data) -> pa.Table:
+    """pandas, polars (zero-copy via its Arrow buffers) or Arrow input as a pa.Table."""
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    return data.to_arrow()
+
+
+def copy_arrow(engine, table: str, data, if_exists: str = "append", batch_rows: int = BATCH_ROWS,
+               types: dict[str, str] | None = None) -> int:
+    """COPY an Arrow/polars table without a pandas copy; nulls stay NULL (only the zero-row schema goes via pandas)."""
+    tbl = to_arrow(data)
+    empty = tbl.schema.empty_table().to_pandas()
+    return copy_batches(engine, table, iter(tbl.to_batches(max_chunksize=batch_rows)), empty, if_exists, types)
+
+
+def copy_parquet(engine, table: str, file_path: Path, if_exists: str = "replace", batch_rows: int = BATCH_ROWS) -> int:
+    pf = pq.ParquetFile(file_path)
+    empty = pf.schema_arrow.empty_table().to_pandas()
+    return copy_batches(engine, table, pf.iter_batches(batch_size=batch_rows), empty, if_exists)
+
+
+def stage_df(engine, table: str, df, types: dict[str, str] | None = None,
+             batch_rows: int = BATCH_ROWS) -> str:
+    """
+    COPY `df` (pandas, polars or Arrow) into a fresh UNLOGGED copy of `table`'s columns
+    (no WAL, invisible to readers); returns its name.
+    """
+    schema, name = _split_name(table)
+    stage = f"{_quote(schema)}.{_quote('stg_' + name)}"
+    with engine.begin() as con:
+        con.execute(text(f"DROP TABLE IF EXISTS {stage}"))
+        con.execute(text(f"CREATE UNLOGGED TABLE {stage} (LIKE {_quote(schema)}.{_quote(name)} INCLUDING DEFAULTS)"))
+    copy_arrow(engine, f"{schema}.stg_{name}", df, if_exists="append", batch_rows=batch_rows, types=types)
+    return stage
+
+
+def _has_unique_key(con, table: str, keys: list[str]) -> bool:
+    """True if `table` has a non-partial unique index (or primary key) on exactly `keys`, as ON CONFLICT needs."""
+    rows = con.execute(text("""
+        SELECT array_agg(a.attname::text)
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = to_regclass(:t) AND i.indisunique AND i.indpred IS NULL
+        GROUP BY i.indexrelid
+    """), {"t": table}).fetchall()
+    return any(set(r[0]) == set(keys) for r in rows)
+
+
+def merge_staged(con, table: str, stage: str, keys: list[str], cols: list[str],
+                 scope: str | None = None, params: dict | None = None) -> dict[str, int]:
+    """
+    Apply a staged batch to `table` on its natural key, inside the caller's transaction:
+    insert new keys, update only rows whose values differ, and -- when `scope` (a WHERE clause
+    over the target) is given -- delete target rows in that scope that the batch no longer has.
+    Unchanged rows are not rewritten, so they cost no WAL and no dead tuples. Staged rows that repeat
+    a key are merged once (the first in key order) and counted as "duplicates".
+    """
+    if not _has_unique_key(con, table, keys):
+        raise RuntimeError(
+            f"{table} has no primary key or unique index on ({', '.join(keys)}), which the merge needs. "
+            f"It is probably a legacy plain table: run Load_Historical once to recreate it partitioned "
+            f"(see Partitions.PARTITIONED).")
+    q = [_quote(c) for c in cols]
+    k = [_quote(c) for c in keys]
+    vals = [c for c in q if c not in k]
+    match = " AND ".join(f"s.{c} = t.{c}" for c in k)
+    staged, distinct = con.execute(text(
+        f"SELECT COUNT(*), COUNT(DISTINCT ({', '.join(f's.{c}' for c in k)})) FROM {stage} s"
+    )).one()
+    new = con.execute(text(f"""
+        SELECT COUNT(DISTINCT ({', '.join(f's.{c}' for c in k)})) FROM {stage} s
+        WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE {match})
+    """)).scalar()
+    written = con.execute(text(f"""
+        INSERT INTO {table} AS t ({', '.join(q)})
+        SELECT DISTINCT ON ({', '.join(k)}) {', '.join(q)} FROM {stage}
+        ORDER BY {', '.join(k)}
+        ON CONFLICT ({', '.join(k)}) DO UPDATE
+          SET {', '.join(f'{c} = EXCLUDED.{c}' for c in vals)}
+          WHERE ({', '.join(f't.{c}' for c in vals)}) IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in vals)})
+    """)).rowcount
+    counts = {"inserted": new, "updated": written - new, "deleted": 0, "duplicates": staged - distinct}
+    if scope:
+        counts["deleted"] = con.execute(text(f"""
+            DELETE FROM {table} t
+            WHERE {scope}
+              AND NOT EXISTS (SELECT 1 FROM {stage} s WHERE {match})
+        """), params or {}).rowcount
+    con.execute(text(f"DROP TABLE {stage}"))
+    dups = f", {counts['duplicates']:,} duplicate-key row(s) skipped" if counts["duplicates"] else ""
+    print(f"[merge] {table}: +{counts['inserted']:,} new, ~{counts['updated']:,} changed, -{counts['deleted']:,} removed{dups}")
+    return counts
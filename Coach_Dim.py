@@ -0,0 +1,74 @@
+# Head-coach dimension derived from the coach columns already in hist_schedules (no download),
+# upserted set-based so only new or changed (season, week, team) rows are written.
+from __future__ import annotations
+import time
+from sqlalchemy import text
+
+DIM = "dim_team_head_coach"
+
+DDL_COACH_DIM = f"""
+CREATE TABLE IF NOT EXISTS {DIM}(
+  season int NOT NULL,
+  week   int NOT NULL,
+  team   text NOT NULL,
+  head_coach text NOT NULL,
+  PRIMARY KEY (season, week, team)
+);
+"""
+
+def coach_select_sql(where: str = "") -> str:
+    """
+    (season, week, team, head_coach) for completed games, using the DB team codes. Home side wins a
+    (season, week, team) tie, then lowest game_id. `where` is an extra filter on hist_schedules.
+    """
+    src = "home_score IS NOT NULL AND away_score IS NOT NULL" + (f" AND {where}" if where else "")
+    return f"""
+SELECT season::int AS season, week::int AS week, team, head_coach
+FROM (
+  SELECT *, ROW_NUMBER() OVER (PARTITION BY season, week, team ORDER BY side, game_id) AS rn
+  FROM (
+    SELECT game_id, season, week, game_type, 0 AS side, home_team AS team, TRIM(home_coach) AS head_coach
+    FROM hist_schedules WHERE {src}
+    UNION ALL
+    SELECT game_id, season, week, game_type, 1 AS side, away_team AS team, TRIM(away_coach) AS head_coach
+    FROM hist_schedules WHERE {src}
+  ) s
+  WHERE game_type IN ('REG','WC','DIV','CON','SB') AND head_coach IS NOT NULL
+) c
+WHERE rn = 1
+"""
+
+def refresh_coach_dim(con, season: int | None = None, weeks=None, prune: bool = False) -> int:
+    """
+    Upsert the dimension from hist_schedules, optionally limited to one season (and weeks) so the scan
+    prunes to that partition. Rows whose coach is unchanged are not rewritten. With `prune`, rows in that
+    scope that hist_schedules no longer has (a reloaded season) are deleted. Returns rows written.
+    """
+    t0 = time.perf_counter()
+    where, params = [], {}
+    if season is not None:
+        where.append("season = :s")
+        params["s"] = int(season)
+    if weeks is not None:
+        where.append("week = ANY(:w)")
+        params["w"] = [int(w) for w in weeks]
+    con.execute(text(DDL_COACH_DIM))
+    n = con.execute(text(f"""
+        INSERT INTO {DIM} AS d (season, week, team, head_coach)
+        {coach_select_sql(" AND ".join(where))}
+        ON CONFLICT (season, week, team) DO UPDATE
+          SET head_coach = EXCLUDED.head_coach
+          WHERE d.head_coach IS DISTINCT FROM EXCLUDED.head_coach
+    """), params).rowcount
+    removed = 0
+    if prune:
+        removed = con.execute(text(f"""
+            DELETE FROM {DIM} d
+            WHERE {" AND ".join(f"d.{w}" for w in where) or "true"}
+              AND NOT EXISTS (SELECT 1 FROM ({coach_select_sql(" AND ".join(where))}) c
+                              WHERE c.season = d.season AND c.week = d.week AND c.team = d.team)
+        """), params).rowcount
+    scope = f"{season}" + (f" W{params['w']}" if weeks is not None else "") if season is not None else "all seasons"
+    gone = f", {removed:,} removed" if removed else ""
+    print(f"[coach] {DIM}: {n:,} new/changed row(s){gone} for {scope} in {time.perf_counter()-t0:.2f}s")
+    return n
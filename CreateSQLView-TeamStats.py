@@ -1,21 +1,20 @@
+import hashlib
 from pathlib import Path
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 import pandas as pd
+from Db_Conn import get_engine
+from Load_Manifest import bump_data_version
+from Mart_Refresh import refresh_marts
+from Splits import SQL_FACT_DDL, rebuild_fact
+from Team_Strength import rebuild_strength
 
-USER = "SeanZahller"
-PASS = "YvMiTe9!2"
-HOST = "localhost"
-PORT = 5432          
-DB   = "nfl_warehouse"
+engine = get_engine()
 
-engine = create_engine(f"postgresql+psycopg2://{USER}:{PASS}@{HOST}:{PORT}/{DB}", pool_pre_ping=True)
+MART_MODE = "view"   # "view" = plain views, "matview" = materialized base layer (refresh via Mart_Refresh.py)
 
-SQL_BUILD = r"""
--- 0) schema
-CREATE SCHEMA IF NOT EXISTS mart;
-
--- 1) Per-team-per-game base with handy flags
-CREATE OR REPLACE VIEW mart.v_team_games AS
+# 1) Per-team-per-game base with handy flags
+SQL_TEAM_GAMES = r"""
 WITH base AS (
   SELECT
     game_id,
@@ -59,10 +58,11 @@ SELECT
   CASE WHEN t.team=b.home_team THEN b.home_score ELSE b.away_score END AS team_score,
   CASE WHEN t.team=b.home_team THEN b.away_score ELSE b.home_score END AS opp_score
 FROM base b
-CROSS JOIN LATERAL (VALUES (b.home_team),(b.away_team)) AS t(team);
+CROSS JOIN LATERAL (VALUES (b.home_team),(b.away_team)) AS t(team)
+"""
 
--- 2) Season-end record per team
-CREATE OR REPLACE VIEW mart.v_team_season_record AS
+# 2) Season-end record per team
+SQL_TEAM_SEASON_RECORD = r"""
 SELECT
   season, team,
   SUM(CASE WHEN win_pts=1   THEN 1 ELSE 0 END) AS wins,
@@ -70,75 +70,101 @@ SELECT
   SUM(CASE WHEN win_pts=0.5 THEN 1 ELSE 0 END) AS ties,
   SUM(win_pts)/COUNT(*) AS win_pct
 FROM mart.v_team_games
-GROUP BY season, team;
+GROUP BY season, team
+"""
 
--- 3) Enrich with opponent season win%
-CREATE OR REPLACE VIEW mart.v_team_games_enriched AS
-SELECT g.*, (sr_opp.win_pct >= 0.5) AS opp_is_500_plus
+# 3) Enrich with opponent season win% (persisted in mart.team_season_strength, see Team_Strength.py).
+#    LEFT JOIN: if the strength table lags a reload, opp_is_500_plus is NULL but the game is never lost
+SQL_TEAM_GAMES_ENRICHED = r"""
+SELECT g.*, (st_opp.win_pct_final >= 0.5) AS opp_is_500_plus
 FROM mart.v_team_games g
-JOIN mart.v_team_season_record sr_opp
-  ON sr_opp.season = g.season
- AND sr_opp.team   = g.opp;
+LEFT JOIN mart.team_season_strength st_opp
+  ON st_opp.season = g.season
+ AND st_opp.week   = g.week
+ AND st_opp.team   = g.opp
+"""
 
+# (view, defining query, unique key, extra indexes) in dependency order.
+# In "matview" mode each view becomes `SELECT * FROM mart.mv_*` so downstream views keep their names.
+BASE_MARTS = [
+    ("v_team_games",          SQL_TEAM_GAMES,          ("game_id", "team"), [("season", "week", "team"), ("season", "opp")]),
+    ("v_team_season_record",  SQL_TEAM_SEASON_RECORD,  ("season", "team"),  []),
+    ("v_team_games_enriched", SQL_TEAM_GAMES_ENRICHED, ("game_id", "team"), [("season", "week", "team"), ("team",)]),
+]
+
+def base_marts_sql(mode: str = MART_MODE) -> str:
+    """Plain-view base layer (also what Mart_Offline runs); "matview" mode is built by sync_base_matviews."""
+    if mode not in ("view", "matview"):
+        raise ValueError(f"Unknown MART_MODE: {mode}")
+    if mode == "matview":
+        raise ValueError("matview base layer needs a connection: use sync_base_matviews(con)")
+    parts = ["CREATE SCHEMA IF NOT EXISTS mart;"]
+    for view, query, *_ in BASE_MARTS:
+        parts.append(f"CREATE OR REPLACE VIEW mart.{view} AS {query};")
+    # views no longer read the materialized copies; drop them newest-first
+    for view, *_ in reversed(BASE_MARTS):
+        parts.append(f"DROP MATERIALIZED VIEW IF EXISTS mart.mv_{view[2:]};")
+    return "\n".join(parts)
+
+def _definition_tag(query: str) -> str:
+    return "definition md5 " + hashlib.md5(query.encode()).hexdigest()
+
+def sync_base_matviews(con):
+    """
+    Materialized base layer: create each mart.mv_*, or rebuild it when its defining query changed since
+    it was built (the query's md5 is kept as the matview comment). A rebuild is created under a new name
+    and swapped in behind the mart.v_* wrapper view, so the views built on top are never dropped.
+    """
+    con.execute(text("CREATE SCHEMA IF NOT EXISTS mart"))
+    for view, query, key, indexes in BASE_MARTS:
+        mv, tag = "mv_" + view[2:], _definition_tag(query)
+        exists = con.execute(text("SELECT to_regclass(:t)"), {"t": f"mart.{mv}"}).scalar()
+        if not exists:
+            con.execute(text(f"CREATE MATERIALIZED VIEW mart.{mv} AS {query}"))
+        elif con.execute(text("SELECT obj_description(to_regclass(:t), 'pg_class')"), {"t": f"mart.{mv}"}).scalar() != tag:
+            con.execute(text(f"CREATE MATERIALIZED VIEW mart.{mv}__new AS {query}"))
+            try:
+                con.execute(text(f"CREATE OR REPLACE VIEW mart.{view} AS SELECT * FROM mart.{mv}__new"))
+            except DBAPIError as e:
+                raise RuntimeError(f"mart.{view} changed its columns; drop the views built on it and re-run") from e
+            con.execute(text(f"DROP MATERIALIZED VIEW mart.{mv}"))
+            con.execute(text(f"ALTER MATERIALIZED VIEW mart.{mv}__new RENAME TO {mv}"))
+            print(f"[mart] mart.{mv}: definition changed, rebuilt")
+        con.execute(text(f"COMMENT ON MATERIALIZED VIEW mart.{mv} IS '{tag}'"))
+        con.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{mv} ON mart.{mv} ({', '.join(key)})"))
+        for cols in indexes:
+            con.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{mv}_{'_'.join(cols)} ON mart.{mv} ({', '.join(cols)})"))
+        con.execute(text(f"CREATE OR REPLACE VIEW mart.{view} AS SELECT * FROM mart.{mv}"))
+
+# Splits are thin selections over mart.fact_splits (built in one GROUPING SETS scan, see Splits.py)
+SQL_BUILD = r"""
 -- 4) All-time splits
 CREATE OR REPLACE VIEW mart.v_team_alltime_splits AS
 SELECT
-  team,
-  COUNT(*)                                   AS games,
-  SUM(CASE WHEN win_pts=1   THEN 1 ELSE 0 END) AS wins,
-  SUM(CASE WHEN win_pts=0   THEN 1 ELSE 0 END) AS losses,
-  SUM(CASE WHEN win_pts=0.5 THEN 1 ELSE 0 END) AS ties,
-  ROUND(SUM(win_pts)/COUNT(*)::numeric, 4)   AS win_pct,
-
-  SUM(CASE WHEN is_home AND win_pts=1 THEN 1 ELSE 0 END) AS wins_home,
-  SUM(CASE WHEN NOT is_home AND win_pts=1 THEN 1 ELSE 0 END) AS wins_away,
-
-  SUM(CASE WHEN is_primetime AND win_pts=1 THEN 1 ELSE 0 END) AS wins_primetime,
-  SUM(CASE WHEN is_morning   AND win_pts=1 THEN 1 ELSE 0 END) AS wins_morning,
-  SUM(CASE WHEN is_afternoon AND win_pts=1 THEN 1 ELSE 0 END) AS wins_afternoon,
-
-  SUM(CASE WHEN is_playoff AND win_pts=1 THEN 1 ELSE 0 END) AS wins_playoff,
-  SUM(CASE WHEN NOT is_playoff AND win_pts=1 THEN 1 ELSE 0 END) AS wins_regular,
-
-  SUM(CASE WHEN opp_is_500_plus THEN 1 ELSE 0 END)                       AS games_vs_500,
-  SUM(CASE WHEN opp_is_500_plus THEN win_pts ELSE 0 END)                 AS wins_pts_vs_500,
-  SUM(CASE WHEN opp_is_500_plus AND win_pts=1 THEN 1 ELSE 0 END)         AS wins_vs_500,
-  ROUND(
-    SUM(CASE WHEN opp_is_500_plus THEN win_pts ELSE 0 END)
-    / NULLIF(SUM(CASE WHEN opp_is_500_plus THEN 1 ELSE 0 END),0)::numeric, 4
-  ) AS win_pct_vs_500
-FROM mart.v_team_games_enriched
-GROUP BY team;
+  entity_id AS team,
+  games, wins, losses, ties,
+  ROUND(win_pts/games::numeric, 4) AS win_pct,
+  wins_home, wins_away,
+  wins_primetime, wins_morning, wins_afternoon,
+  wins_playoff, wins_regular,
+  games_vs_500, wins_pts_vs_500, wins_vs_500,
+  ROUND(wins_pts_vs_500/NULLIF(games_vs_500,0)::numeric, 4) AS win_pct_vs_500
+FROM mart.fact_splits
+WHERE entity_type = 'team' AND season IS NULL;
 
 -- 5) Per-season splits
 CREATE OR REPLACE VIEW mart.v_team_season_splits AS
 SELECT
-  season, team,
-  COUNT(*)                                   AS games,
-  SUM(CASE WHEN win_pts=1   THEN 1 ELSE 0 END) AS wins,
-  SUM(CASE WHEN win_pts=0   THEN 1 ELSE 0 END) AS losses,
-  SUM(CASE WHEN win_pts=0.5 THEN 1 ELSE 0 END) AS ties,
-  ROUND(SUM(win_pts)/COUNT(*)::numeric, 4)   AS win_pct,
-
-  SUM(CASE WHEN is_home AND win_pts=1 THEN 1 ELSE 0 END) AS wins_home,
-  SUM(CASE WHEN NOT is_home AND win_pts=1 THEN 1 ELSE 0 END) AS wins_away,
-
-  SUM(CASE WHEN is_primetime AND win_pts=1 THEN 1 ELSE 0 END) AS wins_primetime,
-  SUM(CASE WHEN is_morning   AND win_pts=1 THEN 1 ELSE 0 END) AS wins_morning,
-  SUM(CASE WHEN is_afternoon AND win_pts=1 THEN 1 ELSE 0 END) AS wins_afternoon,
-
-  SUM(CASE WHEN is_playoff AND win_pts=1 THEN 1 ELSE 0 END) AS wins_playoff,
-  SUM(CASE WHEN NOT is_playoff AND win_pts=1 THEN 1 ELSE 0 END) AS wins_regular,
-
-  SUM(CASE WHEN opp_is_500_plus THEN 1 ELSE 0 END)                       AS games_vs_500,
-  SUM(CASE WHEN opp_is_500_plus THEN win_pts ELSE 0 END)                 AS wins_pts_vs_500,
-  SUM(CASE WHEN opp_is_500_plus AND win_pts=1 THEN 1 ELSE 0 END)         AS wins_vs_500,
-  ROUND(
-    SUM(CASE WHEN opp_is_500_plus THEN win_pts ELSE 0 END)
-    / NULLIF(SUM(CASE WHEN opp_is_500_plus THEN 1 ELSE 0 END),0)::numeric, 4
-  ) AS win_pct_vs_500
-FROM mart.v_team_games_enriched
-GROUP BY season, team;
+  season, entity_id AS team,
+  games, wins, losses, ties,
+  ROUND(win_pts/games::numeric, 4) AS win_pct,
+  wins_home, wins_away,
+  wins_primetime, wins_morning, wins_afternoon,
+  wins_playoff, wins_regular,
+  games_vs_500, wins_pts_vs_500, wins_vs_500,
+  ROUND(wins_pts_vs_500/NULLIF(games_vs_500,0)::numeric, 4) AS win_pct_vs_500
+FROM mart.fact_splits
+WHERE entity_type = 'team' AND season IS NOT NULL;
 
 -- 6) Last season convenience
 CREATE OR REPLACE VIEW mart.v_team_last_season_splits AS
@@ -147,10 +173,22 @@ FROM mart.v_team_season_splits s
 WHERE s.season = (SELECT MAX(season) FROM hist_schedules);
 """
 
-def run_build():
+def run_build(mode: str = MART_MODE):
     with engine.begin() as con:
+        rebuild_strength(con)
+        if mode == "matview":
+            sync_base_matviews(con)
+        else:
+            con.execute(text(base_marts_sql(mode)))
+        con.execute(text(SQL_FACT_DDL))
         con.execute(text(SQL_BUILD))
-    print("✅ Feature mart views created/updated.")
+        bump_data_version(con, f"CreateSQLView-TeamStats {mode} base")
+    if mode == "matview":
+        refresh_marts(engine)
+    with engine.begin() as con:
+        rebuild_fact(con)
+        bump_data_version(con, "CreateSQLView-TeamStats fact")
+    print(f"✅ Feature mart views created/updated ({mode} base layer).")
 
 def load_division_mapping(csv_path: Path):
     """
@@ -0,0 +1,155 @@
+# Shared warehouse connection: settings from the environment (defaults = the local docker warehouse), one
+# pooled engine per process, cached catalog lookups, and chunked reads over server-side cursors.
+#   PGHOST / PGPORT / PGUSER / PGPASSWORD / PGDATABASE   standard libpq names; no credentials live here:
+#                  unset PGUSER/PGPASSWORD fall through to libpq (OS user, ~/.pgpass, PGPASSFILE)
+#   NFL_PG_PORTS   fallback ports probed once if PGPORT does not answer, e.g. "32768,32769"
+#   NFL_PG_POOL    pool size (overflow is the same again)
+from __future__ import annotations
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
+
+CHUNK_ROWS = 50_000
+OUT_DIR = Path(__file__).resolve().parent / "extracts"
+EXPORTS = ["mart.v_player_games"]   # streamed to OUT_DIR/<view>.parquet by main()
+
+def settings() -> dict:
+    ports = [int(os.environ.get("PGPORT", 5432))]
+    ports += [int(p) for p in os.environ.get("NFL_PG_PORTS", "").split(",") if p.strip() and int(p) not in ports]
+    return {
+        "host":     os.environ.get("PGHOST", "localhost"),
+        "ports":    ports,
+        "user":     os.environ.get("PGUSER"),
+        "password": os.environ.get("PGPASSWORD"),
+        "database": os.environ.get("PGDATABASE", "nfl_warehouse"),
+        "pool":     int(os.environ.get("NFL_PG_POOL", 5)),
+    }
+
+def _url(cfg: dict, port: int) -> URL:
+    return URL.create("postgresql+psycopg2", username=cfg["user"], password=cfg["password"],
+                      host=cfg["host"], port=port, database=cfg["database"])
+
+_engine = None
+_engine_pid = None
+_lock = threading.Lock()
+
+def get_engine():
+    """The process-wide pooled engine; fallback ports are probed once, on first use (and again after a fork)."""
+    global _engine, _engine_pid
+    with _lock:
+        if _engine is not None and _engine_pid == os.getpid():
+            return _engine
+        cfg = settings()
+        last_err = None
+        for port in cfg["ports"]:
+            eng = create_engine(_url(cfg, port), pool_pre_ping=True,
+                                pool_size=cfg["pool"], max_overflow=cfg["pool"])
+            if len(cfg["ports"]) == 1:
+                break
+            try:
+                with eng.connect() as con:
+                    con.execute(text("SELECT 1"))
+                break
+            except Exception as e:
+                last_err = e
+                eng.dispose()
+        else:
+            raise RuntimeError(f"Could not connect on ports {cfg['ports']}. Last error: {last_err}")
+        if len(cfg["ports"]) > 1:
+            print(f"[db] connected on port {eng.url.port}")
+        _engine, _engine_pid = eng, os.getpid()
+        return _engine
+
+@lru_cache(maxsize=None)
+def table_columns(table: str, schema: str = "public") -> tuple[str, ...]:
+    """Column names of one table in ordinal order, read once per process (clear with table_columns.cache_clear())."""
+    with get_engine().connect() as con:
+        rows = con.execute(text("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = :s AND table_name = :t
+            ORDER BY ordinal_position
+        """), {"s": schema, "t": table}).fetchall()
+    return tuple(r[0] for r in rows)
+
+# Postgres type OID -> Arrow type for streamed batches; anything else is carried as its text form
+_NUMERIC_OID = 1700
+_ARROW_TYPES = {
+    16: pa.bool_(), 20: pa.int64(), 21: pa.int16(), 23: pa.int32(),
+    700: pa.float32(), 701: pa.float64(), _NUMERIC_OID: pa.float64(),
+    19: pa.string(), 25: pa.string(), 1042: pa.string(), 1043: pa.string(),
+    1082: pa.date32(), 1083: pa.time64("us"), 1114: pa.timestamp("us"), 1184: pa.timestamp("us", tz="UTC"),
+}
+
+def _arrow_schema(description) -> tuple[pa.Schema, list[int]]:
+    oids = [d[1] for d in description]
+    return pa.schema([(d[0], _ARROW_TYPES.get(d[1], pa.string())) for d in description]), oids
+
+def _arrow_batch(rows, schema: pa.Schema, oids: list[int]) -> pa.RecordBatch:
+    cols = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays = []
+    for values, field, oid in zip(cols, schema, oids):
+        if oid == _NUMERIC_OID:          # Decimal -> decimal128 in C, then to double
+            arrays.append(pa.array(values).cast(pa.float64()) if any(v is not None for v in values)
+                          else pa.nulls(len(values), pa.float64()))
+            continue
+        if oid not in _ARROW_TYPES:
+            values = [None if v is None else str(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def stream(sql: str, params: dict | None = None, chunk_rows: int = CHUNK_ROWS, fmt: str = "pandas",
+           eng=None) -> Iterator[pd.DataFrame | pa.RecordBatch]:
+    """
+    Run `sql` on a server-side cursor and yield it `chunk_rows` at a time as pandas DataFrames (same
+    coercion as pd.read_sql) or, with fmt="arrow", as RecordBatches sharing one schema.
+    """
+    eng = eng or get_engine()
+    with eng.connect() as con:
+        res = con.execution_options(stream_results=True, yield_per=chunk_rows).execute(text(sql), params or {})
+        cols = list(res.keys())
+        schema, oids = _arrow_schema(res.cursor.description) if fmt == "arrow" else (None, None)
+        for rows in res.partitions(chunk_rows):
+            if fmt == "arrow":
+                yield _arrow_batch(rows, schema, oids)
+            else:
+                yield pd.DataFrame.from_records(rows, columns=cols, coerce_float=True)
+
+def read_df(sql: str, params: dict | None = None, eng=None) -> pd.DataFrame:
+    """Small results in one frame, on the shared engine."""
+    with (eng or get_engine()).connect() as con:
+        return pd.read_sql(text(sql), con, params=params)
+
+def export_parquet(sql: str, path: Path, params: dict | None = None, chunk_rows: int = CHUNK_ROWS, eng=None) -> int:
+    """Stream a query into one parquet file, a row group per chunk, holding one chunk in memory at a time."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    writer = None
+    try:
+        for batch in stream(sql, params, chunk_rows, fmt="arrow", eng=eng):
+            writer = writer or pq.ParquetWriter(path, batch.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def main():
+    for view in EXPORTS:
+        t0 = time.perf_counter()
+        path = OUT_DIR / f"{view.split('.')[-1]}.parquet"
+        rows = export_parquet(f"SELECT * FROM {view}", path)
+        print(f"[export] {view}: {rows:,} rows -> {path} in {time.perf_counter() - t0:.2f}s")
+    print("✅ Extracts written")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# Persisted as-of-week defensive ranks: yards allowed per game to each position group (and in total),
+# cumulative over regular-season games, ranked per (season, week), and pre-joined to team/player games.
+from __future__ import annotations
+import time
+from sqlalchemy import text
+
+DEF_RANK = "mart.def_rank_asof"
+
+# position_group -> yards a defense allows to it in one game (over that game's v_player_games rows);
+# ALL is the whole offense: passing plus every rusher
+DEF_POSITIONS = {
+    "QB":  "SUM(CASE WHEN position_group='QB' THEN passing_yards ELSE 0 END)",
+    "RB":  "SUM(CASE WHEN position_group='RB' THEN rushing_yards ELSE 0 END)",
+    "WR":  "SUM(CASE WHEN position_group='WR' THEN receiving_yards ELSE 0 END)",
+    "TE":  "SUM(CASE WHEN position_group='TE' THEN receiving_yards ELSE 0 END)",
+    "ALL": "SUM(CASE WHEN position_group='QB' THEN passing_yards ELSE 0 END) + SUM(rushing_yards)",
+}
+
+SQL_DEF_RANK_DDL = f"""
+CREATE SCHEMA IF NOT EXISTS mart;
+CREATE TABLE IF NOT EXISTS {DEF_RANK} (
+  season         int  NOT NULL,
+  week           int  NOT NULL,
+  team           text NOT NULL,   -- the defense
+  position_group text NOT NULL,
+  games_asof     int,
+  yards_asof     numeric,
+  ypg_asof       numeric,
+  rank_asof      int,             -- 1 = fewest yards per game, through this week inclusive
+  rank_prior     int,             -- rank entering this week (through the previous week)
+  PRIMARY KEY (season, week, team, position_group)
+);
+"""
+
+def def_rank_select_sql(season_filter: bool = False) -> str:
+    """
+    One row per (season, completed week, team, position group), byes included so every team is ranked
+    every week. Only REG games count; playoff weeks carry the final regular-season values.
+    """
+    sf = " AND season = :s" if season_filter else ""
+    pos = "\n  UNION ALL\n  ".join(
+        f"SELECT season, week, team, '{p}' AS position_group, {p.lower()}_yds AS yds FROM gm" for p in DEF_POSITIONS)
+    return f"""
+WITH gm AS (
+  SELECT season, week, opp_team AS team,
+    {(","+chr(10)+"    ").join(f"{expr} AS {p.lower()}_yds" for p, expr in DEF_POSITIONS.items())}
+  FROM mart.v_player_games
+  WHERE game_type = 'REG'{sf}
+  GROUP BY season, week, opp_team
+), wk AS (
+  {pos}
+), grid AS (
+  -- every (team, position) in every completed week; unioned in rather than joined so byes get a row
+  SELECT w.season, w.week, t.team, p.position_group, NULL::numeric AS yds, 0 AS played
+  FROM (SELECT DISTINCT season::int AS season, week::int AS week FROM hist_schedules
+        WHERE home_score IS NOT NULL{sf}) w
+  JOIN (SELECT season::int AS season, home_team AS team FROM hist_schedules WHERE true{sf}
+        UNION SELECT season::int, away_team FROM hist_schedules WHERE true{sf}) t ON t.season = w.season
+  CROSS JOIN (VALUES {", ".join(f"('{p}')" for p in DEF_POSITIONS)}) p(position_group)
+  UNION ALL
+  SELECT season, week, team, position_group, yds, 1 FROM wk
+), cum AS (
+  SELECT season, week, team, position_group,
+         SUM(SUM(played)) OVER w AS games_asof,
+         SUM(SUM(yds)) OVER w AS yards_asof
+  FROM grid
+  GROUP BY season, week, team, position_group
+  WINDOW w AS (PARTITION BY season, team, position_group ORDER BY week ROWS UNBOUNDED PRECEDING)
+), ranked AS (
+  SELECT *, yards_asof / NULLIF(games_asof, 0) AS ypg_asof,
+         CASE WHEN games_asof > 0 THEN DENSE_RANK() OVER (
+           PARTITION BY season, week, position_group ORDER BY yards_asof / NULLIF(games_asof, 0)) END AS rank_asof
+  FROM cum
+)
+SELECT season, week, team, position_group, games_asof, yards_asof, ypg_asof, rank_asof,
+       LAG(rank_asof) OVER (PARTITION BY season, team, position_group ORDER BY week) AS rank_prior
+FROM ranked
+"""
+
+def def_rank_build_sql() -> str:
+    return f"DELETE FROM {DEF_RANK};\nINSERT INTO {DEF_RANK}\n{def_rank_select_sql()};"
+
+# Opponent ranks entering each game (indexed lookups on the primary key), plus the season-final table the
+# notebook prototyped as mart.v_def_rank_by_pos
+SQL_DEF_RANK_VIEWS = f"""
+CREATE OR REPLACE VIEW mart.v_team_games_def_rank AS
+SELECT g.*,
+  {(","+chr(10)+"  ").join(f"d_{p.lower()}.rank_prior AS opp_def_rank_{p.lower()}" for p in DEF_POSITIONS)}
+FROM mart.v_team_games_enriched g
+{chr(10).join(f"LEFT JOIN {DEF_RANK} d_{p.lower()} ON d_{p.lower()}.season = g.season AND d_{p.lower()}.week = g.week"
+              f" AND d_{p.lower()}.team = g.opp AND d_{p.lower()}.position_group = '{p}'" for p in DEF_POSITIONS)};
+
+CREATE OR REPLACE VIEW mart.v_player_games_def_rank AS
+SELECT pg.*, d.rank_prior AS opp_def_rank, d.ypg_asof AS opp_def_ypg_asof
+FROM mart.v_player_games pg
+LEFT JOIN {DEF_RANK} d
+  ON d.season = pg.season AND d.week = pg.week AND d.team = pg.opp_team AND d.position_group = pg.position_group;
+
+CREATE OR REPLACE VIEW mart.v_def_rank_by_pos AS
+SELECT season, team, position_group, ypg_asof AS yards_per_game, rank_asof AS def_rank_pos,
+       (season::text || '-' || team || '-' || position_group) AS season_team_pos
+FROM {DEF_RANK} d
+WHERE week = (SELECT MAX(week) FROM {DEF_RANK} x WHERE x.season = d.season) AND games_asof > 0;
+"""
+
+def rebuild_def_rank(con):
+    t0 = time.perf_counter()
+    con.execute(text(SQL_DEF_RANK_DDL))
+    con.execute(text(def_rank_build_sql()))
+    con.execute(text(f"ANALYZE {DEF_RANK}"))
+    print(f"[defrank] {DEF_RANK} rebuilt in {time.perf_counter()-t0:.2f}s")
+
+def refresh_def_rank(con, season: int, weeks):
+    """
+    A week's ranks depend on every team's record through it, so the changed season is re-read (one
+    partition) but only weeks from the first changed one on are rewritten.
+    """
+    t0 = time.perf_counter()
+    w0 = min(int(w) for w in weeks)
+    con.execute(text(SQL_DEF_RANK_DDL))
+    con.execute(text(f"""
+        DELETE FROM {DEF_RANK} WHERE season = :s AND week >= :w0;
+        INSERT INTO {DEF_RANK}
+        SELECT * FROM ({def_rank_select_sql(season_filter=True)}) r WHERE week >= :w0;
+    """), {"s": int(season), "w0": w0})
+    print(f"[defrank] {DEF_RANK}: {season} from W{w0} refreshed in {time.perf_counter()-t0:.2f}s")
@@ -1,65 +1,59 @@
 from __future__ import annotations
-import pandas as pd
 import polars as pl
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import nflreadpy as nread
+from Db_Conn import get_engine
+from Bulk_Write import stage_df, merge_staged
+from Schema_Sync import Catalog
+from Load_Manifest import week_hashes, stored_hashes, changed_weeks, record_hashes, bump_data_version
+from Mart_Refresh import build_aggregates, refresh_marts, refresh_changed
+from Partitions import PARTITIONED, ensure_season_partitions
+from Team_Strength import refresh_strength
+from Team_Ranks import refresh_weekly_ranks
+from Primary_QB import refresh_primary_qb
+from Coach_Dim import refresh_coach_dim
+from Table_Profile import check_tables
 
 SEASON = 2025
 WEEKS  = None  
+MART_REFRESH = "incremental"   # "incremental" = only the seasons touched here, "full" = matviews + every fact table
+FORCE_RELOAD = False           # True = write every pulled week even if its content hash is unchanged
+EVOLVE_SCHEMA = True           # add new source columns to hist_* (False = drop them, the old behaviour)
+PROFILE_DRIFT = False          # re-profile the written tables (full scans) and report drift vs the last profile
 
-PG_USER = "SeanZahller"
-PG_PASS = "YvMiTe9!2"
-PG_HOST = "localhost"
-PG_PORT = 5432
-PG_DB   = "nfl_warehouse"
+engine = get_engine()
 
-engine = create_engine(
-    f"postgresql+psycopg2://{PG_USER}:{PG_PASS}@{PG_HOST}:{PG_PORT}/{PG_DB}",
-    pool_pre_ping=True
-)
-
-def get_table_columns(table: str) -> list[str]:
-    with engine.begin() as con:
-        rows = con.execute(text("""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_schema='public' AND table_name=:t
-            ORDER BY ordinal_position
-        """), {"t": table}).fetchall()
-    return [r[0] for r in rows]
-
-def write_df(table: str, df: pd.DataFrame):
-    if df.empty:
+def write_df(table: str, df: pl.DataFrame, catalog: Catalog) -> str | None:
+    """COPY df (as Arrow batches, nulls kept) into the unlogged staging copy of `table`; merge_staged applies it."""
+    if df.is_empty():
         print(f"[skip] {table}: nothing to write")
-        return
-    for c in df.select_dtypes(include="object").columns:
-        df[c] = df[c].astype(str)
-    df.to_sql(table, engine, if_exists="append", index=False, method="multi", chunksize=50_000)
-    print(f"[ok] {table}: +{len(df):,} rows")
+        return None
+    stage = stage_df(engine, table, df, types=catalog.types(table), batch_rows=50_000)
+    print(f"[ok] {table}: {len(df):,} rows staged")
+    return stage
 
-def harmonize_weekly(df: pd.DataFrame, target_table: str) -> pd.DataFrame:
+def harmonize_weekly(df: pl.DataFrame, target_table: str, catalog: Catalog) -> pl.DataFrame:
     """
-    Map nflreadpy columns to your existing hist_weekly schema (from nfl_data_py).
-    Drop any columns not present in the table.
+    Map nflreadpy columns to your existing hist_weekly schema (from nfl_data_py) using the
+    etl_column_map renames. New source columns are added to the table (EVOLVE_SCHEMA) or dropped.
     """
-    rename_map = {
-        "team": "recent_team",                    
-        "passing_interceptions": "interceptions",  
-        "sacks_suffered": "sacks",                 
-        "sack_yards_lost": "sack_yards",          
-    }
-    df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
-
-    for c in ("season", "week"):
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
-
-    table_cols = set(get_table_columns(target_table))
+    df = catalog.rename(target_table, df)
+
+    df = df.with_columns([pl.col(c).cast(pl.Int64, strict=False) for c in ("season", "week") if c in df.columns])
+
+    return conform(df, target_table, catalog)
+
+def conform(df: pl.DataFrame, target_table: str, catalog: Catalog) -> pl.DataFrame:
+    if EVOLVE_SCHEMA:
+        catalog.evolve(engine, target_table, df)
+    table_cols = catalog.types(target_table)
+    if not table_cols:
+        return df
     keep = [c for c in df.columns if c in table_cols]
     dropped = [c for c in df.columns if c not in table_cols]
     if dropped:
         print(f"[info] dropping {len(dropped)} cols not in {target_table}: {dropped[:8]}{'...' if len(dropped)>8 else ''}")
-    return df[keep]
+    return df.select(keep)
 
 def main():
     with engine.begin() as con:
@@ -98,39 +92,71 @@ def main():
             (pl.col("away_score").is_not_null())
         )
     )
-    schedules = sch_pl.to_pandas()
+    schedules = sch_pl
     wk_pl: pl.DataFrame = nread.load_player_stats(SEASON, summary_level="week")
     wk_pl = wk_pl.filter(
         (pl.col("season_type") == "REG") &
         (pl.col("week").is_in(weeks_to_pull))
     )
-    weekly = wk_pl.to_pandas()
+    weekly = wk_pl
 
+    catalog = Catalog.load(engine, ["hist_schedules", "hist_weekly"])
+    schedules = conform(schedules, "hist_schedules", catalog)
+    weekly_h = harmonize_weekly(weekly, "hist_weekly", catalog)
+
+    # Only weeks whose harmonized content changed since the last run are written
+    frames, hashes, changed = {}, {}, {}
     with engine.begin() as con:
-        con.execute(text("""
-            DELETE FROM hist_schedules
-            WHERE season=:s AND week = ANY(:w)
-        """), {"s": SEASON, "w": weeks_to_pull})
-        con.execute(text("""
-            DELETE FROM hist_weekly
-            WHERE season=:s AND week = ANY(:w)
-        """), {"s": SEASON, "w": weeks_to_pull})
-
-    write_df("hist_schedules", schedules)
-    weekly_h = harmonize_weekly(weekly, "hist_weekly")
-    write_df("hist_weekly", weekly_h)
+        for table, df in (("hist_schedules", schedules), ("hist_weekly", weekly_h)):
+            hashes[table] = week_hashes(df)
+            old = {} if FORCE_RELOAD else stored_hashes(con, table, SEASON)
+            changed[table] = changed_weeks(hashes[table], old)
+            frames[table] = df.filter(pl.col("week").is_in(changed[table]))
+            skipped = sorted(set(hashes[table]) - set(changed[table]))
+            print(f"[manifest] {table}: {len(changed[table])} week(s) changed {changed[table]}, "
+                  f"{len(skipped)} unchanged skipped")
+    changed_all = sorted(set(changed["hist_schedules"]) | set(changed["hist_weekly"]))
+    if not changed_all:
+        print(f"\n✅ Nothing changed for {SEASON} W{weeks_to_pull[0]}–{weeks_to_pull[-1]}; no writes, no refresh.")
+        return
 
+    # Stage both tables first, then apply them (and the dimensions built from them) in one transaction,
+    # so readers never see the loaded weeks half-written or missing.
+    staged = [(t, write_df(t, frames[t], catalog), frames[t]) for t in frames]
+    with engine.begin() as con:
+        for table, stage, df in staged:
+            if stage is None:
+                continue
+            ensure_season_partitions(con, table, [SEASON])
+            merge_staged(con, table, stage, PARTITIONED[table]["pk"], list(df.columns),
+                         scope="t.season = :s AND t.week = ANY(:w)", params={"s": SEASON, "w": changed[table]})
+            record_hashes(con, table, SEASON, {w: hashes[table][w] for w in changed[table]})
+        refresh_strength(con, [SEASON])
+        refresh_weekly_ranks(con, SEASON, changed_all)
+        if changed["hist_schedules"]:
+            refresh_coach_dim(con, SEASON, changed["hist_schedules"])
+        if changed["hist_weekly"]:
+            refresh_primary_qb(con, SEASON, changed["hist_weekly"])
+        bump_data_version(con, f"ETL_InSzn {SEASON} W{changed_all}")
+
+    scope = {"s": SEASON, "w": changed_all}
     with engine.begin() as con:
         cnt_s = con.execute(
-            text("SELECT COUNT(*) FROM hist_schedules WHERE season=:s AND week=ANY(:w)"),
-            {"s": SEASON, "w": weeks_to_pull}
+            text("SELECT COUNT(*) FROM hist_schedules WHERE season=:s AND week=ANY(:w)"), scope
         ).scalar()
         cnt_w = con.execute(
-            text("SELECT COUNT(*) FROM hist_weekly WHERE season=:s AND week=ANY(:w)"),
-            {"s": SEASON, "w": weeks_to_pull}
+            text("SELECT COUNT(*) FROM hist_weekly WHERE season=:s AND week=ANY(:w)"), scope
         ).scalar()
-    print(f"[count] hist_schedules {SEASON} W{weeks_to_pull[0]}–{weeks_to_pull[-1]}: {cnt_s:,}")
-    print(f"[count] hist_weekly   {SEASON} W{weeks_to_pull[0]}–{weeks_to_pull[-1]}: {cnt_w:,}")
+    print(f"[count] hist_schedules {SEASON} W{changed_all}: {cnt_s:,}")
+    print(f"[count] hist_weekly   {SEASON} W{changed_all}: {cnt_w:,}")
+
+    if MART_REFRESH == "incremental":
+        refresh_changed(engine, {SEASON: changed_all})
+    else:
+        refresh_marts(engine)
+        build_aggregates(engine)
+    if PROFILE_DRIFT:
+        check_tables([t for t, w in changed.items() if w], eng=engine)
     print("\n✅ In-season load complete.")
 
 if __name__ == "__main__":
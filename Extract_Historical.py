@@ -1,32 +1,149 @@
-import os
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import pandas as pd
-import nfl_data_py as nfl
+import pyarrow.parquet as pq
 
 pd.set_option("display.max_columns", None)
 
 DATA_DIR = Path("data_historic")
-DATA_DIR.mkdir(exist_ok=True)
-
-SEASONS = list(range(2000, 2025))  
-
-print("Loading schedules...")
-schedules = nfl.import_schedules(SEASONS)
-print("schedules shape:", schedules.shape)
-schedules.to_parquet(DATA_DIR / "schedules_2000_2024.parquet", index=False)
-print("Schedules saved.\n")
-
-print("Loading weekly player stats...")
-weekly = nfl.import_weekly_data(SEASONS)
-print("weekly shape:", weekly.shape)
-weekly.to_parquet(DATA_DIR / "weekly_2000_2024.parquet", index=False)
-print("Weekly player stats saved.\n")
-
-print("Loading play-by-play (this will take the longest)...")
-for season in SEASONS:
-    print(f"  -> {season}")
-    pbp = nfl.import_pbp_data([season])
-    print("     shape:", pbp.shape)
-    pbp.to_parquet(DATA_DIR / f"pbp_{season}.parquet", index=False)
-
-print("\nAll data saved to:", DATA_DIR.resolve())
+MANIFEST = DATA_DIR / "manifest.json"
+
+SEASONS = list(range(2000, 2025))
+WORKERS = 4          # 1 = serial, in-process
+RETRIES = 2          # extra attempts per file before it is reported as failed
+SOURCE_DIR = None    # e.g. Path("nflverse_mirror") to extract from local parquet instead of the network
+
+class LocalSource:
+    """
+    Offline stand-in for nfl_data_py: serves the same frames from a directory laid out like
+    data_historic (schedules_*.parquet, weekly_*.parquet, pbp_{season}.parquet).
+    """
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _read(self, pattern: str, seasons) -> pd.DataFrame:
+        files = sorted(self.root.glob(pattern))
+        if not files:
+            raise FileNotFoundError(f"no {pattern} under {self.root}")
+        df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+        return df[df["season"].isin(list(seasons))].reset_index(drop=True)
+
+    def import_schedules(self, seasons):
+        return self._read("schedules_*.parquet", seasons)
+
+    def import_weekly_data(self, seasons):
+        return self._read("weekly_*.parquet", seasons)
+
+    def import_pbp_data(self, seasons):
+        return pd.concat([self._read(f"pbp_{s}.parquet", [s]) for s in seasons], ignore_index=True)
+
+def get_source(source_dir=None):
+    if source_dir:
+        return LocalSource(source_dir)
+    import nfl_data_py as nfl
+    return nfl
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_manifest() -> dict:
+    return json.loads(MANIFEST.read_text()) if MANIFEST.exists() else {}
+
+def save_manifest(manifest: dict):
+    tmp = MANIFEST.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp.replace(MANIFEST)
+
+def is_complete(path: Path, manifest: dict) -> bool:
+    """A file counts as done only if it exists and matches the row count and checksum recorded for it."""
+    entry = manifest.get(path.name)
+    if not entry or not path.exists():
+        return False
+    try:
+        rows = pq.ParquetFile(path).metadata.num_rows
+    except Exception:
+        return False
+    return rows == entry["rows"] and file_digest(path) == entry["sha256"]
+
+def extraction_tasks(seasons=SEASONS) -> list[tuple[str, str, list[int]]]:
+    """(file name, kind, seasons); schedules and weekly go first so they never wait behind PBP."""
+    tag = f"{seasons[0]}_{seasons[-1]}"
+    return (
+        [(f"schedules_{tag}.parquet", "schedules", list(seasons)),
+         (f"weekly_{tag}.parquet",    "weekly",    list(seasons))]
+        + [(f"pbp_{s}.parquet", "pbp", [s]) for s in seasons]
+    )
+
+def extract_one(kind: str, seasons: list[int], out_path: Path, source_dir=None, retries: int = RETRIES) -> dict:
+    """Pull one file (runs inside a worker process). Writes to a .part file first so a crash never leaves a half file."""
+    src = get_source(source_dir)
+    fetch = {
+        "schedules": src.import_schedules,
+        "weekly":    src.import_weekly_data,
+        "pbp":       src.import_pbp_data,
+    }[kind]
+    for attempt in range(retries + 1):
+        t0 = time.perf_counter()
+        try:
+            df = fetch(seasons)
+            tmp = out_path.with_suffix(".parquet.part")
+            df.to_parquet(tmp, index=False)
+            tmp.replace(out_path)
+            return {"rows": len(df), "cols": df.shape[1], "sha256": file_digest(out_path),
+                    "secs": round(time.perf_counter() - t0, 2), "attempts": attempt + 1}
+        except Exception as e:
+            if attempt == retries:
+                raise
+            print(f"  [retry] {out_path.name} attempt {attempt + 1} failed: {e}")
+            time.sleep(2 ** attempt)
+
+def main(seasons=SEASONS, workers=WORKERS, source_dir=SOURCE_DIR):
+    DATA_DIR.mkdir(exist_ok=True)
+    manifest = load_manifest()
+    todo, skipped = [], []
+    for name, kind, ss in extraction_tasks(seasons):
+        (skipped if is_complete(DATA_DIR / name, manifest) else todo).append((name, kind, ss))
+    print(f"[plan] {len(todo)} file(s) to extract, {len(skipped)} already complete, workers={workers}")
+
+    t0 = time.perf_counter()
+    done, failed = [], {}
+
+    def record(name, info):
+        manifest[name] = {k: info[k] for k in ("rows", "cols", "sha256")}
+        save_manifest(manifest)
+        done.append(name)
+        print(f"  -> {name}: {info['rows']:,} rows in {info['secs']}s (attempts={info['attempts']})")
+
+    if workers <= 1:
+        for name, kind, ss in todo:
+            try:
+                record(name, extract_one(kind, ss, DATA_DIR / name, source_dir))
+            except Exception as e:
+                failed[name] = repr(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(extract_one, kind, ss, DATA_DIR / name, source_dir): name for name, kind, ss in todo}
+            for fut in as_completed(futures):
+                name = futures[fut]
+                try:
+                    record(name, fut.result())
+                except Exception as e:
+                    failed[name] = repr(e)
+
+    print(f"\n[summary] extracted={len(done)} skipped={len(skipped)} failed={len(failed)} "
+          f"in {time.perf_counter() - t0:.1f}s")
+    for name, err in sorted(failed.items()):
+        print(f"  [failed] {name}: {err}")
+    print("All data saved to:", DATA_DIR.resolve())
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,198 @@
 # Script for populating DB w/ Docker connection PostgreSQL with initial historical data
-# No play by play data
+# Play by play is streamed per season into hist_pbp (column subset in PBP_COLUMNS)
+from __future__ import annotations
+import os
 from pathlib import Path
-import pandas as pd
-from sqlalchemy import create_engine, text
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from Bulk_Write import copy_batches, copy_parquet
+from Db_Conn import get_engine
+from Load_Manifest import bump_data_version, forget_seasons
+from Mart_Refresh import refresh_loaded
+from Partitions import (PARTITIONED, relkind, create_partitioned_table, migrate_plain_table,
+                        ensure_season_partitions, swap_partitions)
+from Table_Profile import check_tables
 
-DATA_DIR = Path(r"C:\Users\seanz\VSCode_WS\Sports\NFL_Analytics\data_historic")
+DATA_DIR = Path(os.environ.get("NFL_DATA_DIR", Path(__file__).resolve().parent / "data_historic"))
+# table -> file pattern under DATA_DIR (any season range, e.g. Synth_Data's schedules_2000_4499.parquet)
+SOURCES = {
+    "hist_schedules":        "schedules_*.parquet",
+    "hist_weekly":           "weekly_*.parquet",
+    "hist_rosters_seasonal": "rosters_seasonal_*.parquet",
+    "hist_rosters_weekly":   "rosters_weekly_*.parquet",
+}
+PROFILE_DRIFT = True   # profile hist_schedules/hist_weekly after the load into profiles/ and report drift
+REFRESH_MARTS = True   # bring the persisted marts up to date for the reloaded seasons (Mart_Refresh.refresh_loaded)
+MART_SOURCES = ("hist_schedules", "hist_weekly")   # the hist_* tables the marts read
 
-PG_USER = "SeanZahller"
-PG_PASS = "YvMiTe9!2"
-PG_HOST = "localhost"
-PG_PORT = 5432   
-PG_DB   = "nfl_warehouse"
+engine = get_engine()
+reloaded: set[int] = set()   # seasons of MART_SOURCES replaced, appended or dropped by this process
 
-engine = create_engine(f"postgresql+psycopg2://{PG_USER}:{PG_PASS}@{PG_HOST}:{PG_PORT}/{PG_DB}")
+PBP_TABLE = "hist_pbp"
+# Subset of the ~370 nflverse PBP columns kept in the warehouse, with narrowed types
+PBP_COLUMNS = {
+    "game_id": pa.string(), "play_id": pa.int32(), "season": pa.int16(), "week": pa.int16(),
+    "season_type": pa.string(), "game_date": pa.string(),
+    "home_team": pa.string(), "away_team": pa.string(), "posteam": pa.string(), "defteam": pa.string(),
+    "qtr": pa.int16(), "down": pa.int16(), "ydstogo": pa.int16(), "yardline_100": pa.int16(),
+    "game_seconds_remaining": pa.int16(), "score_differential": pa.int16(),
+    "posteam_score": pa.int16(), "defteam_score": pa.int16(),
+    "drive": pa.int16(), "fixed_drive": pa.int16(), "fixed_drive_result": pa.string(),
+    "play_type": pa.string(), "yards_gained": pa.int16(), "shotgun": pa.int16(), "no_huddle": pa.int16(),
+    "pass_attempt": pa.int16(), "complete_pass": pa.int16(), "interception": pa.int16(), "sack": pa.int16(),
+    "rush_attempt": pa.int16(), "touchdown": pa.int16(), "pass_touchdown": pa.int16(), "rush_touchdown": pa.int16(),
+    "first_down": pa.int16(), "third_down_converted": pa.int16(), "third_down_failed": pa.int16(),
+    "fourth_down_converted": pa.int16(), "fourth_down_failed": pa.int16(),
+    "penalty": pa.int16(), "fumble_lost": pa.int16(),
+    "field_goal_result": pa.string(), "kick_distance": pa.int16(),
+    "air_yards": pa.float32(), "yards_after_catch": pa.float32(),
+    "ep": pa.float32(), "epa": pa.float32(), "wp": pa.float32(), "wpa": pa.float32(), "success": pa.int16(),
+    "passer_player_id": pa.string(), "rusher_player_id": pa.string(), "receiver_player_id": pa.string(),
+}
+
+def source_file(table: str, data_dir: Path = DATA_DIR) -> Path | None:
+    """The one file matching SOURCES[table] in `data_dir`; None if there is none, ValueError if ambiguous."""
+    files = sorted(Path(data_dir).glob(SOURCES[table]))
+    if len(files) > 1:
+        raise ValueError(f"{len(files)} files match {SOURCES[table]} in {data_dir}: {[f.name for f in files]}")
+    return files[0] if files else None
 
 def load_parquet(table: str, file_path: Path, if_exists="replace", chunksize=100_000):
     if not file_path.exists():
         print(f"[skip] {file_path.name} not found")
         return
     print(f"[load] {file_path.name} -> {table}")
-    df = pd.read_parquet(file_path)
-    if df.empty:
+    if pq.ParquetFile(file_path).metadata.num_rows == 0:
         print(f"[skip] {file_path.name} is empty")
         return
-    df.to_sql(table, engine, if_exists=if_exists, index=False, method="multi", chunksize=chunksize)
-    print(f"[done] {table}: {len(df):,} rows")
+    if table in PARTITIONED:
+        rows = load_partitioned(table, file_path, if_exists=if_exists, chunksize=chunksize)
+    else:
+        rows = copy_parquet(engine, table, file_path, if_exists=if_exists, batch_rows=chunksize)
+        _bump(table)   # COPY commits on its own; bump right after it
+    print(f"[done] {table}: {rows:,} rows")
+    return rows
+
+def _prepare_partitioned(table: str, empty) -> str:
+    """Make sure the partitioned parent exists and return a fresh, empty shadow table to COPY into."""
+    spec = PARTITIONED[table]
+    shadow = f"{table}__load"
+    with engine.begin() as con:
+        kind = relkind(con, table)
+        if kind == "r":
+            migrate_plain_table(con, table, empty, spec)
+        elif kind is None:
+            create_partitioned_table(con, table, empty, spec)
+        con.execute(text(f"DROP TABLE IF EXISTS {shadow}"))
+        create_partitioned_table(con, shadow, empty, spec)
+    return shadow
+
+def _bump(table: str):
+    with engine.begin() as con:
+        bump_data_version(con, f"Load_Historical {table}")
+
+def _swap_in(table: str, shadow: str, seasons):
+    """Swap the shadow partitions in; the data version is bumped in the same transaction."""
+    with engine.begin() as con:
+        dropped = swap_partitions(con, table, shadow, seasons)
+        forget_seasons(con, table, list(seasons) + dropped)   # ETL_InSzn re-checks those weeks next run
+        con.execute(text(f"DROP TABLE {shadow}"))
+        bump_data_version(con, f"Load_Historical {table}")
+        con.execute(text(f"ANALYZE {table}"))
+    if table in MART_SOURCES:
+        reloaded.update(int(s) for s in list(seasons) + dropped)
+    print(f"[partition] {table}: swapped in {len(seasons)} season partitions")
+
+def load_partitioned(table: str, file_path: Path, if_exists="replace", chunksize=100_000) -> int:
+    """
+    Season range-partitioned load. `replace` COPYs into a shadow partitioned table and swaps the
+    season partitions in, so the parent (and every view on it) is never dropped.
+    """
+    empty = pq.ParquetFile(file_path).schema_arrow.empty_table().to_pandas()
+    seasons = pc.unique(pq.read_table(file_path, columns=["season"]).column("season")).to_pylist()
+    shadow = _prepare_partitioned(table, empty)
+
+    if if_exists == "append":
+        with engine.begin() as con:
+            con.execute(text(f"DROP TABLE {shadow}"))
+            ensure_season_partitions(con, table, seasons)
+        rows = copy_parquet(engine, table, file_path, if_exists="append", batch_rows=chunksize)
+        _bump(table)
+        if table in MART_SOURCES:
+            reloaded.update(int(s) for s in seasons)
+        return rows
+
+    with engine.begin() as con:
+        ensure_season_partitions(con, shadow, seasons)
+    rows = copy_parquet(engine, shadow, file_path, if_exists="append", batch_rows=chunksize)
+    _swap_in(table, shadow, seasons)
+    return rows
+
+def _narrow(arr: pa.Array, typ: pa.DataType) -> pa.Array:
+    if pa.types.is_floating(arr.type) and pa.types.is_integer(typ):
+        arr = pc.if_else(pc.is_nan(arr), pa.scalar(None, arr.type), arr)
+    return arr.cast(typ)
+
+def pbp_batches(file_path: Path, batch_rows: int = 50_000):
+    """Row-group batches of one PBP season, projected to PBP_COLUMNS and narrowed; absent columns become NULL."""
+    pf = pq.ParquetFile(file_path)
+    present = [c for c in PBP_COLUMNS if c in pf.schema_arrow.names]
+    for b in pf.iter_batches(batch_size=batch_rows, columns=present):
+        yield pa.RecordBatch.from_arrays(
+            [_narrow(b.column(c), t) if c in present else pa.nulls(b.num_rows, t) for c, t in PBP_COLUMNS.items()],
+            names=list(PBP_COLUMNS),
+        )
+
+def load_pbp(data_dir: Path = DATA_DIR, batch_rows: int = 50_000) -> int:
+    """Stream every pbp_{season}.parquet into the season-partitioned hist_pbp; memory stays at one batch."""
+    files = sorted(data_dir.glob("pbp_*.parquet"))
+    if not files:
+        print(f"[skip] no pbp_*.parquet files in {data_dir}")
+        return 0
+    seasons = [int(f.stem.split("_")[1]) for f in files]
+    empty = pa.schema(list(PBP_COLUMNS.items())).empty_table().to_pandas()
+    shadow = _prepare_partitioned(PBP_TABLE, empty)
+    with engine.begin() as con:
+        ensure_season_partitions(con, shadow, seasons)
+    rows = 0
+    for f in files:
+        print(f"[load] {f.name} -> {PBP_TABLE}")
+        rows += copy_batches(engine, shadow, pbp_batches(f, batch_rows), empty, if_exists="append")
+    _swap_in(PBP_TABLE, shadow, seasons)
+    print(f"[done] {PBP_TABLE}: {rows:,} rows")
+    return rows
 
 def main():
     with engine.begin() as con:
         ver = con.execute(text("select version()")).scalar()
         print("Connected to:", ver)
 
-    load_parquet("hist_schedules", DATA_DIR / "schedules_2000_2024.parquet", if_exists="replace")
-    load_parquet("hist_weekly",    DATA_DIR / "weekly_2000_2024.parquet",    if_exists="replace")
-    load_parquet("hist_rosters_seasonal", DATA_DIR / "rosters_seasonal_2000_2024.parquet", if_exists="replace")
-    load_parquet("hist_rosters_weekly",   DATA_DIR / "rosters_weekly_available_years.parquet", if_exists="replace")
+    print("Data dir:", DATA_DIR)
+    for table, pattern in SOURCES.items():
+        f = source_file(table)
+        if f is None:
+            print(f"[skip] no {pattern} in {DATA_DIR}")
+            continue
+        load_parquet(table, f, if_exists="replace")
+    load_pbp(DATA_DIR)
 
-    with engine.begin() as con:
-        for t in ["hist_schedules","hist_weekly","hist_rosters_seasonal","hist_rosters_weekly"]:
-            try:
+    for t in ["hist_schedules","hist_weekly","hist_rosters_seasonal","hist_rosters_weekly",PBP_TABLE]:
+        try:
+            with engine.connect() as con:
                 cnt = con.execute(text(f"select count(*) from {t}")).scalar()
-                print(f"[count] {t}: {cnt:,}")
-            except Exception as e:
-                print(f"[count] {t}: (missing) {e}")
+            print(f"[count] {t}: {cnt:,}")
+        except Exception as e:
+            print(f"[count] {t}: (missing) {type(e).__name__}")
+
+    if REFRESH_MARTS and reloaded:
+        refresh_loaded(engine, sorted(reloaded))
+
+    if PROFILE_DRIFT:
+        check_tables(["hist_schedules", "hist_weekly"], eng=engine)
 
-    print("\n✅ Historical load complete (no PBP).")
+    print("\n✅ Historical load complete.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
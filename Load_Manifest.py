@@ -0,0 +1,109 @@
+# Per-(table, season, week) content hashes of what ETL_InSzn last wrote, so unchanged weeks are skipped,
+# and the data-version counter every loader bumps when it commits
+from __future__ import annotations
+import polars as pl
+from sqlalchemy import text
+
+MANIFEST_TABLE = "etl_load_manifest"
+HASH_SEED = 0   # polars row hashes are only stable within a polars version; an upgrade reloads each week once
+
+DDL_MANIFEST = f"""
+CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE}(
+  table_name   text NOT NULL,
+  season       int  NOT NULL,
+  week         int  NOT NULL,
+  content_hash text NOT NULL,
+  row_count    int  NOT NULL,
+  loaded_at    timestamptz NOT NULL DEFAULT now(),
+  PRIMARY KEY (table_name, season, week)
+);
+"""
+
+def week_hashes(df: pl.DataFrame, week_col: str = "week") -> dict[int, str]:
+    """
+    {week: hash} over every row of each week, independent of row order. Row hashes are summed in two
+    32-bit halves (no u64 overflow) and combined with the row count.
+    """
+    if df.is_empty():
+        return {}
+    h = df.hash_rows(seed=HASH_SEED)
+    agg = (
+        pl.DataFrame({"week": df[week_col].cast(pl.Int64), "h": h})
+        .group_by("week")
+        .agg(
+            pl.len().alias("rows"),
+            (pl.col("h") // (1 << 32)).sum().alias("hi"),
+            (pl.col("h") % (1 << 32)).sum().alias("lo"),
+        )
+    )
+    return {w: f"{n}:{hi:x}:{lo:x}" for w, n, hi, lo in agg.iter_rows()}
+
+def stored_hashes(con, table: str, season: int) -> dict[int, str]:
+    """
+    Manifest hashes for one season, minus any week whose recorded row_count no longer matches the
+    table (rows removed or replaced behind the manifest's back), so that week is written again.
+    """
+    con.execute(text(DDL_MANIFEST))
+    rows = con.execute(text(f"""
+        SELECT week, content_hash, row_count FROM {MANIFEST_TABLE} WHERE table_name = :t AND season = :s
+    """), {"t": table, "s": int(season)}).fetchall()
+    if not rows:
+        return {}
+    actual = {}
+    if con.execute(text("SELECT to_regclass(:t)"), {"t": table}).scalar():
+        actual = dict(con.execute(text(f"SELECT week, COUNT(*) FROM {table} WHERE season = :s GROUP BY week"),
+                                  {"s": int(season)}).fetchall())
+    stale = sorted(w for w, _, n in rows if actual.get(w, 0) != n)
+    if stale:
+        print(f"[manifest] {table} {season}: week(s) {stale} no longer match the table; reloading them")
+    return {w: h for w, h, n in rows if w not in stale}
+
+def changed_weeks(new: dict[int, str], old: dict[int, str]) -> list[int]:
+    return sorted(w for w, h in new.items() if old.get(w) != h)
+
+def record_hashes(con, table: str, season: int, hashes: dict[int, str]):
+    """Upsert the manifest rows; call inside the transaction that wrote the weeks."""
+    if not hashes:
+        return
+    con.execute(text(f"""
+        INSERT INTO {MANIFEST_TABLE}(table_name, season, week, content_hash, row_count)
+        VALUES (:t, :s, :w, :h, :n)
+        ON CONFLICT (table_name, season, week) DO UPDATE
+          SET content_hash = EXCLUDED.content_hash, row_count = EXCLUDED.row_count, loaded_at = now()
+    """), [{"t": table, "s": int(season), "w": int(w), "h": h, "n": int(h.split(":")[0])} for w, h in hashes.items()])
+
+def forget_seasons(con, table: str, seasons) -> int:
+    """Drop the manifest rows of seasons a reload replaced or removed; call in that reload's transaction."""
+    seasons = [int(x) for x in seasons]
+    if not seasons:
+        return 0
+    con.execute(text(DDL_MANIFEST))
+    return con.execute(text(f"DELETE FROM {MANIFEST_TABLE} WHERE table_name = :t AND season = ANY(:s)"),
+                       {"t": table, "s": seasons}).rowcount
+
+# Single-row counter bumped by every loader commit; readers (Query_Service) key cached results on it
+VERSION_TABLE = "etl_data_version"
+
+DDL_VERSION = f"""
+CREATE TABLE IF NOT EXISTS {VERSION_TABLE}(
+  id         int PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+  version    bigint NOT NULL,
+  source     text,
+  bumped_at  timestamptz NOT NULL DEFAULT now()
+);
+"""
+
+def bump_data_version(con, source: str) -> int:
+    """Increment the data version inside the transaction that writes the new data (right after it only where the write commits on its own)."""
+    con.execute(text(DDL_VERSION))
+    return con.execute(text(f"""
+        INSERT INTO {VERSION_TABLE}(id, version, source) VALUES (1, 1, :src)
+        ON CONFLICT (id) DO UPDATE
+          SET version = {VERSION_TABLE}.version + 1, source = EXCLUDED.source, bumped_at = now()
+        RETURNING version
+    """), {"src": source}).scalar()
+
+def data_version(con) -> int:
+    if not con.execute(text("SELECT to_regclass(:t)"), {"t": VERSION_TABLE}).scalar():
+        return 0
+    return con.execute(text(f"SELECT COALESCE(MAX(version), 0) FROM {VERSION_TABLE}")).scalar()
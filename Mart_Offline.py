@@ -0,0 +1,151 @@
+# Offline mart build: runs the same mart SQL on an embedded DuckDB over data_historic/*.parquet
+# and writes every mart view out as parquet -- no Postgres round trip needed.
+from __future__ import annotations
+import datetime as dt
+import decimal
+import importlib.util
+import numbers
+import re
+import time
+from pathlib import Path
+import duckdb
+import pandas as pd
+import Coach_Dim
+import Def_Rank
+import Position_Stats
+import Primary_QB
+import Rolling_Features
+import Splits
+import Team_Ranks
+import Team_Strength
+
+ROOT = Path(__file__).resolve().parent
+DATA_DIR = ROOT / "data_historic"
+OUT_DIR = ROOT / "mart_parquet"
+CHECK_PARITY = False   # also compare every view against the Postgres marts
+RTOL = 1e-6
+
+SOURCES = {
+    "hist_schedules": "schedules_*.parquet",
+    "hist_weekly":    "weekly_*.parquet",
+}
+
+def _load_script(stem: str):
+    """Import one of the CreateSQLView-*.py scripts (hyphenated, so not importable by name) for its SQL."""
+    spec = importlib.util.spec_from_file_location(stem.replace("-", "_"), ROOT / f"{stem}.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def _duckdb_sql(sql: str) -> str:
+    """Strip the Postgres-only statements (transaction wrappers, matview drops) from a build script."""
+    sql = re.sub(r"(?im)^\s*(BEGIN|COMMIT);\s*$", "", sql)
+    return re.sub(r"(?i)DROP MATERIALIZED VIEW IF EXISTS [\w.]+;", "", sql)
+
+def mart_scripts(weekly_cols) -> list[tuple[str, str]]:
+    """(label, SQL) in build order, taken from the CreateSQLView scripts."""
+    ts  = _load_script("CreateSQLView-TeamStats")
+    qb  = _load_script("CreateSQLView-QBnCoachStats")
+    pos = _load_script("CreateSQLView-Positions")
+    rk  = _load_script("CreateSQLView-TeamRankings")
+    return [
+        ("team strength",  Team_Strength.SQL_STRENGTH_DDL + Team_Strength.strength_build_sql()),
+        ("team base",      ts.base_marts_sql("view")),
+        ("splits fact",    Splits.SQL_FACT_DDL),
+        ("team splits",    ts.SQL_BUILD),
+        ("primary qb",     Primary_QB.DDL_PRIMARY_QB + Primary_QB.primary_qb_build_sql()),
+        ("qb",             qb.SQL_QB),
+        ("coach dim",      f"CREATE OR REPLACE TABLE {Coach_Dim.DIM} AS {Coach_Dim.coach_select_sql()};"),
+        ("coach",          qb.SQL_COACH_VIEWS),
+        ("splits build",   Splits.fact_build_sql()),
+        ("player games",   pos.build_v_player_games_sql(weekly_cols)),
+        ("features",       f"CREATE OR REPLACE TABLE {Rolling_Features.FEATURES} AS {Rolling_Features.features_select_sql()};"),
+        ("position stats", f"CREATE OR REPLACE TABLE {Position_Stats.FACT} AS {Position_Stats.fact_select_sql()};"),
+        ("position marts", pos.MARTS_SQL),
+        ("def ranks",      f"CREATE OR REPLACE TABLE {Def_Rank.DEF_RANK} AS {Def_Rank.def_rank_select_sql()};"
+                           + Def_Rank.SQL_DEF_RANK_VIEWS),
+        ("weekly ranks",   f"CREATE OR REPLACE TABLE {Team_Ranks.RANKS} AS {Team_Ranks.ranks_select_sql()};"
+                           + rk.SQL_RANKS),
+    ]
+
+def build(data_dir: Path = DATA_DIR, con=None):
+    """Register the parquet sources and create every mart view inside DuckDB."""
+    con = con or duckdb.connect()
+    for table, pattern in SOURCES.items():
+        files = sorted(str(f) for f in Path(data_dir).glob(pattern))
+        if not files:
+            raise FileNotFoundError(f"no {pattern} under {data_dir}")
+        con.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM read_parquet({files}, union_by_name=true)")
+    weekly_cols = [r[0] for r in con.execute("DESCRIBE hist_weekly").fetchall()]
+    for label, sql in mart_scripts(weekly_cols):
+        con.execute(_duckdb_sql(sql))
+        print(f"[duckdb] {label}: ok")
+    return con
+
+def mart_views(con) -> list[str]:
+    rows = con.execute("""
+        SELECT view_name FROM duckdb_views()
+        WHERE schema_name = 'mart' AND NOT internal
+        ORDER BY view_name
+    """).fetchall()
+    return [r[0] for r in rows]
+
+def write_parquet(con, out_dir: Path = OUT_DIR) -> dict[str, int]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    for v in mart_views(con):
+        t0 = time.perf_counter()
+        path = out_dir / f"{v}.parquet"
+        con.execute(f"COPY (SELECT * FROM mart.{v}) TO '{path.as_posix()}' (FORMAT parquet)")
+        counts[v] = con.execute(f"SELECT COUNT(*) FROM read_parquet('{path.as_posix()}')").fetchone()[0]
+        print(f"[out] {v}: {counts[v]:,} rows in {time.perf_counter() - t0:.2f}s")
+    return counts
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Bring Postgres and DuckDB results to comparable pandas types (Decimal, time, date differ by driver)."""
+    df = df.copy()
+    for c in df.columns:
+        s = df[c].dropna()
+        if s.empty:
+            df[c] = df[c].astype(object).where(df[c].notna(), None)
+            continue
+        first = s.iloc[0]
+        if isinstance(first, (decimal.Decimal, numbers.Number)) and not isinstance(first, bool):   # numpy ints from nullable columns too
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype(float).round(6)
+        elif isinstance(first, (dt.time, dt.date, pd.Timestamp)):
+            df[c] = df[c].astype(str)
+    return df.sort_values(list(df.columns), na_position="last").reset_index(drop=True)
+
+def parity_check(con, engine, views=None) -> dict[str, str]:
+    """Compare each DuckDB mart view with the same view in Postgres; returns {view: problem} for mismatches."""
+    from sqlalchemy import text
+    problems = {}
+    for v in views or mart_views(con):
+        local = con.execute(f"SELECT * FROM mart.{v}").df()
+        with engine.connect() as pg:
+            remote = pd.read_sql(text(f"SELECT * FROM mart.{v}"), pg)
+        if list(local.columns) != list(remote.columns):
+            problems[v] = f"columns differ: {sorted(set(local.columns) ^ set(remote.columns))}"
+        elif len(local) != len(remote):
+            problems[v] = f"row count {len(local):,} vs {len(remote):,}"
+        else:
+            try:
+                pd.testing.assert_frame_equal(_normalize(local), _normalize(remote),
+                                              check_dtype=False, check_exact=False, rtol=RTOL)
+            except AssertionError as e:
+                problems[v] = str(e).splitlines()[0]
+        print(f"[parity] {v}: {'OK' if v not in problems else 'MISMATCH ' + problems[v]}")
+    return problems
+
+def main():
+    t0 = time.perf_counter()
+    con = build()
+    write_parquet(con)
+    print(f"\n✅ Offline marts written to {OUT_DIR} in {time.perf_counter() - t0:.1f}s")
+    if CHECK_PARITY:
+        from Db_Conn import get_engine
+        problems = parity_check(con, get_engine())
+        print("✅ Parity OK" if not problems else f"❌ {len(problems)} view(s) differ from Postgres")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# Dependency-aware refresh of the materialized mart layer (see MART_MODE in CreateSQLView-TeamStats.py)
+from __future__ import annotations
+import time
+from graphlib import TopologicalSorter
+from sqlalchemy import text
+from Db_Conn import get_engine
+import Coach_Dim
+import Primary_QB
+import Position_Stats
+import Splits
+from Def_Rank import DEF_RANK, rebuild_def_rank, refresh_def_rank
+from Load_Manifest import bump_data_version
+from Position_Stats import rebuild_position_stats, refresh_position_seasons
+from Rolling_Features import rebuild_features, refresh_features
+from Splits import rebuild_fact, refresh_fact_seasons
+from Team_Ranks import RANKS, refresh_weekly_ranks
+from Team_Strength import STRENGTH, refresh_strength
+
+engine = get_engine()
+
+def _exists(con, rel: str) -> bool:
+    return con.execute(text("SELECT to_regclass(:r)"), {"r": rel}).scalar() is not None
+
+# view/matview -> view/matview edges recorded by the rewrite rules
+SQL_VIEW_EDGES = """
+SELECT DISTINCT child.oid::regclass::text AS child, parent.oid::regclass::text AS parent
+FROM pg_depend d
+JOIN pg_rewrite r    ON r.oid = d.objid
+JOIN pg_class child  ON child.oid = r.ev_class
+JOIN pg_class parent ON parent.oid = d.refobjid
+WHERE d.classid = 'pg_rewrite'::regclass
+  AND d.refclassid = 'pg_class'::regclass
+  AND child.oid <> parent.oid
+  AND child.relkind IN ('v','m')
+  AND parent.relkind IN ('v','m')
+"""
+
+SQL_MATVIEWS = """
+SELECT c.oid::regclass::text AS name,
+       m.ispopulated,
+       EXISTS (
+         SELECT 1 FROM pg_index i
+         WHERE i.indrelid = c.oid AND i.indisunique AND i.indpred IS NULL
+       ) AS has_unique
+FROM pg_matviews m
+JOIN pg_class c ON c.relname = m.matviewname
+JOIN pg_namespace n ON n.oid = c.relnamespace AND n.nspname = m.schemaname
+WHERE m.schemaname = :schema
+"""
+
+def matview_refresh_order(con, schema: str = "mart") -> list[tuple[str, bool, bool]]:
+    """
+    Materialized views in `schema` ordered so every matview is refreshed after the matviews it reads,
+    following dependencies through any plain views in between.
+    Returns (name, ispopulated, has_unique_index) tuples.
+    """
+    mvs = {r.name: (r.ispopulated, r.has_unique)
+           for r in con.execute(text(SQL_MATVIEWS), {"schema": schema})}
+    parents: dict[str, set[str]] = {}
+    for child, parent in con.execute(text(SQL_VIEW_EDGES)):
+        parents.setdefault(child, set()).add(parent)
+
+    def upstream_mvs(rel: str, seen: set[str]) -> set[str]:
+        found = set()
+        for p in parents.get(rel, ()):
+            if p in seen:
+                continue
+            seen.add(p)
+            if p in mvs:
+                found.add(p)
+            else:
+                found |= upstream_mvs(p, seen)
+        return found
+
+    graph = {mv: upstream_mvs(mv, set()) for mv in mvs}
+    return [(mv, *mvs[mv]) for mv in TopologicalSorter(graph).static_order()]
+
+def refresh_marts(eng=None, concurrently: bool = True, schema: str = "mart") -> list[str]:
+    """
+    Refresh every materialized view in `schema` in dependency order, one commit per view.
+    CONCURRENTLY is used whenever the view is populated and has a unique index, so readers never block.
+    """
+    eng = eng or engine
+    with eng.connect() as con:
+        order = matview_refresh_order(con, schema)
+    if not order:
+        print(f"[refresh] no materialized views in schema {schema}")
+        return []
+
+    for name, populated, has_unique in order:
+        conc = concurrently and populated and has_unique
+        t0 = time.perf_counter()
+        with eng.begin() as con:
+            con.execute(text(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if conc else ''}{name}"))
+            con.execute(text(f"ANALYZE {name}"))
+            bump_data_version(con, f"refresh_marts {name}")   # each view commits on its own
+        print(f"[refresh] {name}{' (concurrently)' if conc else ''}: {time.perf_counter()-t0:.2f}s")
+    return [o[0] for o in order]
+
+# Splits live in mart.fact_splits (Splits.py) and position stats in mart.fact_position_stats
+# (Position_Stats.py); the per-view agg_* copies they replaced are dropped
+RETIRED_AGGREGATES = [
+    "team_season_splits", "team_alltime_splits", "qb_season_splits", "qb_alltime_splits",
+    "coach_season_splits", "coach_alltime_splits",
+    "rb_season_stats", "rb_alltime_stats", "wr_season_stats", "wr_alltime_stats",
+    "te_season_stats", "te_alltime_stats", "qb_stats_season", "qb_stats_alltime",
+]
+
+def build_aggregates(eng=None):
+    """Fully repopulate the persisted fact/feature tables the mart views read."""
+    eng = eng or engine
+    with eng.begin() as con:
+        for name in RETIRED_AGGREGATES:
+            con.execute(text(f"DROP TABLE IF EXISTS mart.agg_{name}"))
+        rebuild_fact(con)
+        rebuild_position_stats(con)
+        rebuild_features(con)
+        rebuild_def_rank(con)
+        bump_data_version(con, "build_aggregates")
+
+def refresh_seasons(eng=None, seasons: list[int] = ()):
+    """
+    Incremental maintenance for the given seasons, in one transaction: each fact table deletes and
+    recomputes its per-season rows (the season filter is pushed down to hist_schedules/hist_weekly),
+    then re-rolls only the all-time rows of entities that appeared in those seasons.
+    Season is the smallest safe grain: a new week can flip opp_is_500_plus for every game that season.
+    """
+    eng = eng or engine
+    seasons = sorted({int(s) for s in seasons})
+    if not seasons:
+        return
+    with eng.begin() as con:
+        if _exists(con, Splits.FACT):
+            refresh_fact_seasons(con, seasons)
+        if _exists(con, Position_Stats.FACT):
+            refresh_position_seasons(con, seasons)
+        bump_data_version(con, f"refresh_seasons {seasons}")
+
+def refresh_changed(eng=None, changes: dict[int, list[int]] | None = None):
+    """
+    Entry point for loaders: refresh the materialized base, then only the seasons that changed,
+    and rewrite the rolling features and defensive ranks from the first changed week of each season.
+    """
+    eng = eng or engine
+    changes = changes or {}
+    print(f"[refresh] changed (season: weeks): {changes}")
+    refresh_marts(eng)
+    refresh_seasons(eng, list(changes))
+    with eng.begin() as con:
+        rolled = set()   # seasons refresh_features already re-extended behind an earlier one
+        for season, weeks in sorted(changes.items()):
+            if weeks:
+                if season not in rolled:
+                    rolled.update(refresh_features(con, season, weeks))
+                if _exists(con, DEF_RANK):
+                    refresh_def_rank(con, season, weeks)
+        bump_data_version(con, f"refresh_changed {changes}")
+
+def refresh_loaded(eng=None, seasons: list[int] = ()):
+    """
+    Entry point for Load_Historical: after whole seasons were replaced (or dropped), bring every persisted
+    mart that exists up to date for them -- opponent strength, weekly ranks and the QB/coach dimensions in
+    one transaction, then the matviews, facts, features and defensive ranks via refresh_changed.
+    A no-op until the CreateSQLView scripts have built the marts.
+    """
+    eng = eng or engine
+    seasons = sorted({int(s) for s in seasons})
+    if not seasons:
+        return
+    with eng.begin() as con:
+        if not _exists(con, "mart.v_team_games_enriched"):
+            print("[refresh] marts not built yet; run the CreateSQLView scripts")
+            return
+        if _exists(con, STRENGTH):
+            refresh_strength(con, seasons)
+        for s in seasons:
+            if _exists(con, RANKS):
+                refresh_weekly_ranks(con, s, [0])
+            if _exists(con, Primary_QB.DIM):
+                weeks = [r[0] for r in con.execute(text(f"""
+                    SELECT week FROM {Primary_QB.DIM} WHERE season = :s
+                    UNION SELECT DISTINCT week::int FROM hist_weekly WHERE season = :s ORDER BY 1
+                """), {"s": s})]
+                if weeks:
+                    Primary_QB.refresh_primary_qb(con, s, weeks)
+            if _exists(con, Coach_Dim.DIM):
+                Coach_Dim.refresh_coach_dim(con, s, prune=True)
+        bump_data_version(con, f"refresh_loaded {seasons}")
+    refresh_changed(eng, {s: [0] for s in seasons})
+
+if __name__ == "__main__":
+    refresh_marts()
+    build_aggregates()
+    print("\n✅ Mart refresh complete.")
@@ -0,0 +1,160 @@
+# Season range-partitioned layout for the hist_* tables (created by Load_Historical, written by ETL_InSzn)
+from __future__ import annotations
+import pandas as pd
+from sqlalchemy import text
+
+# table -> primary key + secondary indexes the marts join/filter on (all partitioned BY RANGE (season))
+PARTITIONED = {
+    "hist_schedules": {
+        "pk": ["season", "game_id"],
+        "indexes": [["season", "week"], ["game_id"]],
+    },
+    "hist_weekly": {
+        "pk": ["season", "week", "player_id"],
+        "indexes": [["season", "week", "recent_team"], ["season", "week", "opponent_team"], ["player_id"]],
+    },
+    "hist_pbp": {
+        "pk": ["season", "game_id", "play_id"],
+        "indexes": [["season", "week", "posteam"], ["season", "week", "defteam"], ["game_id", "fixed_drive"]],
+    },
+}
+
+def partition_name(table: str, season: int) -> str:
+    return f"{table}_{int(season)}"
+
+def relkind(con, table: str) -> str | None:
+    """'p' partitioned, 'r' plain table, None if missing."""
+    return con.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}).scalar()
+
+def partition_seasons(con, table: str) -> list[int]:
+    rows = con.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:t)
+    """), {"t": table}).fetchall()
+    prefix = f"{table}_"
+    return sorted(int(r[0][len(prefix):]) for r in rows if r[0][len(prefix):].isdigit())
+
+def create_partitioned_table(con, table: str, empty: pd.DataFrame, spec: dict):
+    """Parent table with the pandas/to_sql type mapping, PK and indexes; partitions are added per season."""
+    ddl = pd.io.sql.get_schema(empty, table, keys=spec["pk"], con=con)
+    con.execute(text(f"{ddl} PARTITION BY RANGE (season)"))
+    for cols in spec["indexes"]:
+        con.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{'_'.join(cols)} ON {table} ({', '.join(cols)})"))
+
+def ensure_season_partitions(con, table: str, seasons):
+    """Create missing season partitions (no-op for plain tables)."""
+    if relkind(con, table) != "p":
+        return
+    missing = sorted({int(s) for s in seasons} - set(partition_seasons(con, table)))
+    for s in missing:
+        con.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {partition_name(table, s)}
+            PARTITION OF {table} FOR VALUES FROM ({s}) TO ({s + 1})
+        """))
+    if missing:
+        print(f"[partition] {table}: created {len(missing)} partition(s) {missing[0]}–{missing[-1]}")
+
+def swap_partitions(con, table: str, shadow: str, seasons, prune: bool = False) -> list[int]:
+    """
+    Move each season partition of `shadow` into `table`, replacing the old partition. Seasons missing
+    from `seasons` are dropped only inside its min–max range (gaps in the source); partitions outside
+    it, e.g. the in-season weeks ETL_InSzn wrote, are kept unless `prune`. Returns the seasons dropped.
+    The parent is never dropped, so dependent views survive. A CHECK matching the bounds is added
+    before ATTACH so Postgres skips the validation scan.
+    """
+    seasons = sorted({int(s) for s in seasons})
+    for s in seasons:
+        old, new = partition_name(table, s), partition_name(shadow, s)
+        chk = f"{old}_bounds"
+        con.execute(text(f"ALTER TABLE {shadow} DETACH PARTITION {new}"))
+        con.execute(text(f"ALTER TABLE {new} ADD CONSTRAINT {chk} CHECK (season >= {s} AND season < {s + 1})"))
+        if s in partition_seasons(con, table):
+            con.execute(text(f"ALTER TABLE {table} DETACH PARTITION {old}"))
+            con.execute(text(f"DROP TABLE {old}"))
+        con.execute(text(f"ALTER TABLE {new} RENAME TO {old}"))
+        for (idx,) in con.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = :t"), {"t": old}).fetchall():
+            if idx.startswith(new):
+                con.execute(text(f"ALTER INDEX {idx} RENAME TO {old + idx[len(new):]}"))
+        con.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {old} FOR VALUES FROM ({s}) TO ({s + 1})"))
+        con.execute(text(f"ALTER TABLE {old} DROP CONSTRAINT {chk}"))
+    dropped, kept = [], []
+    for s in sorted(set(partition_seasons(con, table)) - set(seasons)):
+        if prune or (seasons and seasons[0] < s < seasons[-1]):
+            con.execute(text(f"DROP TABLE {partition_name(table, s)}"))
+            dropped.append(s)
+        else:
+            kept.append(s)
+    if dropped:
+        print(f"[partition] {table}: dropped season(s) {dropped} (not in source)")
+    if kept:
+        print(f"[partition] {table}: kept season(s) {kept} outside the source range")
+    return dropped
+
+def dependent_views(con, table: str) -> list[str]:
+    """Views and materialized views that select from `table` directly."""
+    rows = con.execute(text("""
+        SELECT DISTINCT v.oid::regclass::text
+        FROM pg_depend d
+        JOIN pg_rewrite r ON r.oid = d.objid
+        JOIN pg_class v ON v.oid = r.ev_class
+        WHERE d.refobjid = to_regclass(:t) AND v.oid <> d.refobjid
+    """), {"t": table}).fetchall()
+    return sorted(r[0] for r in rows)
+
+def migrate_plain_table(con, table: str, empty: pd.DataFrame, spec: dict):
+    """
+    Convert a legacy plain `table` into the partitioned layout, keeping its rows: rename it aside,
+    create the partitioned parent, copy the shared columns over and drop the old table. Rows the new
+    primary key cannot hold (a NULL key column, or a repeat of a key already copied) are moved to
+    `{table}__rejects` and reported, and the counts must add up before the old table is dropped.
+    Refuses (RuntimeError) while views still depend on it; nothing is ever dropped with CASCADE.
+    """
+    deps = dependent_views(con, table)
+    if deps:
+        raise RuntimeError(
+            f"{table} is a plain table with {len(deps)} dependent view(s) ({', '.join(deps[:5])}"
+            f"{'...' if len(deps) > 5 else ''}). Drop those views, re-run the load to partition {table}, "
+            f"then re-run the CreateSQLView scripts.")
+    legacy = f"{table}__plain"
+    con.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    create_partitioned_table(con, table, empty, spec)
+    seasons = [r[0] for r in con.execute(text(f"SELECT DISTINCT season FROM {legacy} WHERE season IS NOT NULL"))]
+    ensure_season_partitions(con, table, seasons)
+    old_cols = {r[0] for r in con.execute(text(
+        "SELECT column_name FROM information_schema.columns WHERE table_schema = 'public' AND table_name = :t"
+    ), {"t": legacy})}
+    cols = ", ".join(f'"{c}"' for c in empty.columns if c in old_cols)
+    pk = ", ".join(f'"{c}"' for c in spec["pk"])
+    has_key = " AND ".join(f'"{c}" IS NOT NULL' for c in spec["pk"])
+    # first row (physical order) of every key; everything else is a reject
+    con.execute(text(f"""
+        CREATE TEMP TABLE _migrate_keep ON COMMIT DROP AS
+        SELECT DISTINCT ON ({pk}) ctid AS rid FROM {legacy} WHERE {has_key} ORDER BY {pk}, ctid
+    """))
+    total, null_key, keep = con.execute(text(f"""
+        SELECT (SELECT COUNT(*) FROM {legacy}),
+               (SELECT COUNT(*) FROM {legacy} WHERE NOT ({has_key})),
+               (SELECT COUNT(*) FROM _migrate_keep)
+    """)).one()
+    n = con.execute(text(f"""
+        INSERT INTO {table} ({cols}) SELECT {cols} FROM {legacy} WHERE ctid IN (SELECT rid FROM _migrate_keep)
+    """)).rowcount
+    rejected = 0
+    if total > keep:
+        rejects = f"{table}__rejects"
+        if relkind(con, rejects):
+            raise RuntimeError(f"{rejects} already exists; inspect or drop it, then re-run the load")
+        rejected = con.execute(text(
+            f"CREATE TABLE {rejects} AS SELECT * FROM {legacy} WHERE ctid NOT IN (SELECT rid FROM _migrate_keep)"
+        )).rowcount
+        print(f"[partition] {table}: {null_key:,} row(s) with a NULL key and {total - keep - null_key:,} duplicate-key "
+              f"row(s) not migrated; kept in {rejects}")
+    moved = con.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+    if n != keep or moved + rejected != total:
+        raise RuntimeError(f"{table}: migration would lose rows ({total:,} in the plain table, {moved:,} migrated, "
+                           f"{rejected:,} rejected); nothing was changed")
+    con.execute(text("DROP TABLE _migrate_keep"))
+    con.execute(text(f"DROP TABLE {legacy}"))
+    print(f"[partition] {table}: migrated {n:,} of {total:,} rows from the plain table into {len(seasons)} season partition(s)")
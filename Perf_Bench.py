@@ -0,0 +1,231 @@
+# Benchmark suite: times each CreateSQLView build and PowerBI-style mart queries against the warehouse
+# Db_Conn points at (a local container is fine) -- plus, opt-in, the historical load and the in-season ETL --
+# appends the results to bench_history.json and compares them with the previous run.
+#   NOTE: the LOAD_STAGES replace hist_* from DATA_DIR and write the current season exactly as
+#   Load_Historical / ETL_InSzn do, so only set INCLUDE_LOADS against a scratch warehouse.
+from __future__ import annotations
+import datetime as dt
+import importlib.util
+import json
+import multiprocessing as mp
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from sqlalchemy import text
+from Db_Conn import get_engine
+
+ROOT = Path(__file__).resolve().parent
+DATA_DIR = ROOT / "data_historic"
+HISTORY = ROOT / "bench_history.json"
+STAGES = ["marts_team", "marts_qb_coach", "marts_positions", "marts_rankings", "queries"]
+LOAD_STAGES = ["load", "etl"]   # destructive: run first, and only when INCLUDE_LOADS
+INCLUDE_LOADS = False
+LOAD_TABLES = ["hist_schedules", "hist_weekly"]
+
+BENCH_SEASON = 2024        # fixed season for the filtered queries, so runs stay comparable
+QUERY_RUNS = 20
+QUERY_WARMUP = 2
+# Query_Service catalog queries, as PowerBI pulls them: whole views, and one season's slice
+QUERIES = [
+    ("team_season_splits", {}), ("team_alltime_splits", {}), ("team_season_splits", {"season": BENCH_SEASON}),
+    ("qb_season_splits", {}), ("qb_alltime_splits", {}), ("coach_season_splits", {}),
+    ("rb_season_stats", {}), ("wr_season_stats", {}), ("wr_season_stats", {"season": BENCH_SEASON}),
+    ("qb_alltime_stats", {}), ("te_rolling3", {"season": BENCH_SEASON}),
+    ("team_weekly_ranks", {"season": BENCH_SEASON}), ("def_rank_by_pos", {}),
+]
+REGRESSION_PCT = 10.0      # slower than the previous run by more than this -> flagged ...
+REGRESSION_FLOOR = {"wall_s": 0.5, "peak_rss_mb": 20.0, "ms": 2.0}   # ... and by at least this much (noise)
+
+def _load_script(stem: str):
+    spec = importlib.util.spec_from_file_location(stem.replace("-", "_"), ROOT / f"{stem}.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def _count(*tables) -> int:
+    with get_engine().connect() as con:
+        return sum(con.execute(text(f"SELECT COUNT(*) FROM {t}")).scalar() for t in tables)
+
+def _peak_rss_mb() -> float | None:
+    """Peak resident set of this process (each stage runs in its own process, so this is per stage)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+    except ImportError:   # Windows
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / 2**20, 1)
+        except ImportError:
+            return None
+
+# ---- stages: each returns the rows it wrote (None when there is no meaningful count) ----
+
+def stage_load(data_dir: Path) -> int:
+    import Load_Historical as lh
+    files = {t: lh.source_file(t, data_dir) for t in LOAD_TABLES}
+    missing = [lh.SOURCES[t] for t, f in files.items() if f is None]
+    if missing:
+        raise FileNotFoundError(f"no {', '.join(missing)} in {data_dir}")
+    rows = 0
+    for t, f in files.items():
+        n = lh.load_parquet(t, f, if_exists="replace")
+        if not n:
+            raise RuntimeError(f"{f.name} loaded no rows into {t}")
+        rows += n
+    return rows + lh.load_pbp(data_dir)
+
+def stage_etl(data_dir: Path) -> None:
+    import ETL_InSzn
+    ETL_InSzn.FORCE_RELOAD = True   # write every pulled week, or a repeat run measures a no-op
+    ETL_InSzn.main()
+
+def stage_marts_team(data_dir: Path) -> int:
+    import Splits, Team_Strength
+    _load_script("CreateSQLView-TeamStats").run_build()
+    return _count(Splits.FACT, Team_Strength.STRENGTH)
+
+def stage_marts_qb_coach(data_dir: Path) -> int:
+    import Coach_Dim, Primary_QB
+    qb = _load_script("CreateSQLView-QBnCoachStats")
+    qb.build_qb_views()
+    qb.refresh_coach_mapping_from_schedules()
+    qb.build_coach_views()
+    return _count(Primary_QB.DIM, Coach_Dim.DIM)
+
+def stage_marts_positions(data_dir: Path) -> int:
+    import Def_Rank, Position_Stats, Rolling_Features
+    _load_script("CreateSQLView-Positions").main()
+    return _count(Rolling_Features.FEATURES, Position_Stats.FACT, Def_Rank.DEF_RANK)
+
+def stage_marts_rankings(data_dir: Path) -> int:
+    import Team_Ranks
+    _load_script("CreateSQLView-TeamRankings").main()
+    return _count(Team_Ranks.RANKS)
+
+def bench_queries(runs: int = QUERY_RUNS, warmup: int = QUERY_WARMUP) -> dict:
+    """Latency of each query in QUERIES, rows fully fetched, over `runs` timed executions after `warmup`."""
+    from Query_Service import query_sql
+    out = {}
+    with get_engine().connect() as con:
+        for name, params in QUERIES:
+            sql, binds = query_sql(name, params)
+            ms, rows = [], 0
+            for i in range(warmup + runs):
+                t0 = time.perf_counter()
+                rows = len(con.execute(text(sql), binds).fetchall())
+                if i >= warmup:
+                    ms.append((time.perf_counter() - t0) * 1000)
+            key = name + "".join(f"[{k}={v}]" for k, v in sorted(params.items()))
+            out[key] = {"rows": rows, "runs": runs,
+                        **{f"p{q}_ms": round(float(np.percentile(ms, q)), 3) for q in (50, 95, 99)}}
+            print(f"[query] {key}: {rows:,} rows, p50 {out[key]['p50_ms']:.1f} ms, p95 {out[key]['p95_ms']:.1f} ms")
+    return out
+
+STAGE_FUNCS = {
+    "load": stage_load, "etl": stage_etl, "marts_team": stage_marts_team, "marts_qb_coach": stage_marts_qb_coach,
+    "marts_positions": stage_marts_positions, "marts_rankings": stage_marts_rankings,
+}
+
+def _error(e: Exception) -> str:
+    lines = str(e).strip().splitlines()
+    return f"{type(e).__name__}: {lines[0] if lines else ''}"
+
+def _run_stage(name: str, data_dir: str) -> dict:
+    """Child-process entry point: run one stage and measure it."""
+    t0 = time.perf_counter()
+    try:
+        if name == "queries":
+            return {"queries": bench_queries(), "wall_s": round(time.perf_counter() - t0, 3),
+                    "peak_rss_mb": _peak_rss_mb()}
+        rows = STAGE_FUNCS[name](Path(data_dir))
+    except ImportError as e:   # e.g. nflreadpy missing for the etl stage
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    except Exception as e:     # recorded, so the other stages still run and the history entry is written
+        return {"failed": _error(e)}
+    wall = time.perf_counter() - t0
+    return {"wall_s": round(wall, 3), "rows": rows,
+            "rows_per_s": round(rows / wall) if rows else None, "peak_rss_mb": _peak_rss_mb()}
+
+def run(stages=None, data_dir: Path = DATA_DIR) -> dict:
+    """
+    Each stage in a fresh spawned process, so peak RSS and warm caches are per stage, not cumulative.
+    `stages` defaults to STAGES, preceded by LOAD_STAGES when INCLUDE_LOADS.
+    """
+    if stages is None:
+        stages = (LOAD_STAGES if INCLUDE_LOADS else []) + STAGES
+    ctx = mp.get_context("spawn")
+    result = {"run_at": dt.datetime.now().isoformat(timespec="seconds"), "commit": _git_commit(),
+              "python": platform.python_version(), "platform": platform.platform(),
+              "settings": {"bench_season": BENCH_SEASON, "query_runs": QUERY_RUNS, "query_warmup": QUERY_WARMUP},
+              "stages": {}, "queries": {}}
+    try:
+        with get_engine().connect() as con:
+            result["postgres"] = con.execute(text("SHOW server_version")).scalar()
+    except Exception as e:
+        result["postgres"] = None
+        print(f"[bench] server version unavailable: {_error(e)}")
+    for name in stages:
+        print(f"\n[bench] {name}")
+        try:
+            with ctx.Pool(1) as pool:
+                r = pool.apply(_run_stage, (name, str(data_dir)))
+        except Exception as e:   # the child died or its result could not be sent back
+            r = {"failed": _error(e)}
+        if "queries" in r:
+            result["queries"] = r.pop("queries")
+        result["stages"][name] = r
+        print(f"[bench] {name}: {r}")
+    return result
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path: Path = HISTORY) -> list[dict]:
+    return json.loads(path.read_text()) if path.exists() else []
+
+def _delta(a, b) -> str:
+    return f"{a} -> {b} ({(b - a) / a * 100:+.1f}%)" if a else f"{a} -> {b}"
+
+def compare(prev: dict, cur: dict) -> list[str]:
+    """Print stage and query changes against `prev`; returns the regressions (see REGRESSION_PCT/_FLOOR)."""
+    regressions = []
+    def check(label, a, b, floor):
+        if a is None or b is None:
+            return
+        slower = a > 0 and (b - a) / a * 100 > REGRESSION_PCT and b - a >= floor
+        print(f"[compare] {label}: {_delta(a, b)}{'  ▲ REGRESSION' if slower else ''}")
+        if slower:
+            regressions.append(f"{label}: {_delta(a, b)}")
+    print(f"\n[compare] vs run {prev['run_at']} ({prev.get('commit')})")
+    for name, s in cur["stages"].items():
+        p = prev["stages"].get(name, {})
+        check(f"{name} wall_s", p.get("wall_s"), s.get("wall_s"), REGRESSION_FLOOR["wall_s"])
+        check(f"{name} peak_rss_mb", p.get("peak_rss_mb"), s.get("peak_rss_mb"), REGRESSION_FLOOR["peak_rss_mb"])
+    for key, q in cur["queries"].items():
+        p = prev["queries"].get(key, {})
+        check(f"{key} p50_ms", p.get("p50_ms"), q["p50_ms"], REGRESSION_FLOOR["ms"])
+        check(f"{key} p95_ms", p.get("p95_ms"), q["p95_ms"], REGRESSION_FLOOR["ms"])
+    return regressions
+
+def main():
+    history = load_history()
+    result = run()
+    if history:
+        result["regressions"] = compare(history[-1], result)
+    history.append(result)
+    HISTORY.write_text(json.dumps(history, indent=1))
+    n = len(result.get("regressions", []))
+    failed = [k for k, v in result["stages"].items() if "failed" in v]
+    print(f"\n✅ Benchmark run {len(history)} saved to {HISTORY.name}" + (f" ({n} regression(s))" if n else "")
+          + (f" -- failed stage(s): {', '.join(failed)}" if failed else ""))
+
+if __name__ == "__main__":
+    main()
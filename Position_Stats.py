@@ -0,0 +1,208 @@
+# Spec-driven position marts: each position declares its stat columns once, a single GROUPING SETS pass
+# over mart.v_player_games fills mart.fact_position_stats, and every v_<pos>_* view is generated from the spec.
+from __future__ import annotations
+import time
+from sqlalchemy import text
+from Rolling_Features import FEATURES
+
+FACT = "mart.fact_position_stats"
+
+# Sum type of each v_player_games stat a spec may use
+STAT_TYPES = {
+    "completions": "bigint", "attempts": "bigint", "passing_yards": "numeric", "passing_tds": "bigint",
+    "interceptions": "bigint", "rushing_attempts": "bigint", "rushing_yards": "numeric", "rushing_tds": "bigint",
+    "targets": "bigint", "receptions": "bigint", "receiving_yards": "numeric", "receiving_tds": "bigint",
+    "scrimmage_yards": "numeric", "skill_tds": "bigint", "qb_total_yards": "numeric",
+}
+
+# How a spec column is computed: the fact column it reads and the view expression over it
+AGGS = {
+    "sum":       (lambda s: s,                lambda c: c),
+    "avg":       (lambda s: s,                lambda c: f"ROUND({c} / games::numeric, 3)"),
+    "primetime": (lambda s: f"{s}_primetime", lambda c: c),
+    "playoff":   (lambda s: f"{s}_playoff",   lambda c: c),
+}
+FILTERS = {"primetime": "is_primetime", "playoff": "is_playoff"}
+
+# position_group -> view names and (view column, agg, stat) in view column order;
+# rolling columns read the ROLLING_WINDOW columns of the rolling feature table
+POSITIONS = {
+    "RB": {
+        "views": ("v_rb_alltime_stats", "v_rb_season_stats", "v_rb_last_season_stats", "v_rb_rolling3"),
+        "stats": [
+            ("total_yards",        "sum",       "scrimmage_yards"),
+            ("rushing_yards",      "sum",       "rushing_yards"),
+            ("receiving_yards",    "sum",       "receiving_yards"),
+            ("rushing_attempts",   "sum",       "rushing_attempts"),
+            ("targets",            "sum",       "targets"),
+            ("total_tds",          "sum",       "skill_tds"),
+            ("avg_yards_per_game", "avg",       "scrimmage_yards"),
+            ("tds_primetime",      "primetime", "skill_tds"),
+            ("yards_primetime",    "primetime", "scrimmage_yards"),
+            ("tds_playoff",        "playoff",   "skill_tds"),
+            ("yards_playoff",      "playoff",   "scrimmage_yards"),
+        ],
+        "rolling": [("yards_last3", "sum", "scrimmage_yards"), ("avg_yards_last3", "avg", "scrimmage_yards"),
+                    ("tds_last3", "sum", "skill_tds")],
+    },
+    "WR": {
+        "views": ("v_wr_alltime_stats", "v_wr_season_stats", "v_wr_last_season_stats", "v_wr_rolling3"),
+        "stats": [
+            ("receiving_yards",        "sum",       "receiving_yards"),
+            ("receptions",             "sum",       "receptions"),
+            ("targets",                "sum",       "targets"),
+            ("receiving_tds",          "sum",       "receiving_tds"),
+            ("total_yards",            "sum",       "scrimmage_yards"),
+            ("avg_rec_yards_per_game", "avg",       "receiving_yards"),
+            ("tds_primetime",          "primetime", "receiving_tds"),
+            ("yards_primetime",        "primetime", "receiving_yards"),
+            ("tds_playoff",            "playoff",   "receiving_tds"),
+            ("yards_playoff",          "playoff",   "receiving_yards"),
+        ],
+        "rolling": [("rec_yards_last3", "sum", "receiving_yards"), ("avg_rec_yards_last3", "avg", "receiving_yards"),
+                    ("rec_tds_last3", "sum", "receiving_tds")],
+    },
+    "QB": {
+        "views": ("v_qb_stats_alltime", "v_qb_stats_season", "v_qb_stats_last_season", "v_qb_rolling3"),
+        "stats": [
+            ("passing_yards",           "sum",       "passing_yards"),
+            ("completions",             "sum",       "completions"),
+            ("attempts",                "sum",       "attempts"),
+            ("passing_tds",             "sum",       "passing_tds"),
+            ("interceptions",           "sum",       "interceptions"),
+            ("rushing_yards",           "sum",       "rushing_yards"),
+            ("total_yards_qb",          "sum",       "qb_total_yards"),
+            ("avg_pass_yards_per_game", "avg",       "passing_yards"),
+            ("passing_tds_primetime",   "primetime", "passing_tds"),
+            ("passing_yards_primetime", "primetime", "passing_yards"),
+            ("passing_tds_playoff",     "playoff",   "passing_tds"),
+            ("passing_yards_playoff",   "playoff",   "passing_yards"),
+        ],
+        "rolling": [("pass_yards_last3", "sum", "passing_yards"), ("avg_pass_yards_last3", "avg", "passing_yards"),
+                    ("pass_tds_last3", "sum", "passing_tds")],
+    },
+}
+# TE reads exactly like WR
+POSITIONS["TE"] = {**POSITIONS["WR"],
+                   "views": ("v_te_alltime_stats", "v_te_season_stats", "v_te_last_season_stats", "v_te_rolling3")}
+ROLLING_WINDOW = "l3"
+
+def measures() -> dict[str, tuple[str, str]]:
+    """Fact column -> (aggregate over v_player_games, SQL type), for every (agg, stat) any position uses."""
+    out = {}
+    for spec in POSITIONS.values():
+        for _, agg, stat in spec["stats"]:
+            f = FILTERS.get(agg)
+            out[AGGS[agg][0](stat)] = (f"SUM({stat})" + (f" FILTER (WHERE {f})" if f else ""), STAT_TYPES[stat])
+    return out
+
+MEASURE_COLS = list(measures())
+
+SQL_FACT_DDL = f"""
+CREATE SCHEMA IF NOT EXISTS mart;
+CREATE TABLE IF NOT EXISTS {FACT} (
+  position_group text NOT NULL,
+  player_id   text,
+  player_name text,
+  season      int,
+  games       bigint,{",".join(f"{chr(10)}  {c} {t}" for c, (_, t) in measures().items())}
+);
+"""
+
+SQL_FACT_INDEXES = f"""
+CREATE UNIQUE INDEX IF NOT EXISTS ux_fact_position_stats ON {FACT} (position_group, player_id, COALESCE(season, -1));
+"""
+
+def fact_select_sql(alltime: bool = True, season_filter: bool = False) -> str:
+    """(position, player, season) rows -- plus (position, player) all-time rows -- in one scan of player games."""
+    positions = ", ".join(f"'{p}'" for p in POSITIONS)
+    sets = "(position_group, player_id, season)" + (", (position_group, player_id)" if alltime else "")
+    return f"""
+SELECT position_group, player_id, MAX(player_name) AS player_name,
+  CASE WHEN GROUPING(season) = 0 THEN season END AS season,
+  COUNT(*) AS games,
+  {(","+chr(10)+"  ").join(f"{expr} AS {c}" for c, (expr, _) in measures().items())}
+FROM mart.v_player_games
+WHERE position_group IN ({positions}){" AND season = ANY(:s)" if season_filter else ""}
+GROUP BY GROUPING SETS ({sets})
+"""
+
+def fact_build_sql() -> str:
+    cols = ", ".join(["position_group", "player_id", "player_name", "season", "games"] + MEASURE_COLS)
+    return f"DELETE FROM {FACT};\nINSERT INTO {FACT} ({cols})\n{fact_select_sql()};"
+
+def views_sql() -> str:
+    """All-time, season, last-season and rolling views for every position in the spec."""
+    out = []
+    for pos, spec in POSITIONS.items():
+        alltime, season, last, rolling = spec["views"]
+        cols = ",\n  ".join(f"{AGGS[agg][1](AGGS[agg][0](stat))} AS {name}" for name, agg, stat in spec["stats"])
+        roll = ",\n  ".join(
+            f"{stat}_{ROLLING_WINDOW} / games_{ROLLING_WINDOW} AS {name}" if agg == "avg" else f"{stat}_{ROLLING_WINDOW} AS {name}"
+            for name, agg, stat in spec["rolling"])
+        out.append(f"""
+-- {pos}
+CREATE OR REPLACE VIEW mart.{alltime} AS
+SELECT
+  player_id, player_name, games,
+  {cols}
+FROM {FACT}
+WHERE position_group = '{pos}' AND season IS NULL;
+
+CREATE OR REPLACE VIEW mart.{season} AS
+SELECT
+  season, player_id, player_name, games,
+  {cols}
+FROM {FACT}
+WHERE position_group = '{pos}' AND season IS NOT NULL;
+
+CREATE OR REPLACE VIEW mart.{last} AS
+SELECT *
+FROM mart.{season}
+WHERE season = (SELECT MAX(season) FROM hist_schedules);
+
+CREATE OR REPLACE VIEW mart.{rolling} AS
+SELECT
+  season, player_id, player_name, team, week,
+  {roll}
+FROM {FEATURES}
+WHERE position_group = '{pos}';
+""")
+    return "\n".join(out)
+
+def rebuild_position_stats(con):
+    t0 = time.perf_counter()
+    con.execute(text(SQL_FACT_DDL))
+    con.execute(text(SQL_FACT_INDEXES))
+    con.execute(text(fact_build_sql()))
+    con.execute(text(f"ANALYZE {FACT}"))
+    print(f"[positions] {FACT} rebuilt in one scan for: {', '.join(POSITIONS)} in {time.perf_counter()-t0:.2f}s")
+
+def refresh_position_seasons(con, seasons):
+    """
+    Recompute the (position, player, season) rows of `seasons` in one season-filtered scan, then re-roll
+    only the all-time rows of players that appear in them (every measure is additive).
+    """
+    t0 = time.perf_counter()
+    cols = ", ".join(["position_group", "player_id", "player_name", "season", "games"] + MEASURE_COLS)
+    con.execute(text(f"""
+        CREATE TEMP TABLE _touched ON COMMIT DROP AS
+          SELECT DISTINCT position_group, player_id FROM {FACT} WHERE season = ANY(:s);
+        DELETE FROM {FACT} WHERE season = ANY(:s);
+        INSERT INTO {FACT} ({cols})
+        {fact_select_sql(alltime=False, season_filter=True)};
+        INSERT INTO _touched SELECT DISTINCT position_group, player_id FROM {FACT} WHERE season = ANY(:s);
+
+        DELETE FROM {FACT} f
+        USING (SELECT DISTINCT position_group, player_id FROM _touched) t
+        WHERE f.season IS NULL AND f.position_group = t.position_group AND f.player_id = t.player_id;
+        INSERT INTO {FACT} ({cols})
+        SELECT f.position_group, f.player_id, MAX(f.player_name), NULL, SUM(f.games), {", ".join(f"SUM(f.{c})" for c in MEASURE_COLS)}
+        FROM {FACT} f
+        JOIN (SELECT DISTINCT position_group, player_id FROM _touched) t
+          ON t.position_group = f.position_group AND t.player_id = f.player_id
+        WHERE f.season IS NOT NULL
+        GROUP BY f.position_group, f.player_id;
+        DROP TABLE _touched;
+    """), {"s": list(seasons)})
+    print(f"[positions] {FACT}: seasons {list(seasons)} refreshed in {time.perf_counter()-t0:.2f}s")
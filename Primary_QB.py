@@ -0,0 +1,67 @@
+# Persisted primary QB per team-week (most attempts; tiebreak by passing yards), so QB marts join a
+# keyed table instead of ranking all of hist_weekly on every query.
+from __future__ import annotations
+import time
+from sqlalchemy import text
+
+DIM = "dim_game_primary_qb"
+
+# The primary key (season, week, team) is exactly the v_qb_games join key
+DDL_PRIMARY_QB = f"""
+CREATE TABLE IF NOT EXISTS {DIM}(
+  season int NOT NULL,
+  week   int NOT NULL,
+  team   text NOT NULL,
+  qb_id  text NOT NULL,
+  qb_name text,
+  attempts int,
+  passing_yards int,
+  PRIMARY KEY (season, week, team)
+);
+"""
+
+def primary_qb_select_sql(week_filter: bool = False) -> str:
+    where = "(position='QB' OR position_group='QB')" + (" AND season = :s AND week = ANY(:w)" if week_filter else "")
+    return f"""
+WITH qb AS (
+  SELECT
+    season::int AS season,
+    week::int   AS week,
+    recent_team::text AS team,
+    player_id::text AS qb_id,
+    COALESCE(NULLIF(player_name,''), player_display_name)::text AS qb_name,
+    COALESCE(attempts,0)::int AS attempts,
+    COALESCE(passing_yards,0)::int AS passing_yards,
+    ROW_NUMBER() OVER (
+      PARTITION BY season, week, recent_team
+      ORDER BY COALESCE(attempts,0) DESC, COALESCE(passing_yards,0) DESC, player_id
+    ) AS rn
+  FROM hist_weekly
+  WHERE {where}
+)
+SELECT season, week, team, qb_id, qb_name, attempts, passing_yards
+FROM qb
+WHERE rn = 1 AND attempts >= 1
+"""
+
+def primary_qb_build_sql() -> str:
+    return f"DELETE FROM {DIM};\nINSERT INTO {DIM}\n{primary_qb_select_sql()};"
+
+def rebuild_primary_qb(con):
+    t0 = time.perf_counter()
+    con.execute(text(DDL_PRIMARY_QB))
+    con.execute(text(primary_qb_build_sql()))
+    con.execute(text(f"ANALYZE {DIM}"))
+    print(f"[qb] {DIM} rebuilt in {time.perf_counter()-t0:.2f}s")
+
+def refresh_primary_qb(con, season: int, weeks):
+    """A team-week's primary QB only depends on that week's rows, so only the loaded weeks are recomputed."""
+    t0 = time.perf_counter()
+    params = {"s": int(season), "w": [int(w) for w in weeks]}
+    con.execute(text(DDL_PRIMARY_QB))
+    con.execute(text(f"""
+        DELETE FROM {DIM} WHERE season = :s AND week = ANY(:w);
+        INSERT INTO {DIM}
+        {primary_qb_select_sql(week_filter=True)};
+    """), params)
+    print(f"[qb] {DIM}: {season} W{params['w'][0]}–{params['w'][-1]} refreshed in {time.perf_counter()-t0:.2f}s")
@@ -0,0 +1,221 @@
+# Local HTTP/JSON query service for PowerBI and notebooks: a fixed catalog of parameterized mart queries
+# behind an LRU result cache keyed by the loaders' data version (Load_Manifest.bump_data_version).
+#   GET /queries                     -> catalog
+#   GET /q/<name>?season=2024&...    -> {"version", "cached", "columns", "rows"}
+#   GET /stats                       -> hit rate, cache size, latency percentiles
+from __future__ import annotations
+import datetime as dt
+import decimal
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+import numpy as np
+from sqlalchemy import text
+from Db_Conn import get_engine
+from Load_Manifest import data_version
+from Position_Stats import POSITIONS
+
+BACKEND = "postgres"        # or "duckdb": the embedded Mart_Offline build over data_historic/*.parquet
+HOST, PORT = "127.0.0.1", 8765
+CACHE_MB = 256              # result cache bound (encoded JSON bytes)
+LATENCY_WINDOW = 10_000     # requests kept for the latency percentiles
+
+# name -> (mart view, ORDER BY, {param: (column, type)}); every param is an optional equality filter
+CATALOG = {
+    "team_alltime_splits":  ("v_team_alltime_splits",  "team",              {"team": ("team", str)}),
+    "team_season_splits":   ("v_team_season_splits",   "season, team",      {"season": ("season", int), "team": ("team", str)}),
+    "qb_alltime_splits":    ("v_qb_alltime_splits",    "qb_id",             {"qb_id": ("qb_id", str)}),
+    "qb_season_splits":     ("v_qb_season_splits",     "season, qb_id",     {"season": ("season", int), "qb_id": ("qb_id", str)}),
+    "coach_alltime_splits": ("v_coach_alltime_splits", "head_coach",        {"coach": ("head_coach", str)}),
+    "coach_season_splits":  ("v_coach_season_splits",  "season, head_coach",
+                             {"season": ("season", int), "coach": ("head_coach", str)}),
+    "team_weekly_ranks":    ("v_team_weekly_ranks",    "season, week, team",
+                             {"season": ("season", int), "week": ("week", int), "team": ("team", str)}),
+    "def_rank_by_pos":      ("v_def_rank_by_pos",      "season, position_group, def_rank_pos",
+                             {"season": ("season", int), "position": ("position_group", str), "team": ("team", str)}),
+}
+for _pos, _spec in POSITIONS.items():
+    _alltime, _season, _, _rolling = _spec["views"]
+    CATALOG[f"{_pos.lower()}_alltime_stats"] = (_alltime, "player_id", {"player_id": ("player_id", str)})
+    CATALOG[f"{_pos.lower()}_season_stats"] = (_season, "season, player_id",
+                                               {"season": ("season", int), "player_id": ("player_id", str)})
+    CATALOG[f"{_pos.lower()}_rolling3"] = (_rolling, "season, week, player_id",
+                                           {"season": ("season", int), "player_id": ("player_id", str)})
+
+def query_sql(name: str, params: dict) -> tuple[str, dict]:
+    """SQL and typed bind params for one catalog query; raises KeyError / ValueError on bad input."""
+    view, order, spec = CATALOG[name]
+    unknown = set(params) - set(spec)
+    if unknown:
+        raise ValueError(f"unknown parameter(s) for {name}: {sorted(unknown)}")
+    binds = {p: spec[p][1](v) for p, v in params.items()}
+    where = " AND ".join(f"{spec[p][0]} = :{p}" for p in sorted(binds))
+    return f"SELECT * FROM mart.{view}{' WHERE ' + where if where else ''} ORDER BY {order}", binds
+
+def _json_default(v):
+    if isinstance(v, decimal.Decimal):
+        return float(v)
+    if isinstance(v, (dt.date, dt.time, dt.datetime)):
+        return v.isoformat()
+    if isinstance(v, np.generic):
+        return v.item()
+    raise TypeError(f"not JSON serializable: {type(v).__name__}")
+
+class PostgresBackend:
+    def __init__(self, eng=None):
+        self.engine = eng or get_engine()
+
+    def version(self) -> int:
+        with self.engine.connect() as con:
+            return data_version(con)
+
+    def run(self, sql: str, binds: dict):
+        with self.engine.connect() as con:
+            res = con.execute(text(sql), binds)
+            return list(res.keys()), [list(r) for r in res]
+
+class DuckDBBackend:
+    """The embedded engine: a static snapshot built from parquet, so its version never moves."""
+
+    def __init__(self, con=None):
+        if con is None:
+            import Mart_Offline
+            con = Mart_Offline.build()
+        self.con = con
+        self.lock = threading.Lock()
+
+    def version(self) -> int:
+        return 0
+
+    def run(self, sql: str, binds: dict):
+        with self.lock:
+            cur = self.con.execute(re.sub(r":(\w+)", r"$\1", sql), binds)
+            return [d[0] for d in cur.description], [list(r) for r in cur.fetchall()]
+
+class QueryService:
+    """Catalog execution with a byte-bounded LRU cache keyed by (data version, query, params)."""
+
+    def __init__(self, backend, cache_mb: int = CACHE_MB):
+        self.backend = backend
+        self.max_bytes = cache_mb * 1024 * 1024
+        self.cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.latency = deque(maxlen=LATENCY_WINDOW)   # (ms, hit)
+        self.lock = threading.Lock()
+
+    def query(self, name: str, params: dict) -> tuple[bytes, bool]:
+        t0 = time.perf_counter()
+        sql, binds = query_sql(name, params)
+        version = self.backend.version()
+        key = (version, name, tuple(sorted(binds.items())))
+        with self.lock:
+            body = self.cache.get(key)
+            if body is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+        hit = body is not None
+        if not hit:
+            cols, rows = self.backend.run(sql, binds)
+            body = json.dumps({"query": name, "version": version, "columns": cols, "rows": rows},
+                              default=_json_default).encode()
+            self._put(key, body)
+        self.latency.append(((time.perf_counter() - t0) * 1000, hit))
+        return body, hit
+
+    def _put(self, key: tuple, body: bytes):
+        with self.lock:
+            self.misses += 1
+            if len(body) > self.max_bytes or key in self.cache:
+                return
+            self.cache[key] = body
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, old = self.cache.popitem(last=False)
+                self.bytes -= len(old)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        lat = list(self.latency)
+        pct = lambda xs: ({f"p{q}": round(float(np.percentile(xs, q)), 3) for q in (50, 95, 99)} if xs else {})
+        total = self.hits + self.misses
+        return {
+            "requests": total, "hits": self.hits, "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+            "entries": len(self.cache), "cache_mb": round(self.bytes / 1024 / 1024, 2), "evictions": self.evictions,
+            "latency_ms": pct([ms for ms, _ in lat]),
+            "hit_latency_ms": pct([ms for ms, h in lat if h]),
+            "miss_latency_ms": pct([ms for ms, h in lat if not h]),
+        }
+
+def make_handler(service: QueryService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: bytes, cached: bool | None = None):
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if cached is not None:
+                self.send_header("X-Cache", "HIT" if cached else "MISS")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/stats":
+                return self._send(200, json.dumps(service.stats()).encode())
+            if url.path == "/queries":
+                return self._send(200, json.dumps(
+                    {n: {"view": v, "params": list(p)} for n, (v, _, p) in CATALOG.items()}).encode())
+            if url.path.startswith("/q/"):
+                name = url.path[3:]
+                if name not in CATALOG:
+                    return self._send(404, json.dumps({"error": f"unknown query {name}"}).encode())
+                try:
+                    body, hit = service.query(name, dict(parse_qsl(url.query)))
+                except ValueError as e:
+                    return self._send(400, json.dumps({"error": str(e)}).encode())
+                except Exception as e:   # view not built yet, dropped connection, ...
+                    err = f"{type(e).__name__}: {str(e).strip().splitlines()[0] if str(e).strip() else ''}"
+                    print(f"[serve] /q/{name} failed: {err}")
+                    return self._send(500, json.dumps({"error": err}).encode())
+                return self._send(200, body, hit)
+            self._send(404, json.dumps({"error": "not found"}).encode())
+
+        def log_message(self, fmt, *args):   # keep the console for the [serve] lines
+            pass
+    return Handler
+
+def make_service(backend: str = BACKEND, cache_mb: int = CACHE_MB) -> QueryService:
+    return QueryService(DuckDBBackend() if backend == "duckdb" else PostgresBackend(), cache_mb)
+
+def serve(service: QueryService | None = None, host: str = HOST, port: int = PORT):
+    service = service or make_service()
+    httpd = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"[serve] {type(service.backend).__name__} on http://{host}:{port} ({len(CATALOG)} queries, "
+          f"{service.max_bytes // 1024 // 1024} MB cache)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        print(f"[serve] stopped: {service.stats()}")
+
+def bench(service: QueryService | None = None, rounds: int = 5) -> dict:
+    """Run every catalog query (unfiltered and for one season) `rounds` times; round 1 fills the cache."""
+    service = service or make_service()
+    calls = [(n, {}) for n in CATALOG] + [(n, {"season": "2024"}) for n, (_, _, p) in CATALOG.items() if "season" in p]
+    for _ in range(rounds):
+        for name, params in calls:
+            service.query(name, params)
+    stats = service.stats()
+    print(f"[bench] {len(calls)} queries x {rounds} rounds: hit rate {stats['hit_rate']}, "
+          f"miss {stats['miss_latency_ms']}, hit {stats['hit_latency_ms']}")
+    return stats
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,118 @@
+# Persisted rolling player features per (player_id, season, week): N-game, season-to-date and
+# career-to-date sums over mart.v_player_games, all from one sort. The v_*_rolling3 views read it.
+from __future__ import annotations
+import time
+from sqlalchemy import text
+
+FEATURES = "mart.player_rolling_features"
+
+# Stats carried in every window -> SQL type of their sum (matches SUM() over the v_player_games column)
+STATS = {
+    "scrimmage_yards": "numeric",
+    "skill_tds":       "bigint",
+    "rushing_yards":   "numeric",
+    "receiving_yards": "numeric",
+    "receiving_tds":   "bigint",
+    "receptions":      "bigint",
+    "targets":         "bigint",
+    "passing_yards":   "numeric",
+    "passing_tds":     "bigint",
+}
+# N-game windows stay inside a season, like the old rolling3 views; "std" = season-to-date, "ctd" = career-to-date
+GAME_WINDOWS = [3, 5, 8]
+WINDOWS = [f"l{n}" for n in GAME_WINDOWS] + ["std", "ctd"]
+
+FEATURE_COLS = [f"games_{w}" for w in WINDOWS] + [f"{s}_{w}" for s in STATS for w in WINDOWS]
+
+SQL_FEATURES_DDL = f"""
+CREATE SCHEMA IF NOT EXISTS mart;
+CREATE TABLE IF NOT EXISTS {FEATURES} (
+  player_id      text NOT NULL,
+  season         int  NOT NULL,
+  week           int  NOT NULL,
+  player_name    text,
+  position_group text,
+  team           text,
+  {",".join(f"{chr(10)}  games_{w} bigint" for w in WINDOWS)},
+  {",".join(f"{chr(10)}  {s}_{w} {t}" for s, t in STATS.items() for w in WINDOWS)},
+  PRIMARY KEY (player_id, season, week)
+);
+CREATE INDEX IF NOT EXISTS ix_player_rolling_features_pos ON {FEATURES} (position_group, season, week);
+"""
+
+def _frame(w: str) -> str:
+    # every frame sorts on (player_id, season, week), so the planner sorts the stream once
+    if w == "ctd":
+        return "PARTITION BY player_id ORDER BY season, week ROWS UNBOUNDED PRECEDING"
+    if w == "std":
+        return "PARTITION BY player_id, season ORDER BY week ROWS UNBOUNDED PRECEDING"
+    return f"PARTITION BY player_id, season ORDER BY week ROWS BETWEEN {int(w[1:]) - 1} PRECEDING AND CURRENT ROW"
+
+def features_select_sql(incremental: bool = False) -> str:
+    """
+    Every window for every stat in one pass over mart.v_player_games. With `incremental` the pass covers
+    only season :s, keeps weeks >= :w0, and career-to-date extends each player's last stored row before :s.
+    """
+    win = ",\n    ".join([f"COUNT(*) OVER ({_frame(w)}) AS games_{w}" for w in WINDOWS] +
+                         [f"SUM({s}) OVER ({_frame(w)}) AS {s}_{w}" for s in STATS for w in WINDOWS])
+    keys = "w.player_id, w.season, w.week, w.player_name, w.position_group, w.team"
+    if not incremental:
+        return f"""
+SELECT {keys}, {", ".join(f"w.{c}" for c in FEATURE_COLS)}
+FROM (
+  SELECT player_id, season, week, player_name, position_group, team,
+    {win}
+  FROM mart.v_player_games
+) w
+"""
+    carry = lambda c: f"w.{c} + COALESCE(p.{c}, 0) AS {c}" if c.endswith("_ctd") else f"w.{c}"
+    return f"""
+SELECT {keys}, {", ".join(carry(c) for c in FEATURE_COLS)}
+FROM (
+  SELECT player_id, season, week, player_name, position_group, team,
+    {win}
+  FROM mart.v_player_games
+  WHERE season = :s
+) w
+LEFT JOIN LATERAL (
+  SELECT {", ".join(c for c in FEATURE_COLS if c.endswith("_ctd"))}
+  FROM {FEATURES} f
+  WHERE f.player_id = w.player_id AND f.season < :s
+  ORDER BY f.season DESC, f.week DESC
+  LIMIT 1
+) p ON true
+WHERE w.week >= :w0
+"""
+
+def features_build_sql() -> str:
+    cols = ", ".join(["player_id", "season", "week", "player_name", "position_group", "team"] + FEATURE_COLS)
+    return f"DELETE FROM {FEATURES};\nINSERT INTO {FEATURES} ({cols})\n{features_select_sql()};"
+
+def rebuild_features(con):
+    t0 = time.perf_counter()
+    con.execute(text(SQL_FEATURES_DDL))
+    con.execute(text(features_build_sql()))
+    con.execute(text(f"ANALYZE {FEATURES}"))
+    print(f"[features] {FEATURES} rebuilt in {time.perf_counter()-t0:.2f}s")
+
+def refresh_features(con, season: int, weeks) -> list[int]:
+    """
+    Recompute season `season` from its first changed week on (later weeks' windows shift too). Career sums
+    carry over from each player's stored state, so earlier seasons are never rescanned; later seasons already
+    in the table (a backfill) are then re-extended in order. Returns every season rewritten.
+    """
+    if not con.execute(text("SELECT to_regclass(:r)"), {"r": FEATURES}).scalar():
+        print(f"[features] {FEATURES}: missing, run rebuild_features() first")
+        return []
+    cols = ", ".join(["player_id", "season", "week", "player_name", "position_group", "team"] + FEATURE_COLS)
+    later = [r[0] for r in con.execute(text(f"SELECT DISTINCT season FROM {FEATURES} WHERE season > :s ORDER BY 1"),
+                                       {"s": int(season)})]
+    for s, w0 in [(int(season), min(int(w) for w in weeks))] + [(s, 0) for s in later]:
+        t0 = time.perf_counter()
+        con.execute(text(f"""
+            DELETE FROM {FEATURES} WHERE season = :s AND week >= :w0;
+            INSERT INTO {FEATURES} ({cols})
+            {features_select_sql(incremental=True)};
+        """), {"s": s, "w0": w0})
+        print(f"[features] {FEATURES}: {s} from W{w0} refreshed in {time.perf_counter()-t0:.2f}s")
+    return [int(season)] + later
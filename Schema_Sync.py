@@ -0,0 +1,110 @@
+# Schema sync for the in-season writes: one cached catalog per run, source->table renames kept as
+# data (etl_column_map), and new source columns added to the target in a single ALTER TABLE.
+from __future__ import annotations
+import polars as pl
+from sqlalchemy import text
+from Bulk_Write import table_columns
+from Partitions import PARTITIONED, create_partitioned_table
+
+MAP_TABLE = "etl_column_map"
+
+# Seed rows for etl_column_map (nflreadpy name -> nfl_data_py-era hist_weekly name); edit the table, not this list
+DEFAULT_RENAMES = [
+    ("hist_weekly", "team",                  "recent_team"),
+    ("hist_weekly", "passing_interceptions", "interceptions"),
+    ("hist_weekly", "sacks_suffered",        "sacks"),
+    ("hist_weekly", "sack_yards_lost",       "sack_yards"),
+]
+
+DDL_MAP = f"""
+CREATE TABLE IF NOT EXISTS {MAP_TABLE}(
+  table_name    text NOT NULL,
+  source_column text NOT NULL,
+  target_column text NOT NULL,
+  PRIMARY KEY (table_name, source_column)
+);
+"""
+
+def pg_type(dtype: pl.DataType) -> str:
+    """Same column types pandas.to_sql picks on Postgres, so evolved columns match the loader-created ones."""
+    if dtype == pl.Boolean:
+        return "boolean"
+    if dtype.is_integer():
+        return "bigint"
+    if dtype.is_float():
+        return "double precision"
+    if dtype == pl.Datetime:
+        return "timestamptz" if dtype.time_zone is not None else "timestamp"
+    if dtype == pl.Date:
+        return "date"
+    return "text"
+
+class Catalog:
+    """Column types and rename maps for a set of tables, read once and kept current as columns are added."""
+
+    def __init__(self, columns: dict[str, dict[str, str]], renames: dict[str, dict[str, str]]):
+        self.columns = columns
+        self.renames = renames
+
+    @classmethod
+    def load(cls, engine, tables) -> "Catalog":
+        tables = list(tables)
+        with engine.begin() as con:
+            con.execute(text(DDL_MAP))
+            con.execute(text(f"""
+                INSERT INTO {MAP_TABLE}(table_name, source_column, target_column)
+                VALUES (:t, :s, :d) ON CONFLICT DO NOTHING
+            """), [{"t": t, "s": s, "d": d} for t, s, d in DEFAULT_RENAMES])
+            rows = con.execute(text(f"""
+                SELECT 'col' AS kind, table_name, column_name, data_type, ordinal_position
+                FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = ANY(:t)
+                UNION ALL
+                SELECT 'map', table_name, source_column, target_column, 0
+                FROM {MAP_TABLE}
+                WHERE table_name = ANY(:t)
+                ORDER BY 1, 2, 5
+            """), {"t": tables}).fetchall()
+        columns = {t: {} for t in tables}
+        renames = {t: {} for t in tables}
+        for kind, table, a, b, _ in rows:
+            (columns if kind == "col" else renames)[table][a] = b
+        print(f"[schema] catalog cached for {', '.join(tables)}")
+        return cls(columns, renames)
+
+    def types(self, table: str) -> dict[str, str]:
+        return self.columns.get(table, {})
+
+    def rename(self, table: str, df: pl.DataFrame) -> pl.DataFrame:
+        m = self.renames.get(table, {})
+        return df.rename({k: v for k, v in m.items() if k in df.columns})
+
+    def evolve(self, engine, table: str, df: pl.DataFrame) -> list[str]:
+        """
+        Add every df column the table lacks, in one ALTER TABLE (partitions inherit it). A missing table is
+        created from df with its Partitions.PARTITIONED key, since the staged merge needs that key to exist.
+        """
+        have = self.columns.setdefault(table, {})
+        if not have:
+            return self._create(engine, table, df)
+        new = [c for c in df.columns if c not in have]
+        if not new:
+            return []
+        adds = {c: pg_type(df.schema[c]) for c in new}
+        with engine.begin() as con:
+            con.execute(text(f"ALTER TABLE {table} " + ", ".join(
+                f'ADD COLUMN IF NOT EXISTS "{c}" {t}' for c, t in adds.items())))
+        have.update(adds)
+        print(f"[schema] {table}: added {len(new)} column(s): {new[:8]}{'...' if len(new)>8 else ''}")
+        return new
+
+    def _create(self, engine, table: str, df: pl.DataFrame) -> list[str]:
+        spec = PARTITIONED.get(table)
+        if spec is None:
+            raise RuntimeError(f"{table} does not exist and has no key in Partitions.PARTITIONED; "
+                               f"create it first (Load_Historical) so the merge has a key to match on")
+        with engine.begin() as con:
+            create_partitioned_table(con, table, df.head(0).to_pandas(), spec)
+            self.columns[table] = table_columns(con, table)
+        print(f"[schema] {table}: created with {len(df.columns)} column(s), key ({', '.join(spec['pk'])})")
+        return list(df.columns)
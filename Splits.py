@@ -0,0 +1,148 @@
+# Unified team / QB / head-coach splits: one GROUPING SETS pass over the team-game base feeds
+# mart.fact_splits, and the v_*_splits views are thin selections over it.
+from __future__ import annotations
+import time
+from sqlalchemy import text
+
+FACT = "mart.fact_splits"
+
+# entity_type -> id/name expressions over the joined game stream, the join that provides them,
+# and the relation that must exist before the entity can be built
+ENTITIES = {
+    "team": {
+        "id": "g.team", "name": "g.team", "join": "", "requires": "mart.v_team_games_enriched",
+    },
+    "qb": {
+        "id": "q.qb_id", "name": "q.qb_name", "requires": "mart.v_qb_primary_game",
+        "join": "LEFT JOIN mart.v_qb_primary_game q ON q.season = g.season AND q.week = g.week AND q.team = g.team",
+    },
+    "coach": {
+        "id": "c.head_coach", "name": "c.head_coach", "requires": "dim_team_head_coach",
+        "join": "LEFT JOIN dim_team_head_coach c ON c.season = g.season AND c.week = g.week AND c.team = g.team",
+    },
+}
+
+# Every split counter, written once; all of them are additive across seasons
+MEASURES = [
+    ("games",           "COUNT(*)"),
+    ("wins",            "SUM(CASE WHEN win_pts=1   THEN 1 ELSE 0 END)"),
+    ("losses",          "SUM(CASE WHEN win_pts=0   THEN 1 ELSE 0 END)"),
+    ("ties",            "SUM(CASE WHEN win_pts=0.5 THEN 1 ELSE 0 END)"),
+    ("win_pts",         "SUM(win_pts)"),
+    ("games_home",      "SUM(CASE WHEN is_home THEN 1 ELSE 0 END)"),
+    ("wins_home",       "SUM(CASE WHEN is_home AND win_pts=1 THEN 1 ELSE 0 END)"),
+    ("games_away",      "SUM(CASE WHEN NOT is_home THEN 1 ELSE 0 END)"),
+    ("wins_away",       "SUM(CASE WHEN NOT is_home AND win_pts=1 THEN 1 ELSE 0 END)"),
+    ("games_primetime", "SUM(CASE WHEN is_primetime THEN 1 ELSE 0 END)"),
+    ("wins_primetime",  "SUM(CASE WHEN is_primetime AND win_pts=1 THEN 1 ELSE 0 END)"),
+    ("games_morning",   "SUM(CASE WHEN is_morning THEN 1 ELSE 0 END)"),
+    ("wins_morning",    "SUM(CASE WHEN is_morning AND win_pts=1 THEN 1 ELSE 0 END)"),
+    ("games_afternoon", "SUM(CASE WHEN is_afternoon THEN 1 ELSE 0 END)"),
+    ("wins_afternoon",  "SUM(CASE WHEN is_afternoon AND win_pts=1 THEN 1 ELSE 0 END)"),
+    ("games_evening",   "SUM(CASE WHEN is_evening THEN 1 ELSE 0 END)"),
+    ("wins_evening",    "SUM(CASE WHEN is_evening AND win_pts=1 THEN 1 ELSE 0 END)"),
+    ("games_playoff",   "SUM(CASE WHEN is_playoff THEN 1 ELSE 0 END)"),
+    ("wins_playoff",    "SUM(CASE WHEN is_playoff AND win_pts=1 THEN 1 ELSE 0 END)"),
+    ("wins_regular",    "SUM(CASE WHEN NOT is_playoff AND win_pts=1 THEN 1 ELSE 0 END)"),
+    ("games_vs_500",    "SUM(CASE WHEN opp_is_500_plus THEN 1 ELSE 0 END)"),
+    ("wins_pts_vs_500", "SUM(CASE WHEN opp_is_500_plus THEN win_pts ELSE 0 END)"),
+    ("wins_vs_500",     "SUM(CASE WHEN opp_is_500_plus AND win_pts=1 THEN 1 ELSE 0 END)"),
+]
+MEASURE_COLS = [m for m, _ in MEASURES]
+
+# season IS NULL marks the all-time row
+SQL_FACT_DDL = f"""
+CREATE SCHEMA IF NOT EXISTS mart;
+CREATE TABLE IF NOT EXISTS {FACT} (
+  entity_type text NOT NULL,
+  entity_id   text NOT NULL,
+  entity_name text,
+  season      int,
+  {",".join(f"{chr(10)}  {m} {'numeric' if m in ('win_pts', 'wins_pts_vs_500') else 'bigint'}" for m in MEASURE_COLS)}
+);
+"""
+
+SQL_FACT_INDEXES = f"""
+CREATE UNIQUE INDEX IF NOT EXISTS ux_fact_splits ON {FACT} (entity_type, entity_id, COALESCE(season, -1));
+CREATE INDEX IF NOT EXISTS ix_fact_splits_season ON {FACT} (entity_type, season);
+"""
+
+def fact_select_sql(entities=tuple(ENTITIES), alltime: bool = True, season_filter: bool = False) -> str:
+    """
+    One GROUPING SETS scan producing (entity, season) rows -- plus (entity) all-time rows when `alltime` --
+    for every requested entity type. With `season_filter` the scan is restricted to `season = ANY(:s)`.
+    """
+    src_cols = ",\n    ".join(f"{ENTITIES[e]['id']} AS {e}_id, {ENTITIES[e]['name']} AS {e}_name" for e in entities)
+    joins = "\n  ".join(ENTITIES[e]["join"] for e in entities if ENTITIES[e]["join"])
+    sets = ", ".join(f"({e}_id, season)" + (f", ({e}_id)" if alltime else "") for e in entities)
+    case = lambda expr: "CASE " + " ".join(
+        f"WHEN GROUPING({e}_id) = 0 THEN {expr(e)}" for e in entities) + " END"
+    return f"""
+SELECT entity_type, entity_id, entity_name, season, {", ".join(MEASURE_COLS)}
+FROM (
+  SELECT
+    {case(lambda e: repr(e))} AS entity_type,
+    {case(lambda e: f"{e}_id")} AS entity_id,
+    {case(lambda e: f"MAX({e}_name)")} AS entity_name,
+    CASE WHEN GROUPING(season) = 0 THEN season END AS season,
+    {(","+chr(10)+"    ").join(f"{expr} AS {m}" for m, expr in MEASURES)}
+  FROM (
+    SELECT g.*,
+    {src_cols}
+    FROM mart.v_team_games_enriched g
+    {joins}
+    {"WHERE g.season = ANY(:s)" if season_filter else ""}
+  ) src
+  GROUP BY GROUPING SETS ({sets})
+) x
+WHERE entity_id IS NOT NULL
+"""
+
+def fact_build_sql(entities=tuple(ENTITIES)) -> str:
+    cols = ", ".join(["entity_type", "entity_id", "entity_name", "season"] + MEASURE_COLS)
+    return f"DELETE FROM {FACT};\nINSERT INTO {FACT} ({cols})\n{fact_select_sql(entities)};"
+
+def available_entities(con) -> list[str]:
+    return [e for e, spec in ENTITIES.items()
+            if con.execute(text("SELECT to_regclass(:r)"), {"r": spec["requires"]}).scalar()]
+
+def rebuild_fact(con) -> list[str]:
+    """Full rebuild of the fact table for whichever entity sources exist yet (team first, QB/coach once built)."""
+    con.execute(text(SQL_FACT_DDL))
+    con.execute(text(SQL_FACT_INDEXES))
+    entities = available_entities(con)
+    con.execute(text(fact_build_sql(entities)))
+    con.execute(text(f"ANALYZE {FACT}"))
+    print(f"[splits] {FACT} rebuilt in one scan for: {', '.join(entities)}")
+    return entities
+
+def refresh_fact_seasons(con, seasons):
+    """
+    Incremental: recompute the (entity, season) rows of `seasons` in one season-filtered scan,
+    then re-roll only the all-time rows of the entities that appear in them.
+    """
+    t0 = time.perf_counter()
+    entities = available_entities(con)
+    cols = ", ".join(["entity_type", "entity_id", "entity_name", "season"] + MEASURE_COLS)
+    con.execute(text(f"""
+        CREATE TEMP TABLE _touched ON COMMIT DROP AS
+          SELECT DISTINCT entity_type, entity_id FROM {FACT} WHERE season = ANY(:s);
+        DELETE FROM {FACT} WHERE season = ANY(:s);
+        INSERT INTO {FACT} ({cols})
+        {fact_select_sql(entities, alltime=False, season_filter=True)};
+        INSERT INTO _touched SELECT DISTINCT entity_type, entity_id FROM {FACT} WHERE season = ANY(:s);
+
+        DELETE FROM {FACT} f
+        USING (SELECT DISTINCT entity_type, entity_id FROM _touched) t
+        WHERE f.season IS NULL AND f.entity_type = t.entity_type AND f.entity_id = t.entity_id;
+        INSERT INTO {FACT} ({cols})
+        SELECT f.entity_type, f.entity_id, MAX(f.entity_name), NULL, {", ".join(f"SUM(f.{m})" for m in MEASURE_COLS)}
+        FROM {FACT} f
+        JOIN (SELECT DISTINCT entity_type, entity_id FROM _touched) t
+          ON t.entity_type = f.entity_type AND t.entity_id = f.entity_id
+        WHERE f.season IS NOT NULL
+        GROUP BY f.entity_type, f.entity_id;
+        DROP TABLE _touched;
+    """), {"s": list(seasons)})
+    print(f"[splits] {FACT}: seasons {list(seasons)} refreshed for: {', '.join(entities)} "
+          f"in {time.perf_counter()-t0:.2f}s")
@@ -0,0 +1,184 @@
+# In-memory splits for notebooks: load the team-game stream once as NumPy columns and answer
+# team / QB / coach split questions with vectorized group-by reductions (same columns as the mart views).
+from __future__ import annotations
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from Db_Conn import get_engine
+from Splits import ENTITIES, MEASURE_COLS
+
+FLAGS = ["is_home", "is_primetime", "is_morning", "is_afternoon", "is_evening", "is_playoff", "opp_is_500_plus"]
+
+# NumPy twin of Splits.MEASURES: per-row weight whose group sum is the measure
+ROW_WEIGHTS = {
+    "games":           lambda w, f: np.ones_like(w),
+    "wins":            lambda w, f: w == 1,
+    "losses":          lambda w, f: w == 0,
+    "ties":            lambda w, f: w == 0.5,
+    "win_pts":         lambda w, f: w,
+    "games_home":      lambda w, f: f["is_home"],
+    "wins_home":       lambda w, f: f["is_home"] & (w == 1),
+    "games_away":      lambda w, f: ~f["is_home"],
+    "wins_away":       lambda w, f: ~f["is_home"] & (w == 1),
+    "games_primetime": lambda w, f: f["is_primetime"],
+    "wins_primetime":  lambda w, f: f["is_primetime"] & (w == 1),
+    "games_morning":   lambda w, f: f["is_morning"],
+    "wins_morning":    lambda w, f: f["is_morning"] & (w == 1),
+    "games_afternoon": lambda w, f: f["is_afternoon"],
+    "wins_afternoon":  lambda w, f: f["is_afternoon"] & (w == 1),
+    "games_evening":   lambda w, f: f["is_evening"],
+    "wins_evening":    lambda w, f: f["is_evening"] & (w == 1),
+    "games_playoff":   lambda w, f: f["is_playoff"],
+    "wins_playoff":    lambda w, f: f["is_playoff"] & (w == 1),
+    "wins_regular":    lambda w, f: ~f["is_playoff"] & (w == 1),
+    "games_vs_500":    lambda w, f: f["opp_is_500_plus"],
+    "wins_pts_vs_500": lambda w, f: np.where(f["opp_is_500_plus"], w, 0.0),
+    "wins_vs_500":     lambda w, f: f["opp_is_500_plus"] & (w == 1),
+}
+FLOAT_MEASURES = {"win_pts", "wins_pts_vs_500"}
+
+_RECORD = ["games", "wins", "losses", "ties", "win_pct"]
+_COACH = _RECORD + ["games_home", "wins_home", "games_away", "wins_away", "games_primetime", "wins_primetime",
+                    "games_playoff", "wins_playoff", "games_vs_500", "wins_vs_500"]
+_KICKOFF = ["games_morning", "wins_morning", "games_afternoon", "wins_afternoon", "games_evening", "wins_evening"]
+_TEAM = _RECORD + ["wins_home", "wins_away", "wins_primetime", "wins_morning", "wins_afternoon",
+                   "wins_playoff", "wins_regular", "games_vs_500", "wins_pts_vs_500", "wins_vs_500", "win_pct_vs_500"]
+
+# (entity, by_season) -> (mart view, key columns, value columns), mirroring the view definitions
+VIEWS = {
+    ("team", False):  ("v_team_alltime_splits",  ["team"],                     _TEAM),
+    ("team", True):   ("v_team_season_splits",   ["season", "team"],           _TEAM),
+    ("qb", False):    ("v_qb_alltime_splits",    ["qb_id", "qb_name"],         _COACH[:11] + _KICKOFF + _COACH[11:]),
+    ("qb", True):     ("v_qb_season_splits",     ["season", "qb_id", "qb_name"], _COACH + _KICKOFF),
+    ("coach", False): ("v_coach_alltime_splits", ["head_coach"],               _COACH),
+    ("coach", True):  ("v_coach_season_splits",  ["season", "head_coach"],     _COACH),
+}
+
+def _round(x: np.ndarray, digits: int = 4) -> np.ndarray:
+    """Postgres ROUND(numeric): halves go away from zero (np.round would go to even)."""
+    f = 10.0 ** digits
+    return np.floor(x * f + 0.5 + 1e-9) / f
+
+def games_sql() -> str:
+    """The fact_splits source stream: one row per team-game with every entity id attached."""
+    cols = ", ".join(f"{ENTITIES[e]['id']} AS {e}_id, {ENTITIES[e]['name']} AS {e}_name" for e in ENTITIES)
+    joins = "\n".join(ENTITIES[e]["join"] for e in ENTITIES if ENTITIES[e]["join"])
+    return f"SELECT g.season, g.win_pts, {', '.join('g.' + f for f in FLAGS)}, {cols}\n" \
+           f"FROM mart.v_team_games_enriched g\n{joins}"
+
+class GameArrays:
+    """Columnar team-game stream with precomputed measure weights and per-entity group indexes."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.n = len(df)
+        win_pts = pd.to_numeric(df["win_pts"]).to_numpy(float)
+        flags = {f: df[f].fillna(False).to_numpy(bool) for f in FLAGS}
+        self.seasons, self.season_idx = np.unique(df["season"].to_numpy(np.int64), return_inverse=True)
+        self.season = df["season"].to_numpy(np.int64)
+        # measures x rows, so one reduceat call sums every measure at once
+        self.weights = np.vstack([np.asarray(ROW_WEIGHTS[m](win_pts, flags), dtype=float) for m in MEASURE_COLS])
+        self.entities = {}
+        for e in ENTITIES:
+            codes, ids = pd.factorize(df[f"{e}_id"])
+            names = df[f"{e}_name"].astype(object).where(df[f"{e}_name"].notna(), None).to_numpy()
+            self.entities[e] = (codes, np.asarray(ids, dtype=object), names)
+        self._groups = {}
+
+    @classmethod
+    def from_db(cls, eng=None) -> "GameArrays":
+        eng = eng or get_engine()
+        t0 = time.perf_counter()
+        with eng.connect() as con:
+            df = pd.read_sql(text(games_sql()), con)
+        ga = cls(df)
+        print(f"[mem] loaded {ga.n:,} team-games in {time.perf_counter()-t0:.2f}s")
+        return ga
+
+    def _grouping(self, entity: str, by_season: bool):
+        """Row order and group starts for one grouping (built once, then reused by every query)."""
+        key = (entity, by_season)
+        if key not in self._groups:
+            codes, ids, names = self.entities[entity]
+            keep = np.flatnonzero(codes >= 0)
+            gkey = codes[keep] * len(self.seasons) + self.season_idx[keep] if by_season else codes[keep]
+            s = np.argsort(gkey, kind="stable")
+            order, gsorted = keep[s], gkey[s]
+            starts = np.flatnonzero(np.r_[True, gsorted[1:] != gsorted[:-1]]) if len(gsorted) else np.array([], int)
+            first = order[starts]
+            # MAX(name) per group, as the SQL views do
+            group_of_row = np.cumsum(np.r_[True, gsorted[1:] != gsorted[:-1]]) - 1 if len(gsorted) else gsorted
+            name_max = pd.Series(names[order]).groupby(group_of_row).max()
+            self._groups[key] = (order, starts, ids[codes[first]], self.season[first], name_max.to_numpy(object),
+                                 np.ascontiguousarray(self.weights[:, order]))
+        return self._groups[key]
+
+    def splits(self, entity: str = "team", by_season: bool = False, seasons=None, as_frame: bool = True):
+        """
+        Same rows and columns as the matching mart.v_*_splits view. `seasons` restricts the games
+        counted (for all-time views: a multi-season total over just those seasons).
+        as_frame=False returns the {column: ndarray} dict and skips DataFrame construction (the bulk of the cost).
+        """
+        order, starts, ids, grp_season, grp_name, w = self._grouping(entity, by_season)
+        if seasons is not None:
+            w = w * np.isin(self.season[order], list(seasons))
+        sums = np.add.reduceat(w, starts, axis=1) if len(starts) else np.zeros((len(MEASURE_COLS), 0))
+        m = dict(zip(MEASURE_COLS, sums))
+        live = m["games"] > 0
+        out = {}
+        view, keys, values = VIEWS[(entity, by_season)]
+        key_src = {"season": grp_season, "qb_name": grp_name}
+        for k in keys:
+            out[k] = key_src.get(k, ids)[live]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            derived = {
+                "win_pct": _round(m["win_pts"] / m["games"]),
+                "win_pct_vs_500": _round(np.where(m["games_vs_500"] > 0, m["wins_pts_vs_500"] / m["games_vs_500"], np.nan)),
+            }
+        for c in values:
+            v = derived[c] if c in derived else m[c]
+            out[c] = (v if c in derived or c in FLOAT_MEASURES else v.astype(np.int64))[live]
+        return pd.DataFrame(out) if as_frame else out
+
+def _same(mem: pd.DataFrame, sql: pd.DataFrame, keys: list[str]) -> bool:
+    a = mem.sort_values(keys).reset_index(drop=True)
+    b = sql.sort_values(keys).reset_index(drop=True)
+    for c in a.columns:
+        if c not in keys:
+            b[c] = pd.to_numeric(b[c]).astype(float)
+            a[c] = a[c].astype(float)
+    try:
+        pd.testing.assert_frame_equal(a, b[a.columns], check_dtype=False, check_exact=False, rtol=1e-9)
+        return list(a.columns) == list(sql.columns)
+    except AssertionError:
+        return False
+
+def benchmark(ga: GameArrays | None = None, eng=None, repeat: int = 20) -> pd.DataFrame:
+    """Time every split view via SQL (read_sql round trip) and in memory, and check they agree."""
+    eng = eng or get_engine()
+    ga = ga or GameArrays.from_db(eng)
+    rows = []
+    for (entity, by_season), (view, keys, _) in VIEWS.items():
+        t0 = time.perf_counter()
+        for _ in range(max(1, repeat // 5)):
+            with eng.connect() as con:
+                sql = pd.read_sql(text(f"SELECT * FROM mart.{view}"), con)
+        sql_ms = (time.perf_counter() - t0) * 1000 / max(1, repeat // 5)
+        ga.splits(entity, by_season)   # build the cached grouping outside the timed loop
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            ga.splits(entity, by_season, as_frame=False)
+        arr_ms = (time.perf_counter() - t0) * 1000 / repeat
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            mem = ga.splits(entity, by_season)
+        mem_ms = (time.perf_counter() - t0) * 1000 / repeat
+        rows.append({"view": view, "rows": len(mem), "sql_ms": round(sql_ms, 2), "arrays_ms": round(arr_ms, 3),
+                     "frame_ms": round(mem_ms, 3), "speedup": round(sql_ms / arr_ms, 1),
+                     "match": _same(mem, sql, keys)})
+    res = pd.DataFrame(rows)
+    print(res.to_string(index=False))
+    return res
+
+if __name__ == "__main__":
+    benchmark()
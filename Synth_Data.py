@@ -0,0 +1,629 @@
+# Synthetic nflverse-shaped data for stress tests and offline work: schedules, weekly player stats and
+# play-by-play with the hist_schedules / hist_weekly / hist_pbp column sets, for any number of seasons or
+# teams, deterministic from SEED. Writes a data_historic-style directory (schedules_*, weekly_*, pbp_*
+# parquet, manifest.json, team_divisions.csv) that Load_Historical (NFL_DATA_DIR=<dir>), Mart_Offline.build(<dir>)
+# and Extract_Historical(SOURCE_DIR=...) read as-is. Every array is drawn whole per season chunk, so 100x
+# runs in minutes.
+from __future__ import annotations
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from Extract_Historical import file_digest
+from Load_Historical import PBP_COLUMNS
+
+ROOT = Path(__file__).resolve().parent
+OUT_DIR = ROOT / "data_synthetic"
+
+SEED = 2024
+FIRST_SEASON = 2000
+SEASONS = 25            # 250 = 10x, 2500 = 100x the real history
+TEAMS = 32              # multiple of 4 (divisions of four, two conferences), at least PLAYOFF_TEAMS
+REG_WEEKS = 18          # 17 games and one bye per team
+BYE_WEEKS = (5, 14)
+DRIVES = 12             # possessions per team per game
+PLAYOFF_TEAMS = 12      # 4 byes + wild card, divisional, conference and Super Bowl rounds
+PBP_SEASONS = 25        # play-by-play for the last N seasons only (None = every season; ~45k plays/season)
+CHUNK_SEASONS = 25      # weekly rows are generated and written this many seasons at a time
+
+TEAM_CODES = ["ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB", "HOU", "IND",
+              "JAX", "KC", "LA", "LAC", "LV", "MIA", "MIN", "NE", "NO", "NYG", "NYJ", "PHI", "PIT", "SEA", "SF",
+              "TB", "TEN", "WAS"]
+FIRST_NAMES = ["Aaron", "Adam", "Alex", "Andre", "Ben", "Brandon", "Brian", "Calvin", "Chris", "Cole", "Darius",
+               "David", "Derek", "Devin", "Drew", "Eli", "Eric", "Frank", "Greg", "Isaiah", "Jalen", "Jamal",
+               "Jason", "Jaylen", "Joe", "Jordan", "Josh", "Justin", "Kevin", "Kyle", "Lamar", "Marcus", "Matt",
+               "Mike", "Nick", "Patrick", "Ray", "Ryan", "Sam", "Sean", "Terrell", "Tom", "Travis", "Trey", "Tyler",
+               "Victor", "Will", "Zach"]
+LAST_NAMES = ["Adams", "Allen", "Bailey", "Baker", "Bell", "Brooks", "Brown", "Carter", "Clark", "Coleman", "Cook",
+              "Cooper", "Davis", "Edwards", "Evans", "Fisher", "Foster", "Gordon", "Graham", "Gray", "Green",
+              "Griffin", "Hall", "Harris", "Hayes", "Hill", "Howard", "Hughes", "Jackson", "James", "Jenkins",
+              "Johnson", "Jones", "Kelly", "King", "Lee", "Lewis", "Martin", "Mason", "Miller", "Mitchell",
+              "Moore", "Morgan", "Morris", "Murphy", "Nelson", "Parker", "Perry", "Peterson", "Phillips",
+              "Price", "Reed", "Rice", "Roberts", "Robinson", "Rogers", "Ross", "Sanders", "Scott", "Smith",
+              "Stewart", "Taylor", "Thomas", "Turner", "Walker", "Ward", "Washington", "Watson", "White",
+              "Williams", "Wilson", "Wright", "Young"]
+_SUFFIXES = ["", " II", " III", " IV", " V"] + [f" {i}" for i in range(6, 2000)]
+
+# weekly roster slots: the game's QB is QB1 or QB2; receivers are slots 2..9, rushers QB/RB1/RB2/WR1/WR2
+SLOTS = ["QB1", "QB2", "RB1", "RB2", "WR1", "WR2", "WR3", "WR4", "TE1", "TE2"]
+SLOT_POS = np.array(["QB", "QB", "RB", "RB", "WR", "WR", "WR", "WR", "TE", "TE"], dtype=object)
+TURNOVER = np.array([0.18, 0.25, 0.35, 0.4, 0.3, 0.3, 0.35, 0.4, 0.25, 0.35])   # new player in the slot next season
+RECEIVERS = [2, 3, 4, 5, 6, 7, 8, 9]
+RECV_ALPHA = np.array([1.2, 0.5, 3.0, 2.2, 1.4, 0.5, 1.8, 0.6]) * 4
+RECV_CATCH = np.array([0.78, 0.76, 0.63, 0.62, 0.62, 0.6, 0.7, 0.68])
+RECV_YPR = np.array([7.5, 7.0, 13.0, 12.0, 11.5, 11.0, 10.5, 9.5])
+RECV_ADOT = np.array([1.0, 0.5, 10.5, 9.5, 9.0, 8.5, 7.0, 6.0])
+RUSH_ALPHA = np.array([0.6, 6.0, 2.5, 0.15, 0.1]) * 4   # QB, RB1, RB2, WR1, WR2
+RUSH_YPC = np.array([5.0, 4.3, 4.1, 6.5, 6.0])
+
+SCHEDULE_SCHEMA = pa.schema([
+    ("game_id", pa.string()), ("season", pa.int64()), ("game_type", pa.string()), ("week", pa.int64()),
+    ("gameday", pa.string()), ("weekday", pa.string()), ("gametime", pa.string()),
+    ("away_team", pa.string()), ("away_score", pa.float64()), ("home_team", pa.string()), ("home_score", pa.float64()),
+    ("location", pa.string()), ("result", pa.float64()), ("total", pa.float64()), ("overtime", pa.float64()),
+    ("old_game_id", pa.int64()), ("gsis", pa.float64()), ("nfl_detail_id", pa.string()), ("pfr", pa.string()),
+    ("pff", pa.float64()), ("espn", pa.int64()), ("ftn", pa.float64()), ("away_rest", pa.int64()), ("home_rest", pa.int64()),
+    ("away_moneyline", pa.float64()), ("home_moneyline", pa.float64()), ("spread_line", pa.float64()),
+    ("away_spread_odds", pa.float64()), ("home_spread_odds", pa.float64()), ("total_line", pa.float64()),
+    ("under_odds", pa.float64()), ("over_odds", pa.float64()), ("div_game", pa.int64()),
+    ("roof", pa.string()), ("surface", pa.string()), ("temp", pa.float64()), ("wind", pa.float64()),
+    ("away_qb_id", pa.string()), ("home_qb_id", pa.string()), ("away_qb_name", pa.string()), ("home_qb_name", pa.string()),
+    ("away_coach", pa.string()), ("home_coach", pa.string()), ("referee", pa.string()),
+    ("stadium_id", pa.string()), ("stadium", pa.string()),
+])
+_I, _F, _S = pa.int32(), pa.float32(), pa.string()
+WEEKLY_SCHEMA = pa.schema([
+    ("player_id", _S), ("player_name", _S), ("player_display_name", _S), ("position", _S), ("position_group", _S),
+    ("headshot_url", _S), ("recent_team", _S), ("season", _I), ("week", _I), ("season_type", _S), ("opponent_team", _S),
+    ("completions", _I), ("attempts", _I), ("passing_yards", _F), ("passing_tds", _I), ("interceptions", _F),
+    ("sacks", _F), ("sack_yards", _F), ("sack_fumbles", _I), ("sack_fumbles_lost", _I), ("passing_air_yards", _F),
+    ("passing_yards_after_catch", _F), ("passing_first_downs", _F), ("passing_epa", _F),
+    ("passing_2pt_conversions", _I), ("pacr", _F), ("dakota", _F), ("carries", _I), ("rushing_yards", _F),
+    ("rushing_tds", _I), ("rushing_fumbles", _F), ("rushing_fumbles_lost", _F), ("rushing_first_downs", _F),
+    ("rushing_epa", _F), ("rushing_2pt_conversions", _I), ("receptions", _I), ("targets", _I),
+    ("receiving_yards", _F), ("receiving_tds", _I), ("receiving_fumbles", _F), ("receiving_fumbles_lost", _F),
+    ("receiving_air_yards", _F), ("receiving_yards_after_catch", _F), ("receiving_first_downs", _F),
+    ("receiving_epa", _F), ("receiving_2pt_conversions", _I), ("racr", _F), ("target_share", _F),
+    ("air_yards_share", _F), ("wopr", _F), ("special_teams_tds", _F), ("fantasy_points", _F), ("fantasy_points_ppr", _F),
+])
+PBP_SCHEMA = pa.schema(list(PBP_COLUMNS.items()))
+
+def _names(uids: np.ndarray, offset: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Deterministic unique (display name, abbreviated name) per id."""
+    u = np.asarray(uids) + offset
+    nf, nl = len(FIRST_NAMES), len(LAST_NAMES)
+    first = np.array(FIRST_NAMES, dtype=object)[u % nf]
+    last = np.array(LAST_NAMES, dtype=object)[(u // nf) % nl] + np.array(_SUFFIXES, dtype=object)[u // (nf * nl)]
+    initial = np.array([f[0] for f in FIRST_NAMES], dtype=object)[u % nf]
+    return first + " " + last, initial + "." + last
+
+def _lookup(strings, idx: np.ndarray, mask: np.ndarray | None = None) -> pa.Array:
+    """strings[idx] as an Arrow string column, built by a dictionary cast rather than per-row Python objects."""
+    indices = pa.array(np.asarray(idx, dtype=np.int32), mask=mask)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(list(strings), pa.string())).cast(pa.string())
+
+def _num(values: np.ndarray, typ: pa.DataType, null: np.ndarray | None = None) -> pa.Array:
+    return pa.array(np.asarray(values).astype(typ.to_pandas_dtype()), typ, mask=null)
+
+def _round_half(x: np.ndarray) -> np.ndarray:
+    return np.round(x * 2) / 2
+
+def _group_rank(keys: np.ndarray) -> np.ndarray:
+    """0-based position of each row within its run of equal (already sorted) keys."""
+    start = np.r_[True, keys[1:] != keys[:-1]]
+    idx = np.arange(len(keys))
+    return idx - np.maximum.accumulate(np.where(start, idx, 0))
+
+class League:
+    """Teams, divisions, ratings, coaches and roster slots for every season, drawn once from SEED."""
+
+    def __init__(self, seasons: np.ndarray, teams: int, seed: int = SEED):
+        if teams % 4 or teams < PLAYOFF_TEAMS:
+            raise ValueError(f"TEAMS must be a multiple of 4 and at least {PLAYOFF_TEAMS}, got {teams}")
+        rng = np.random.default_rng([seed, 1])
+        S, T = len(seasons), teams
+        self.seasons, self.S, self.T = seasons, S, T
+        extra = [f"X{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(max(0, T - len(TEAM_CODES)))]
+        self.codes = np.array((TEAM_CODES + extra)[:T], dtype=object)
+        self.division = np.arange(T) // 4
+        self.conference = np.where(self.division < T // 8, "AFC", "NFC")
+        self.roof = rng.choice(["outdoors", "dome", "closed", "open"], T, p=[0.7, 0.16, 0.1, 0.04])
+        self.surface = rng.choice(["grass", "fieldturf", "sportturf", "matrixturf", "astroturf", "a_turf"], T,
+                                  p=[0.56, 0.26, 0.06, 0.05, 0.05, 0.02])
+        self.stadium_id = np.array([f"{c}00" for c in self.codes], dtype=object)
+        self.stadium = np.array([f"{c} Stadium" for c in self.codes], dtype=object)
+
+        # team strength: AR(1) across seasons, in points of expected margin per unit
+        self.rating = np.empty((S, T))
+        self.rating[0] = rng.normal(0, 1, T)
+        for s in range(1, S):
+            self.rating[s] = 0.6 * self.rating[s - 1] + rng.normal(0, 0.8, T)
+
+        # coaches: a new one with 14% chance a season; ids are unique per (team, tenure)
+        change = rng.random((S, T)) < 0.14
+        change[0] = True
+        tenure = np.cumsum(change, axis=0) - 1
+        _, self.coach = np.unique(np.arange(T)[None, :] * S + tenure, return_inverse=True)
+        self.coach = self.coach.reshape(S, T)
+        self.coach_names, _ = _names(np.arange(self.coach.max() + 1), offset=17)
+
+        # players: one per (team, slot, tenure); slot turnover between seasons
+        change = rng.random((S, T, len(SLOTS))) < TURNOVER
+        change[0] = True
+        tenure = np.cumsum(change, axis=0) - 1
+        key = (np.arange(T)[:, None] * len(SLOTS) + np.arange(len(SLOTS))[None, :])[None] * S + tenure
+        _, pid = np.unique(key, return_inverse=True)
+        self.pid = pid.reshape(S, T, len(SLOTS))
+        n = self.pid.max() + 1
+        slot_of = np.empty(n, dtype=np.int64)
+        slot_of[self.pid.ravel()] = np.tile(np.arange(len(SLOTS)), S * T)
+        self.player_pos = SLOT_POS[slot_of]
+        self.player_ids = np.array([f"00-{20000 + u:07d}" for u in range(n)], dtype=object)
+        self.player_display, self.player_abbr = _names(np.arange(n), offset=101)
+        self.player_name_null = rng.random(n) < 0.48
+        self.headshot = np.array([f"https://static.www.nfl.com/image/private/f_auto,q_auto/league/syn{u:07d}"
+                                  for u in range(n)], dtype=object)
+        self.headshot_null = rng.random(n) < 0.42
+        self.skill = rng.normal(0, 1, n)
+        self.referees, _ = _names(np.arange(90), offset=5003)
+
+    def divisions_frame(self) -> pd.DataFrame:
+        names = np.array(["East", "North", "South", "West"], dtype=object)
+        div_in_conf = self.division % (self.T // 8)
+        label = names[div_in_conf % 4] + np.where(div_in_conf >= 4, (div_in_conf // 4 + 1).astype(str), "")
+        return pd.DataFrame({
+            "season": np.repeat(self.seasons, self.T), "team": np.tile(self.codes, self.S),
+            "conference": np.tile(self.conference, self.S), "division": np.tile(label, self.S),
+        })
+
+def _play(rng, lg: League, s: np.ndarray, home: np.ndarray, away: np.ndarray, neutral: np.ndarray,
+          playoff: bool) -> dict:
+    """Scores built drive by drive around a rating-driven line; playoff games never tie."""
+    n = len(s)
+    margin = np.where(neutral, 0.0, 2.0) + 3.5 * (lg.rating[s, home] - lg.rating[s, away])
+    total = rng.normal(44, 4, n)
+    mu_h, mu_a = np.clip((total + margin) / 2, 6, None), np.clip((total - margin) / 2, 6, None)
+    # each of a team's DRIVES ends in a touchdown, a field goal or nothing
+    p_td_h, p_td_a = np.clip(mu_h * 0.72 / 7 / DRIVES, 0, 0.6), np.clip(mu_a * 0.72 / 7 / DRIVES, 0, 0.6)
+    td_h, td_a = rng.binomial(DRIVES, p_td_h), rng.binomial(DRIVES, p_td_a)
+    fg_h = rng.binomial(DRIVES - td_h, np.clip(mu_h * 0.28 / 3 / DRIVES / (1 - p_td_h), 0, 1))
+    fg_a = rng.binomial(DRIVES - td_a, np.clip(mu_a * 0.28 / 3 / DRIVES / (1 - p_td_a), 0, 1))
+    pts_h = 7 * td_h + 3 * fg_h - rng.binomial(td_h, 0.05)
+    pts_a = 7 * td_a + 3 * fg_a - rng.binomial(td_a, 0.05)
+    tie = pts_h == pts_a
+    overtime = tie & ((rng.random(n) < 0.85) | playoff)
+    home_fg = rng.random(n) < 0.5
+    pts_h = pts_h + np.where(overtime & home_fg, 3, 0)
+    pts_a = pts_a + np.where(overtime & ~home_fg, 3, 0)
+    return {"home_score": pts_h, "away_score": pts_a, "home_td": td_h, "away_td": td_a,
+            "overtime": (overtime | (tie & ~overtime)).astype(float),
+            "spread_line": _round_half(margin + rng.normal(0, 1.5, n)),
+            "total_line": _round_half(total + rng.normal(0, 2, n))}
+
+def _kickoff_sundays(seasons: np.ndarray) -> np.ndarray:
+    sep5 = np.array([f"{y:04d}-09-05" for y in seasons], dtype="datetime64[D]")
+    weekday = (sep5.astype(np.int64) + 3) % 7            # Monday = 0
+    return sep5 + (3 - weekday) % 7 + 3                  # first Thursday on/after Sep 5, then its Sunday
+
+def schedule(lg: League, seed: int = SEED) -> pd.DataFrame:
+    """Every game of every season; columns starting with "_" carry the ids the weekly/pbp generators reuse."""
+    rng = np.random.default_rng([seed, 0])
+    S, T, W = lg.S, lg.T, REG_WEEKS
+    weeks = np.arange(1, W + 1)
+
+    # regular season: teams paired off per season, each pair shares a bye; the rest are paired at random
+    perm = rng.permuted(np.tile(np.arange(T), (S, 1)), axis=1)
+    pair_bye = rng.integers(BYE_WEEKS[0], BYE_WEEKS[1] + 1, size=(S, T // 2))
+    bye = np.empty((S, T), dtype=np.int64)
+    rows = np.arange(S)[:, None]
+    bye[rows, perm[:, 0::2]] = pair_bye
+    bye[rows, perm[:, 1::2]] = pair_bye
+    on_bye = bye[:, None, :] == weeks[None, :, None]
+    keys = np.where(on_bye, 2.0, rng.random((S, W, T)))
+    order = np.argsort(keys, axis=2)
+    n_avail = T - on_bye.sum(axis=2)
+    p = np.arange(T)
+    s_i, w_i, p_i = np.nonzero((p % 2 == 0)[None, None, :] & (p[None, None, :] + 1 < n_avail[..., None]))
+    games = [{"s": s_i, "week": w_i + 1, "home": order[s_i, w_i, p_i], "away": order[s_i, w_i, p_i + 1],
+              "rank": p_i // 2, "game_type": np.full(len(s_i), "REG", dtype=object),
+              "neutral": np.zeros(len(s_i), bool)}]
+    games[0].update(_play(rng, lg, games[0]["s"], games[0]["home"], games[0]["away"], games[0]["neutral"], False))
+
+    # playoffs: seeded by regular-season wins; byes for the top 4, higher seed hosts, reseeded each round
+    g = games[0]
+    win_h = np.sign(g["home_score"] - g["away_score"]) / 2 + 0.5
+    wins = (np.bincount(g["s"] * T + g["home"], win_h, S * T) +
+            np.bincount(g["s"] * T + g["away"], 1 - win_h, S * T)).reshape(S, T)
+    seeds = np.argsort(-(wins + rng.random((S, T)) * 0.1), axis=1)[:, :PLAYOFF_TEAMS]
+    alive = np.tile(np.arange(4, PLAYOFF_TEAMS), (S, 1))
+    for k, gtype in enumerate(["WC", "DIV", "CON", "SB"]):
+        if gtype == "DIV":
+            alive = np.sort(np.concatenate([np.tile(np.arange(4), (S, 1)), alive], axis=1), axis=1)
+        half = alive.shape[1] // 2
+        hs, as_ = alive[:, :half], alive[:, ::-1][:, :half]
+        s = np.repeat(np.arange(S), half)
+        rnd = {"s": s, "week": np.full(len(s), W + 1 + k), "home": seeds[s, hs.ravel()], "away": seeds[s, as_.ravel()],
+               "rank": np.tile(np.arange(half), S), "game_type": np.full(len(s), gtype, dtype=object),
+               "neutral": np.full(len(s), gtype == "SB")}
+        rnd.update(_play(rng, lg, rnd["s"], rnd["home"], rnd["away"], rnd["neutral"], True))
+        games.append(rnd)
+        alive = np.sort(np.where(rnd["home_score"] > rnd["away_score"], hs.ravel(), as_.ravel()).reshape(S, half), axis=1)
+    g = {k: np.concatenate([x[k] for x in games]) for k in games[0]}
+    n = len(g["s"])
+
+    # dates and kickoff slots: TNF / MNF / SNF in the regular season, late-season Saturdays, SB two weeks on
+    sunday = _kickoff_sundays(lg.seasons)[g["s"]] + 7 * (g["week"] - 1) + np.where(g["game_type"] == "SB", 7, 0)
+    reg, r = g["game_type"] == "REG", g["rank"]
+    saturday = (reg & (g["week"] >= 15) & np.isin(r, [3, 4]) & (rng.random(n) < 0.5)) | \
+               (np.isin(g["game_type"], ["WC", "DIV"]) & (r < 2))
+    offset = np.select([reg & (r == 0), reg & (r == 1), saturday], [-3, 1, -1], 0)
+    date = sunday + offset
+    weekday = np.array(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+                       dtype=object)[(date.astype(np.int64) + 3) % 7]
+    sunday_slot = rng.choice(["13:00", "16:05", "16:25"], n, p=[0.72, 0.13, 0.15])
+    gametime = np.select(
+        [reg & (r == 0), reg & (r == 1), reg & (r == 2) & ~saturday, saturday, g["game_type"] == "SB", ~reg],
+        ["20:20", "20:15", "20:20", rng.choice(["16:30", "20:15"], n), "18:30",
+         rng.choice(["13:00", "16:30", "18:15"], n)], sunday_slot).astype(object)
+
+    df = pd.DataFrame({k: v for k, v in g.items()})
+    df["date"], df["weekday"], df["gametime"] = date, weekday, gametime
+    df = df.sort_values(["s", "week", "date", "gametime", "home"], kind="stable").reset_index(drop=True)
+    s, home, away = df["s"].to_numpy(), df["home"].to_numpy(), df["away"].to_numpy()
+    season = lg.seasons[s]
+    date = df["date"].to_numpy().astype("datetime64[D]")
+    n = len(df)
+    frac = (s + 1) / lg.S                                  # position in the history, for era-dependent nulls
+
+    # rest days: since the team's previous game that season (7 for the opener)
+    side = pd.DataFrame({"s": np.r_[s, s], "team": np.r_[home, away], "d": np.r_[date, date].astype(np.int64),
+                         "i": np.r_[np.arange(n), np.arange(n)], "home": np.r_[np.ones(n, bool), np.zeros(n, bool)]})
+    side = side.sort_values(["s", "team", "d"], kind="stable")
+    rest = side.groupby(["s", "team"])["d"].diff().fillna(7).astype(np.int64).to_numpy()
+    home_rest, away_rest = np.empty(n, np.int64), np.empty(n, np.int64)
+    h = side["home"].to_numpy()
+    home_rest[side["i"].to_numpy()[h]] = rest[h]
+    away_rest[side["i"].to_numpy()[~h]] = rest[~h]
+
+    spread = df["spread_line"].to_numpy()
+    p_home = 1 / (1 + np.exp(-spread / 5.5))
+    pf = np.maximum(p_home, 1 - p_home)
+    odds = 100 * pf / (1 - pf)
+    fav, dog = -np.round(odds / 5) * 5, np.maximum(100, np.round((odds - 15) / 5) * 5)
+    no_lines = frac <= 0.256
+    home_odds = -110 + 5 * rng.integers(-2, 3, n)
+    over_odds = -110 + 5 * rng.integers(-2, 3, n)
+    covered = np.isin(lg.roof[home], ["dome", "closed"]) | (rng.random(n) < 0.08)
+    qb_slot_h = (rng.random(n) < 0.08).astype(np.int64)
+    qb_slot_a = (rng.random(n) < 0.08).astype(np.int64)
+    ymd = pd.to_datetime(date).strftime("%Y%m%d").astype(np.int64) if n else np.array([], np.int64)
+    stadium_team = np.where(df["neutral"], rng.integers(0, lg.T, n), home)
+
+    out = pd.DataFrame({
+        "game_id": (pd.Series(season).astype(str) + "_" + df["week"].astype(str).str.zfill(2) + "_" +
+                    lg.codes[away] + "_" + lg.codes[home]),
+        "season": season.astype(np.int64), "game_type": df["game_type"], "week": df["week"].astype(np.int64),
+        "gameday": date.astype(str).astype(object), "weekday": df["weekday"], "gametime": df["gametime"],
+        "away_team": lg.codes[away], "away_score": df["away_score"].astype(float),
+        "home_team": lg.codes[home], "home_score": df["home_score"].astype(float),
+        "location": np.where(df["neutral"], "Neutral", "Home").astype(object),
+        "result": (df["home_score"] - df["away_score"]).astype(float),
+        "total": (df["home_score"] + df["away_score"]).astype(float), "overtime": df["overtime"],
+        "old_game_id": ymd * 100 + _group_rank(ymd), "gsis": 1000.0 + np.arange(n),
+        "nfl_detail_id": np.where(frac > 0.96, [f"{i:08x}-syn0-{s_:04d}" for i, s_ in enumerate(season)], None),
+        "pfr": pd.Series(ymd).astype(str) + "0" + pd.Series(lg.codes[home]).str.lower(),
+        "pff": np.where(frac > 0.36, 10000.0 + np.arange(n), np.nan),
+        "espn": 200000000 + np.arange(n, dtype=np.int64),
+        "ftn": np.where(frac > 0.8, 5000.0 + np.arange(n), np.nan),
+        "away_rest": away_rest, "home_rest": home_rest,
+        "away_moneyline": np.where(no_lines, np.nan, np.where(p_home >= 0.5, dog, fav)),
+        "home_moneyline": np.where(no_lines, np.nan, np.where(p_home >= 0.5, fav, dog)),
+        "spread_line": spread,
+        "away_spread_odds": np.where(no_lines, np.nan, -220.0 - home_odds),
+        "home_spread_odds": np.where(no_lines, np.nan, home_odds.astype(float)),
+        "total_line": df["total_line"].to_numpy(),
+        "under_odds": np.where(no_lines, np.nan, -220.0 - over_odds),
+        "over_odds": np.where(no_lines, np.nan, over_odds.astype(float)),
+        "div_game": (lg.division[home] == lg.division[away]).astype(np.int64),
+        "roof": lg.roof[stadium_team].astype(object), "surface": lg.surface[stadium_team].astype(object),
+        "temp": np.where(covered, np.nan, np.round(rng.normal(72 - 2.2 * df["week"], 12))),
+        "wind": np.where(covered, np.nan, np.round(rng.gamma(2.0, 4.2, n))),
+        "away_qb_id": lg.player_ids[lg.pid[s, away, qb_slot_a]], "home_qb_id": lg.player_ids[lg.pid[s, home, qb_slot_h]],
+        "away_qb_name": lg.player_display[lg.pid[s, away, qb_slot_a]],
+        "home_qb_name": lg.player_display[lg.pid[s, home, qb_slot_h]],
+        "away_coach": lg.coach_names[lg.coach[s, away]], "home_coach": lg.coach_names[lg.coach[s, home]],
+        "referee": lg.referees[rng.integers(0, len(lg.referees), n)],
+        "stadium_id": lg.stadium_id[stadium_team], "stadium": lg.stadium[stadium_team],
+        "_s": s, "_home": home, "_away": away, "_home_td": df["home_td"].to_numpy(), "_away_td": df["away_td"].to_numpy(),
+        "_home_qb": qb_slot_h, "_away_qb": qb_slot_a,
+    })
+    return out
+
+def schedule_table(df: pd.DataFrame) -> pa.Table:
+    return pa.Table.from_pandas(df[SCHEDULE_SCHEMA.names], schema=SCHEDULE_SCHEMA, preserve_index=False)
+
+def _split(rng, total: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Multinomial split of each row's integer total by its (unnormalized) weights; zero-weight rows get 0."""
+    w = weights.sum(axis=1, keepdims=True)
+    n = np.where(w[:, 0] > 0, total, 0)
+    p = np.where(w > 0, weights / np.where(w > 0, w, 1), 1 / weights.shape[1])
+    return rng.multinomial(n, p)
+
+def weekly(lg: League, sched: pd.DataFrame, seed: int = SEED) -> pa.Table:
+    """hist_weekly rows for the games in `sched`: starting QB, RB1-2, WR1-4 and TE1-2 of each team-game."""
+    rng = np.random.default_rng([seed, 2, int(sched["season"].iloc[0])])
+    g = sched
+    n_g = len(g)
+    s = np.r_[g["_s"], g["_s"]]
+    team, opp = np.r_[g["_home"], g["_away"]], np.r_[g["_away"], g["_home"]]
+    qb_slot = np.r_[g["_home_qb"], g["_away_qb"]]
+    tds = np.r_[g["_home_td"], g["_away_td"]]
+    pts = np.r_[g["home_score"], g["away_score"]]
+    opp_pts = np.r_[g["away_score"], g["home_score"]]
+    week, post = np.r_[g["week"], g["week"]], np.r_[g["game_type"] != "REG", g["game_type"] != "REG"]
+    n = 2 * n_g
+    slots = np.column_stack([qb_slot] + [np.full(n, k) for k in range(2, len(SLOTS))])   # (n, 9)
+    pid = lg.pid[s[:, None], team[:, None], slots]
+    skill = lg.skill[pid]
+
+    # passing game, receiver by receiver; the QB row is the sum of his receivers
+    att = np.clip(np.round(rng.normal(34 + 0.15 * (opp_pts - pts), 7)), 12, 65).astype(np.int64)
+    sacks = rng.poisson(2.3, n)
+    share = rng.gamma(RECV_ALPHA * np.exp(0.3 * skill[:, 1:]))
+    targets = _split(rng, rng.binomial(att, 0.93), share)
+    rec = rng.binomial(targets, np.clip(RECV_CATCH + 0.04 * skill[:, 1:], 0.4, 0.9))
+    rec_yds = np.where(rec > 0, np.round(rec * rng.normal(RECV_YPR, 3, (n, 8)) + rng.normal(0, 3, (n, 8)) * np.sqrt(rec)), 0)
+    air = np.where(targets > 0, np.round(targets * rng.normal(RECV_ADOT, 3, (n, 8))), 0)
+    caught_air = np.where(targets > 0, np.round(air * rec / np.maximum(targets, 1)), 0)
+    pass_td = np.where(rec.sum(axis=1) > 0, rng.binomial(tds, 0.6), 0)
+    rec_td = _split(rng, pass_td, (rec > 0) * (np.maximum(rec_yds, 0) + 1))
+    rec_fd = rng.binomial(rec, 0.55)
+    rec_fum = rng.binomial(rec, 0.008)
+
+    # running game: QB, RB1, RB2, WR1, WR2
+    carries_team = np.clip(np.round(rng.normal(26 + 0.2 * (pts - opp_pts), 5)), 8, 50).astype(np.int64)
+    carries = _split(rng, carries_team, rng.gamma(RUSH_ALPHA * np.exp(0.3 * skill[:, :5])))
+    rush_yds = np.where(carries > 0, np.round(carries * rng.normal(RUSH_YPC, 1.2, (n, 5)) +
+                                              rng.normal(0, 2, (n, 5)) * np.sqrt(carries)), 0)
+    rush_td = _split(rng, tds - pass_td, carries.astype(float))
+    rush_fum = rng.binomial(carries, 0.012)
+
+    def wide(m5=None, m8=None, qb=None):
+        """(n, 9) row layout: column 0 the QB, 1..8 the receivers; rushers are columns 0..4."""
+        out = np.zeros((n, 9))
+        if m8 is not None:
+            out[:, 1:] = m8
+        if m5 is not None:
+            out[:, :5] += m5
+        if qb is not None:
+            out[:, 0] = qb
+        return out
+
+    is_qb = np.zeros((n, 9), bool)
+    is_qb[:, 0] = True
+    two_pt = rng.random((n, 9)) < 0.012
+    recv_2pt, rush_2pt = wide(m8=two_pt[:, 1:]), wide(m5=two_pt[:, :5] & ~two_pt[:, 1:6])
+    ints, sack_yds = rng.poisson(0.85, n), np.round(sacks * np.clip(rng.normal(6.8, 1.5, n), 0, None))
+    sack_fum = rng.binomial(sacks, 0.1)
+    cols = {
+        "completions": wide(qb=rec.sum(axis=1)), "attempts": wide(qb=att), "passing_yards": wide(qb=rec_yds.sum(axis=1)),
+        "passing_tds": wide(qb=pass_td), "interceptions": wide(qb=ints), "sacks": wide(qb=sacks),
+        "sack_yards": wide(qb=sack_yds), "sack_fumbles": wide(qb=sack_fum),
+        "sack_fumbles_lost": wide(qb=rng.binomial(sack_fum, 0.5)),
+        "passing_air_yards": wide(qb=air.sum(axis=1)),
+        "passing_yards_after_catch": wide(qb=(rec_yds - caught_air).sum(axis=1)),
+        "passing_first_downs": wide(qb=rec_fd.sum(axis=1)), "passing_2pt_conversions": wide(qb=recv_2pt.sum(axis=1)),
+        "carries": wide(m5=carries), "rushing_yards": wide(m5=rush_yds), "rushing_tds": wide(m5=rush_td),
+        "rushing_fumbles": wide(m5=rush_fum), "rushing_fumbles_lost": wide(m5=rng.binomial(rush_fum, 0.5)),
+        "rushing_first_downs": wide(m5=rng.binomial(carries, 0.22)), "rushing_2pt_conversions": rush_2pt,
+        "receptions": wide(m8=rec), "targets": wide(m8=targets), "receiving_yards": wide(m8=rec_yds),
+        "receiving_tds": wide(m8=rec_td), "receiving_fumbles": wide(m8=rec_fum),
+        "receiving_fumbles_lost": wide(m8=rng.binomial(rec_fum, 0.5)), "receiving_air_yards": wide(m8=air),
+        "receiving_yards_after_catch": wide(m8=rec_yds - caught_air), "receiving_first_downs": wide(m8=rec_fd),
+        "receiving_2pt_conversions": recv_2pt,
+        "special_teams_tds": ((rng.random((n, 9)) < 0.003) & ~is_qb).astype(float),
+    }
+    c = cols
+    team_targets = c["targets"].sum(axis=1, keepdims=True)
+    team_air = c["receiving_air_yards"].sum(axis=1, keepdims=True)
+    targeted, carried = c["targets"] > 0, c["carries"] > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c["passing_epa"] = np.where(is_qb, rng.normal(0.03 * c["passing_yards"] - 6 * c["interceptions"] - 4, 6), np.nan)
+        c["pacr"] = np.where(is_qb & (c["passing_air_yards"] > 0), c["passing_yards"] / c["passing_air_yards"], np.nan)
+        c["dakota"] = np.where(is_qb & (rng.random((n, 9)) < 0.89), rng.normal(0.08, 0.08, (n, 9)), np.nan)
+        c["rushing_epa"] = np.where(carried, rng.normal(0.1 * (c["rushing_yards"] - 4.2 * c["carries"]), 2.5), np.nan)
+        c["receiving_epa"] = np.where(targeted, rng.normal(0.08 * (c["receiving_yards"] - 7 * c["targets"]) +
+                                                           2 * c["receiving_tds"], 2), np.nan)
+        c["racr"] = np.where(targeted & (c["receiving_air_yards"] != 0),
+                             c["receiving_yards"] / c["receiving_air_yards"], np.nan)
+        c["target_share"] = np.where(targeted, c["targets"] / team_targets, np.nan)
+        c["air_yards_share"] = np.where(targeted & (team_air != 0), c["receiving_air_yards"] / team_air, np.nan)
+    c["wopr"] = 1.5 * c["target_share"] + 0.7 * c["air_yards_share"]
+    lost = c["sack_fumbles_lost"] + c["rushing_fumbles_lost"] + c["receiving_fumbles_lost"]
+    c["fantasy_points"] = np.round(
+        0.04 * c["passing_yards"] + 4 * c["passing_tds"] - 2 * c["interceptions"]
+        + 0.1 * (c["rushing_yards"] + c["receiving_yards"])
+        + 6 * (c["rushing_tds"] + c["receiving_tds"] + c["special_teams_tds"])
+        + 2 * (c["passing_2pt_conversions"] + c["rushing_2pt_conversions"] + c["receiving_2pt_conversions"]) - 2 * lost, 2)
+    c["fantasy_points_ppr"] = c["fantasy_points"] + c["receptions"]
+
+    flat = pid.ravel()
+    rep = lambda a: np.repeat(a, 9)
+    positions = sorted(set(SLOT_POS))
+    pos_idx = np.searchsorted(positions, lg.player_pos[flat])
+    teams_list = list(lg.codes)
+    arrays = {
+        "player_id": _lookup(lg.player_ids, flat), "player_name": _lookup(lg.player_abbr, flat, lg.player_name_null[flat]),
+        "player_display_name": _lookup(lg.player_display, flat),
+        "position": _lookup(positions, pos_idx), "position_group": _lookup(positions, pos_idx),
+        "headshot_url": _lookup(lg.headshot, flat, lg.headshot_null[flat]),
+        "recent_team": _lookup(teams_list, rep(team)), "season": _num(rep(lg.seasons[s]), _I),
+        "week": _num(rep(week), _I), "season_type": _lookup(["REG", "POST"], rep(post.astype(int))),
+        "opponent_team": _lookup(teams_list, rep(opp)),
+    }
+    for name, typ in zip(WEEKLY_SCHEMA.names, WEEKLY_SCHEMA.types):
+        if name not in arrays:
+            v = c[name].ravel()
+            arrays[name] = _num(np.nan_to_num(v) if typ == _I else v, typ, np.isnan(v) if typ == _F else None)
+    return pa.table(arrays, schema=WEEKLY_SCHEMA)
+
+def pbp(lg: League, sched: pd.DataFrame, seed: int = SEED) -> pa.Table:
+    """Play-by-play for one season's games: drives, downs, play types and running scores that end at the final."""
+    season = int(sched["season"].iloc[0])
+    rng = np.random.default_rng([seed, 3, season])
+    n_g = len(sched)
+    n_plays = rng.integers(145, 185, n_g)
+    gi = np.repeat(np.arange(n_g), n_plays)
+    P = len(gi)
+    start = np.repeat(np.cumsum(n_plays) - n_plays, n_plays)
+    idx = np.arange(P) - start
+    n_of = n_plays[gi]
+    frac = (idx + 1) / n_of
+
+    s, home, away = sched["_s"].to_numpy()[gi], sched["_home"].to_numpy()[gi], sched["_away"].to_numpy()[gi]
+    final_h, final_a = sched["home_score"].to_numpy()[gi], sched["away_score"].to_numpy()[gi]
+    ot = sched["overtime"].to_numpy()[gi] > 0
+
+    play_type = rng.choice(["pass", "run", "punt", "field_goal", "extra_point", "kickoff", "no_play", "qb_kneel"], P,
+                           p=[0.5, 0.39, 0.03, 0.015, 0.025, 0.03, 0.005, 0.005]).astype(object)
+    play_type[idx == 0] = "kickoff"
+    is_pass, is_run = play_type == "pass", (play_type == "run") | (play_type == "qb_kneel")
+    scrimmage = is_pass | is_run
+    ends_drive = np.isin(play_type, ["punt", "field_goal", "extra_point"]) | (rng.random(P) < 0.03)
+    new_drive = (idx == 0) | np.r_[False, ends_drive[:-1]]
+    gdrive = np.cumsum(new_drive) - 1
+    drive = gdrive - gdrive[start] + 1
+    home_receives = rng.random(n_g) < 0.5                       # opening kickoff
+    home_has_ball = (drive % 2 == 1) == home_receives[gi]
+    posteam = np.where(home_has_ball, home, away)
+    defteam = np.where(home_has_ball, away, home)
+    drive_result = rng.choice(["Touchdown", "Field goal", "Punt", "Turnover", "Turnover on downs", "End of half",
+                               "Missed field goal", "Opp touchdown", "Safety"], gdrive.max() + 1 if P else 0,
+                              p=[0.22, 0.16, 0.37, 0.11, 0.05, 0.05, 0.025, 0.01, 0.005])[gdrive]
+
+    sack = is_pass & (rng.random(P) < 0.065)
+    complete = is_pass & ~sack & (rng.random(P) < 0.64)
+    interception = is_pass & ~sack & ~complete & (rng.random(P) < 0.07)
+    air = np.where(is_pass & ~sack, np.round(rng.normal(8, 9, P)), np.nan)
+    yards = np.select([sack, complete, play_type == "run", play_type == "qb_kneel"],
+                      [-np.round(np.abs(rng.normal(7, 3, P))), np.clip(np.round(air + rng.gamma(1.5, 3.5, P)), -10, 99),
+                       np.clip(np.round(rng.normal(4.3, 6, P)), -10, 90), -1], 0)
+    down = np.where(scrimmage, rng.choice([1, 2, 3, 4], P, p=[0.44, 0.33, 0.2, 0.03]), 0)
+    ydstogo = np.where(down == 1, 10, rng.integers(1, 16, P))
+    first_down = scrimmage & (yards >= ydstogo)
+    touchdown = scrimmage & ~sack & ~interception & (rng.random(P) < 0.035)
+    secs = np.round(3600 * (1 - frac)).astype(np.int64)
+    qtr = np.minimum(1 + (idx * 4) // n_of, 4)
+    ot_tail = ot & (idx >= n_of - 8)
+    qtr, secs = np.where(ot_tail, 5, qtr), np.where(ot_tail, 0, secs)
+
+    run_h, run_a = np.floor(final_h * frac), np.floor(final_a * frac)
+    pos_score, def_score = np.where(home_has_ball, run_h, run_a), np.where(home_has_ball, run_a, run_h)
+    diff_h = run_h - run_a
+    spread = sched["spread_line"].to_numpy()[gi]
+    wp_h = 1 / (1 + np.exp(-(0.12 * diff_h * (1 + 2 * frac) + 0.1 * spread * (1 - frac))))
+    last = idx == n_of - 1
+    wp_h = np.where(last, np.sign(final_h - final_a) / 2 + 0.5, wp_h)
+    wpa_h = np.r_[wp_h[1:] - wp_h[:-1], 0.0]
+    wpa_h[last] = 0.0
+    sign = np.where(home_has_ball, 1.0, -1.0)
+    epa = rng.normal(0, 1.3, P) + 2.5 * touchdown - 3 * interception
+
+    qb_slot = np.where(home_has_ball, sched["_home_qb"].to_numpy()[gi], sched["_away_qb"].to_numpy()[gi])
+    passer = lg.pid[s, posteam, qb_slot]
+    rush_slot = rng.choice([0, 2, 3], P, p=[0.1, 0.62, 0.28])   # a QB run is by the game's starter
+    rusher = np.where((play_type == "qb_kneel") | (rush_slot == 0), passer, lg.pid[s, posteam, rush_slot])
+    receiver = lg.pid[s, posteam, rng.choice(RECEIVERS, P, p=RECV_ALPHA / RECV_ALPHA.sum())]
+    targeted = is_pass & ~sack & (rng.random(P) < 0.93)
+    fg = play_type == "field_goal"
+    kick = fg | (play_type == "punt") | (play_type == "kickoff")
+
+    teams_list = list(lg.codes)
+    gid = sched["game_id"].tolist()
+    i16 = lambda v, null=None: _num(v, pa.int16(), null)
+    f32 = lambda v: _num(v, pa.float32(), np.isnan(v))
+    arrays = {
+        "game_id": _lookup(gid, gi), "play_id": _num(idx + 1, pa.int32()), "season": i16(np.full(P, season)),
+        "week": i16(sched["week"].to_numpy()[gi]),
+        "season_type": _lookup(["REG", "POST"], (sched["game_type"].to_numpy()[gi] != "REG").astype(int)),
+        "game_date": _lookup(sched["gameday"].tolist(), gi),
+        "home_team": _lookup(teams_list, home), "away_team": _lookup(teams_list, away),
+        "posteam": _lookup(teams_list, posteam), "defteam": _lookup(teams_list, defteam),
+        "qtr": i16(qtr), "down": i16(down, ~scrimmage), "ydstogo": i16(ydstogo, ~scrimmage),
+        "yardline_100": i16(rng.integers(1, 100, P)), "game_seconds_remaining": i16(secs),
+        "score_differential": i16(pos_score - def_score), "posteam_score": i16(pos_score), "defteam_score": i16(def_score),
+        "drive": i16(drive), "fixed_drive": i16(drive), "fixed_drive_result": pa.array(drive_result, pa.string()),
+        "play_type": pa.array(play_type, pa.string()), "yards_gained": i16(yards),
+        "shotgun": i16((is_pass & (rng.random(P) < 0.7)) | (is_run & (rng.random(P) < 0.3))),
+        "no_huddle": i16(scrimmage & (rng.random(P) < 0.08)),
+        "pass_attempt": i16(is_pass), "complete_pass": i16(complete), "interception": i16(interception), "sack": i16(sack),
+        "rush_attempt": i16(is_run), "touchdown": i16(touchdown), "pass_touchdown": i16(touchdown & complete),
+        "rush_touchdown": i16(touchdown & is_run), "first_down": i16(first_down),
+        "third_down_converted": i16((down == 3) & first_down), "third_down_failed": i16((down == 3) & ~first_down),
+        "fourth_down_converted": i16((down == 4) & first_down), "fourth_down_failed": i16((down == 4) & ~first_down),
+        "penalty": i16(rng.random(P) < 0.07), "fumble_lost": i16(scrimmage & (rng.random(P) < 0.006)),
+        "field_goal_result": pa.array(np.where(fg, rng.choice(["made", "missed", "blocked"], P, p=[0.84, 0.14, 0.02]), None),
+                                      pa.string()),
+        "kick_distance": i16(np.where(fg, np.minimum(rng.integers(1, 45, P) + 17, 66), np.round(rng.normal(45, 7, P))), ~kick),
+        "air_yards": f32(air), "yards_after_catch": f32(np.where(complete, yards - air, np.nan)),
+        "ep": f32(np.clip(rng.normal(1.5, 1.8, P), -4, 7)), "epa": f32(epa),
+        "wp": f32(np.where(home_has_ball, wp_h, 1 - wp_h)), "wpa": f32(wpa_h * sign),
+        "success": i16(scrimmage & (epa > 0)),
+        "passer_player_id": _lookup(lg.player_ids, passer, ~is_pass),
+        "rusher_player_id": _lookup(lg.player_ids, rusher, ~is_run),
+        "receiver_player_id": _lookup(lg.player_ids, receiver, ~targeted),
+    }
+    return pa.table(arrays, schema=PBP_SCHEMA)
+
+def generate(out_dir: Path = OUT_DIR, seasons: int = SEASONS, teams: int = TEAMS, first_season: int = FIRST_SEASON,
+             pbp_seasons: int | None = PBP_SEASONS, seed: int = SEED) -> dict[str, dict]:
+    """Write the full synthetic layout into `out_dir`; returns the manifest entries written."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t_all = time.perf_counter()
+    season_list = np.arange(first_season, first_season + seasons)
+    lg = League(season_list, teams, seed)
+    tag = f"{season_list[0]}_{season_list[-1]}"
+    manifest = {}
+
+    def done(path: Path, rows: int, cols: int, t0: float):
+        manifest[path.name] = {"rows": rows, "cols": cols, "sha256": file_digest(path)}
+        print(f"[synth] {path.name}: {rows:,} rows in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    sched = schedule(lg, seed)
+    path = out_dir / f"schedules_{tag}.parquet"
+    pq.write_table(schedule_table(sched), path)
+    done(path, len(sched), len(SCHEDULE_SCHEMA), t0)
+    lg.divisions_frame().to_csv(out_dir / "team_divisions.csv", index=False)
+
+    t0 = time.perf_counter()
+    path = out_dir / f"weekly_{tag}.parquet"
+    rows = 0
+    with pq.ParquetWriter(path, WEEKLY_SCHEMA) as writer:
+        for c0 in range(0, seasons, CHUNK_SEASONS):
+            chunk = sched[(sched["_s"] >= c0) & (sched["_s"] < c0 + CHUNK_SEASONS)]
+            table = weekly(lg, chunk, seed)
+            writer.write_table(table)
+            rows += table.num_rows
+    done(path, rows, len(WEEKLY_SCHEMA), t0)
+
+    pbp_from = 0 if pbp_seasons is None else max(0, seasons - pbp_seasons)
+    for s_idx, games in sched[sched["_s"] >= pbp_from].groupby("_s", sort=True):
+        t0 = time.perf_counter()
+        path = out_dir / f"pbp_{season_list[s_idx]}.parquet"
+        table = pbp(lg, games.reset_index(drop=True), seed)
+        pq.write_table(table, path)
+        done(path, table.num_rows, len(PBP_SCHEMA), t0)
+
+    (out_dir / "manifest.json").write_text(pd.Series(manifest).to_json(indent=2))
+    print(f"\n✅ {seasons} season(s) x {teams} teams written to {out_dir} in {time.perf_counter() - t_all:.1f}s")
+    return manifest
+
+def main():
+    generate()
+
+if __name__ == "__main__":
+    main()
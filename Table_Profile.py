@@ -0,0 +1,225 @@
+# Single-pass table profiler: null/distinct/min/max/avg/example stats for every column from one streamed
+# scan per table (HyperLogLog sketches for the distinct counts), or for parquet sources straight from the
+# row-group statistics in the file footers. Writes the profile_<table>.csv layout of the notebook's
+# per-column queries and reports drift against the previous profile, so it can run after every load.
+# Runs write to OUT_DIR (gitignored); the profile_*.csv committed in the repo root are the baseline
+# a first run is compared against.
+from __future__ import annotations
+import math
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from Db_Conn import get_engine, stream
+
+ROOT = Path(__file__).resolve().parent
+SOURCE = "postgres"        # or "parquet": footer statistics of the DATA_DIR files, no data pages decoded
+TABLES = ["hist_schedules", "hist_weekly"]
+DATA_DIR = ROOT / "data_historic"
+PARQUET_SOURCES = {"hist_schedules": "schedules_*.parquet", "hist_weekly": "weekly_*.parquet"}
+OUT_DIR = ROOT / "profiles"
+BASELINE_DIR = ROOT
+
+HLL_P = 14                 # 16,384 registers per column: ~0.8% standard error on distinct counts
+EXAMPLES = 5
+DRIFT_NULL_PP = 5.0        # null_% moves by more than this many points -> drift
+DRIFT_DISTINCT = 0.25      # distinct count moves by more than this fraction -> drift
+
+PROFILE_COLS = ["column", "type", "non_null", "nulls", "null_%", "distinct", "min", "max", "avg", "examples"]
+NUMERIC_TYPES = {"smallint", "integer", "bigint", "numeric", "real", "double precision"}
+DATE_TYPES    = {"date", "timestamp without time zone", "timestamp with time zone", "timestamp"}
+
+def _frame(rows: list[dict]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=PROFILE_COLS).astype({"non_null": "Int64", "nulls": "Int64", "distinct": "Int64"})
+
+class HLL:
+    """HyperLogLog over 64-bit hashes; registers merge with np.maximum, so sketches combine across batches."""
+
+    def __init__(self, p: int = HLL_P):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def add(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        h = pd.util.hash_array(values)
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        w = (h << np.uint64(self.p)) | np.uint64(1 << (self.p - 1))   # guard bit caps the run length
+        rho = (64 - np.floor(np.log2(w.astype(np.float64)))).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rho)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        e = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if e <= 2.5 * m and zeros:
+            e = m * math.log(m / zeros)   # linear counting for small cardinalities
+        return int(round(e))
+
+class _ColumnStats:
+    def __init__(self, name: str, dtype: str):
+        self.name, self.type = name, dtype
+        self.non_null = 0
+        self.min = self.max = None
+        self.sum = 0.0
+        self.hll = HLL()
+        self.examples: list[str] = []
+
+    def update(self, col: pa.Array):
+        values = col.drop_null()
+        self.non_null += len(values)
+        if len(values) == 0:
+            return
+        if self.type in NUMERIC_TYPES or self.type in DATE_TYPES:
+            mm = pc.min_max(values)
+            lo, hi = mm["min"].as_py(), mm["max"].as_py()
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        if self.type in NUMERIC_TYPES:
+            self.sum += pc.sum(values.cast(pa.float64())).as_py()
+        self.hll.add(values.to_numpy(zero_copy_only=False))
+        if len(self.examples) < EXAMPLES:
+            for v in pc.unique(values).to_pylist()[:EXAMPLES]:
+                s = str(v)[:60]
+                if s not in self.examples:
+                    self.examples.append(s)
+                if len(self.examples) == EXAMPLES:
+                    break
+
+    def row(self, total: int) -> dict:
+        nulls = total - self.non_null
+        avg = round(self.sum / self.non_null, 6) if self.type in NUMERIC_TYPES and self.non_null else None
+        return {
+            "column": self.name, "type": self.type,
+            "non_null": self.non_null, "nulls": nulls, "null_%": round(nulls / total * 100, 2) if total else 0.0,
+            "distinct": min(self.hll.estimate(), self.non_null),
+            "min": self.min, "max": self.max, "avg": avg,
+            "examples": ", ".join(self.examples),
+        }
+
+def profile_table(table: str, eng=None) -> tuple[int, pd.DataFrame]:
+    """Profile one warehouse table in a single streamed scan."""
+    eng = eng or get_engine()
+    with eng.connect() as con:
+        cols = con.execute(text("""
+            SELECT column_name, data_type FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = :t
+            ORDER BY ordinal_position
+        """), {"t": table}).fetchall()
+    stats = [_ColumnStats(c, t) for c, t in cols]
+    total = 0
+    for batch in stream(f"SELECT * FROM {table}", fmt="arrow", eng=eng):
+        total += batch.num_rows
+        for s, col in zip(stats, batch.columns):
+            s.update(col)
+    return total, _frame([s.row(total) for s in stats])
+
+def _pg_type(t: pa.DataType) -> str:
+    """The warehouse type a parquet column lands as (cf. Schema_Sync.pg_type)."""
+    if pa.types.is_boolean(t):
+        return "boolean"
+    if pa.types.is_integer(t):
+        return "bigint"
+    if pa.types.is_floating(t) or pa.types.is_decimal(t):
+        return "double precision"
+    if pa.types.is_timestamp(t):
+        return "timestamp"
+    if pa.types.is_date(t):
+        return "date"
+    return "text"
+
+def profile_parquet(table: str, data_dir: Path | None = None) -> tuple[int, pd.DataFrame]:
+    """
+    Profile a table's parquet files from their footers alone: row counts, null counts and numeric/date
+    min/max come from the row-group statistics. Distinct counts, averages and examples need the data
+    pages, so they are left empty. Columns missing from a file count as null for its rows.
+    """
+    data_dir = Path(data_dir or DATA_DIR)
+    files = sorted(data_dir.glob(PARQUET_SOURCES[table]))
+    if not files:
+        raise FileNotFoundError(f"no {PARQUET_SOURCES[table]} under {data_dir}")
+    total = 0
+    cols: dict[str, dict] = {}
+    for f in files:
+        pf = pq.ParquetFile(f)
+        md, schema = pf.metadata, pf.schema_arrow
+        total += md.num_rows
+        for i, field in enumerate(schema):
+            c = cols.setdefault(field.name, {"type": _pg_type(field.type), "non_null": 0, "min": None, "max": None})
+            ranged = c["type"] in NUMERIC_TYPES or c["type"] in DATE_TYPES
+            for g in range(md.num_row_groups):
+                chunk = md.row_group(g).column(i)
+                st = chunk.statistics
+                if pa.types.is_null(field.type):   # all-null columns are written without statistics
+                    continue
+                if st is None or not st.has_null_count:
+                    c["non_null"] = None
+                    continue
+                if c["non_null"] is not None:
+                    c["non_null"] += md.row_group(g).num_rows - st.null_count
+                if ranged and st.has_min_max:
+                    c["min"] = st.min if c["min"] is None else min(c["min"], st.min)
+                    c["max"] = st.max if c["max"] is None else max(c["max"], st.max)
+    rows = []
+    for name, c in cols.items():
+        nulls = None if c["non_null"] is None else total - c["non_null"]
+        rows.append({
+            "column": name, "type": c["type"], "non_null": c["non_null"], "nulls": nulls,
+            "null_%": round(nulls / total * 100, 2) if nulls is not None and total else None,
+            "distinct": None, "min": c["min"], "max": c["max"], "avg": None, "examples": "",
+        })
+    return total, _frame(rows)
+
+def drift(prev: pd.DataFrame, cur: pd.DataFrame) -> list[str]:
+    """Schema and distribution changes between two profiles of the same table."""
+    out = []
+    p, c = prev.set_index("column"), cur.set_index("column")
+    for col in c.index.difference(p.index):
+        out.append(f"new column {col} ({c.at[col, 'type']})")
+    for col in p.index.difference(c.index):
+        out.append(f"column {col} gone")
+    for col in c.index.intersection(p.index):
+        if p.at[col, "type"] != c.at[col, "type"]:
+            out.append(f"{col}: type {p.at[col, 'type']} -> {c.at[col, 'type']}")
+        a, b = p.at[col, "null_%"], c.at[col, "null_%"]
+        if pd.notna(a) and pd.notna(b) and abs(b - a) > DRIFT_NULL_PP:
+            out.append(f"{col}: null_% {a} -> {b}")
+        a, b = p.at[col, "distinct"], c.at[col, "distinct"]
+        if pd.notna(a) and pd.notna(b) and a > 0 and abs(b - a) / a > DRIFT_DISTINCT:
+            out.append(f"{col}: distinct {int(a):,} -> {int(b):,}")
+    return out
+
+def check_tables(tables=TABLES, source: str = SOURCE, eng=None, out_dir: Path = OUT_DIR,
+                 baseline_dir: Path = BASELINE_DIR) -> dict[str, list[str]]:
+    """
+    Profile each table and report drift against its last profile in `out_dir` (profile_<table>.csv, or
+    profile_<table>_parquet.csv for footer profiles) -- the committed one in `baseline_dir` if there is
+    none yet -- then write the new profile to `out_dir`. The baseline is never overwritten.
+    """
+    drifts = {}
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    for t in tables:
+        t0 = time.perf_counter()
+        total, prof = profile_parquet(t) if source == "parquet" else profile_table(t, eng)
+        name = f"profile_{t}{'_parquet' if source == 'parquet' else ''}.csv"
+        out = Path(out_dir) / name
+        prev = out if out.exists() else Path(baseline_dir) / name
+        drifts[t] = drift(pd.read_csv(prev), prof) if prev.exists() else []
+        prof.to_csv(out, index=False)
+        print(f"[profile] {t}: {total:,} rows x {len(prof)} columns in {time.perf_counter() - t0:.2f}s -> {out.parent.name}/{out.name}")
+        for d in drifts[t]:
+            print(f"[drift] {t}: {d}")
+    return drifts
+
+def main():
+    print("Profiling tables:", ", ".join(TABLES))
+    drifts = check_tables()
+    n = sum(len(d) for d in drifts.values())
+    print("✅ Profiles written" + (f" ({n} drift finding(s))" if n else ", no drift"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# Persisted weekly team rankings: single-week and season-to-date offense/defense totals and ranks per
+# (season, week, team), fed by one pass over hist_weekly and extended week by week from the stored state.
+from __future__ import annotations
+import time
+from sqlalchemy import text
+
+RANKS = "mart.team_weekly_ranks"
+
+# total -> better direction (offense: more is better; defense allowed: fewer is better)
+TOTALS = {
+    "off_pass_yards":         "DESC",
+    "off_rush_yards":         "DESC",
+    "off_points":             "DESC",
+    "def_pass_yards_allowed": "ASC",
+    "def_rush_yards_allowed": "ASC",
+    "def_points_allowed":     "ASC",
+}
+# rank column for each total, as named in mart.v_team_weekly_ranks
+RANK_COLS = {
+    "off_pass_yards": "off_pass_rank", "off_rush_yards": "off_rush_rank", "off_points": "off_points_rank",
+    "def_pass_yards_allowed": "def_pass_rank", "def_rush_yards_allowed": "def_rush_rank",
+    "def_points_allowed": "def_points_rank",
+}
+
+_COLS = ([(t, "numeric") for t in TOTALS] + [(r, "bigint") for r in RANK_COLS.values()] +
+         [(f"{t}_std", "numeric") for t in TOTALS] + [(f"{r}_std", "bigint") for r in RANK_COLS.values()])
+
+# games = 1 if the team played a REG game that week (0 on a bye or in the playoffs);
+# *_std are season-to-date sums, ranked per game played through that week
+SQL_RANKS_DDL = f"""
+CREATE SCHEMA IF NOT EXISTS mart;
+CREATE TABLE IF NOT EXISTS {RANKS} (
+  season    int  NOT NULL,
+  week      int  NOT NULL,
+  team      text NOT NULL,
+  games     int,
+  games_std int,{"".join(f"{chr(10)}  {c} {t}," for c, t in _COLS)}
+  PRIMARY KEY (season, week, team)
+);
+"""
+
+def ranks_select_sql(incremental: bool = False) -> str:
+    """
+    Every (season, completed week, team), byes and playoff weeks included so season-to-date state carries
+    through every week. Only REG games count. With `incremental` only season :s from week :w0 on is read,
+    and the season-to-date sums extend each team's stored row for the last week before :w0.
+    """
+    sf = " AND season = :s" if incremental else ""
+    f = sf + (" AND week >= :w0" if incremental else "")
+    base = f"""
+  LEFT JOIN {RANKS} b
+    ON b.season = x.season AND b.team = x.team
+   AND b.week = (SELECT MAX(week) FROM {RANKS} WHERE season = :s AND week < :w0)""" if incremental else ""
+    std = lambda t: f"SUM(x.{t}) OVER w" + (f" + COALESCE(b.{t}_std, 0)" if incremental else "")
+    return f"""
+WITH tg AS (
+  -- one scan: each team-game's offense, read below as that team's offense and as the opponent's defense
+  SELECT season::int AS season, week::int AS week, recent_team::text AS team, opponent_team::text AS opp,
+         SUM(COALESCE(passing_yards,0))::numeric AS pass_yards,
+         SUM(COALESCE(rushing_yards,0))::numeric AS rush_yards
+  FROM hist_weekly
+  WHERE season_type = 'REG'{f}
+  GROUP BY season, week, recent_team, opponent_team
+), off AS (
+  SELECT season, week, team, SUM(pass_yards) AS pass_yards, SUM(rush_yards) AS rush_yards FROM tg GROUP BY season, week, team
+), def AS (
+  SELECT season, week, opp AS team, SUM(pass_yards) AS pass_yards, SUM(rush_yards) AS rush_yards FROM tg GROUP BY season, week, opp
+), pts AS (
+  SELECT season::int AS season, week::int AS week, home_team::text AS team,
+         home_score::numeric AS points_for, away_score::numeric AS points_allowed
+  FROM hist_schedules WHERE game_type = 'REG' AND home_score IS NOT NULL{f}
+  UNION ALL
+  SELECT season::int, week::int, away_team::text, away_score::numeric, home_score::numeric
+  FROM hist_schedules WHERE game_type = 'REG' AND home_score IS NOT NULL{f}
+), slots AS (
+  -- a zero row for every team in every completed week; unioned in rather than joined so byes get a row
+  SELECT w.season, w.week, t.team, 0 AS games, {", ".join(f"0::numeric AS {t}" for t in TOTALS)}
+  FROM (SELECT DISTINCT season::int AS season, week::int AS week FROM hist_schedules
+        WHERE home_score IS NOT NULL{f}) w
+  JOIN (SELECT season::int AS season, home_team::text AS team FROM hist_schedules WHERE true{sf}
+        UNION SELECT season::int, away_team::text FROM hist_schedules WHERE true{sf}) t
+    ON t.season = w.season
+  UNION ALL
+  SELECT p.season, p.week, p.team, 1,
+         COALESCE(o.pass_yards,0), COALESCE(o.rush_yards,0), COALESCE(p.points_for,0),
+         COALESCE(d.pass_yards,0), COALESCE(d.rush_yards,0), COALESCE(p.points_allowed,0)
+  FROM pts p
+  LEFT JOIN off o ON o.season = p.season AND o.week = p.week AND o.team = p.team
+  LEFT JOIN def d ON d.season = p.season AND d.week = p.week AND d.team = p.team
+), wk AS (
+  SELECT season, week, team, SUM(games) AS games, {", ".join(f"SUM({t}) AS {t}" for t in TOTALS)}
+  FROM slots
+  GROUP BY season, week, team
+), cum AS (
+  SELECT x.*,
+         {std("games")} AS games_std,
+         {(","+chr(10)+"         ").join(f"{std(t)} AS {t}_std" for t in TOTALS)}
+  FROM wk x{base}
+  WINDOW w AS (PARTITION BY x.season, x.team ORDER BY x.week ROWS UNBOUNDED PRECEDING)
+)
+SELECT season, week, team, games, games_std,
+  {", ".join(TOTALS)},
+  {(","+chr(10)+"  ").join(
+      f"CASE WHEN games > 0 THEN DENSE_RANK() OVER (PARTITION BY season, week, games > 0 ORDER BY {t} {d}) END AS {RANK_COLS[t]}"
+      for t, d in TOTALS.items())},
+  {", ".join(f"{t}_std" for t in TOTALS)},
+  {(","+chr(10)+"  ").join(
+      f"CASE WHEN games_std > 0 THEN DENSE_RANK() OVER (PARTITION BY season, week, games_std > 0 "
+      f"ORDER BY {t}_std / NULLIF(games_std, 0) {d}) END AS {RANK_COLS[t]}_std"
+      for t, d in TOTALS.items())}
+FROM cum
+"""
+
+def ranks_build_sql() -> str:
+    return f"DELETE FROM {RANKS};\nINSERT INTO {RANKS}\n{ranks_select_sql()};"
+
+def rebuild_weekly_ranks(con):
+    t0 = time.perf_counter()
+    con.execute(text(SQL_RANKS_DDL))
+    con.execute(text(ranks_build_sql()))
+    con.execute(text(f"ANALYZE {RANKS}"))
+    print(f"[ranks] {RANKS} rebuilt in {time.perf_counter()-t0:.2f}s")
+
+def refresh_weekly_ranks(con, season: int, weeks):
+    """Rewrite `season` from its first changed week on, reading only those weeks (a new week costs one week)."""
+    t0 = time.perf_counter()
+    w0 = min(int(w) for w in weeks)
+    con.execute(text(SQL_RANKS_DDL))
+    con.execute(text(f"""
+        DELETE FROM {RANKS} WHERE season = :s AND week >= :w0;
+        INSERT INTO {RANKS}
+        {ranks_select_sql(incremental=True)};
+    """), {"s": int(season), "w0": w0})
+    print(f"[ranks] {RANKS}: {season} from W{w0} refreshed in {time.perf_counter()-t0:.2f}s")
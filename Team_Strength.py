@@ -0,0 +1,80 @@
+# Persisted opponent strength: cumulative (as-of-week) and final win% per (season, week, team),
+# computed straight from hist_schedules so the team-game marts no longer re-aggregate themselves.
+from __future__ import annotations
+import time
+from sqlalchemy import text
+
+STRENGTH = "mart.team_season_strength"
+
+SQL_STRENGTH_DDL = f"""
+CREATE SCHEMA IF NOT EXISTS mart;
+CREATE TABLE IF NOT EXISTS {STRENGTH} (
+  season        int  NOT NULL,
+  week          int  NOT NULL,
+  team          text NOT NULL,
+  games_asof    int,
+  wins_asof     int,
+  losses_asof   int,
+  ties_asof     int,
+  win_pct_asof  numeric,   -- record through this week, inclusive
+  win_pct_final numeric,   -- record over every completed game of the season
+  PRIMARY KEY (season, week, team)
+);
+"""
+
+def strength_select_sql(season_filter: bool = False) -> str:
+    """One row per (season, week, team) the team played; same win_pts rules as mart.v_team_games."""
+    where = "home_score IS NOT NULL AND away_score IS NOT NULL" + (" AND season = ANY(:s)" if season_filter else "")
+    return f"""
+WITH games AS (
+  SELECT season::int AS season, week::int AS week, home_team AS team,
+         CASE WHEN home_score = away_score THEN 0.5 WHEN home_score > away_score THEN 1.0 ELSE 0.0 END AS win_pts
+  FROM hist_schedules WHERE {where}
+  UNION ALL
+  SELECT season::int, week::int, away_team,
+         CASE WHEN home_score = away_score THEN 0.5 WHEN away_score > home_score THEN 1.0 ELSE 0.0 END
+  FROM hist_schedules WHERE {where}
+), wk AS (
+  SELECT season, week, team,
+         COUNT(*) AS games,
+         SUM(CASE WHEN win_pts=1   THEN 1 ELSE 0 END) AS wins,
+         SUM(CASE WHEN win_pts=0   THEN 1 ELSE 0 END) AS losses,
+         SUM(CASE WHEN win_pts=0.5 THEN 1 ELSE 0 END) AS ties,
+         SUM(win_pts) AS win_pts
+  FROM games
+  GROUP BY season, week, team
+)
+SELECT season, week, team,
+       SUM(games)  OVER w AS games_asof,
+       SUM(wins)   OVER w AS wins_asof,
+       SUM(losses) OVER w AS losses_asof,
+       SUM(ties)   OVER w AS ties_asof,
+       SUM(win_pts) OVER w / SUM(games) OVER w AS win_pct_asof,
+       SUM(win_pts) OVER s / SUM(games) OVER s AS win_pct_final
+FROM wk
+WINDOW w AS (PARTITION BY season, team ORDER BY week), s AS (PARTITION BY season, team)
+"""
+
+def strength_build_sql() -> str:
+    return f"DELETE FROM {STRENGTH};\nINSERT INTO {STRENGTH}\n{strength_select_sql()};"
+
+def rebuild_strength(con):
+    t0 = time.perf_counter()
+    con.execute(text(SQL_STRENGTH_DDL))
+    con.execute(text(strength_build_sql()))
+    con.execute(text(f"ANALYZE {STRENGTH}"))
+    print(f"[strength] {STRENGTH} rebuilt in {time.perf_counter()-t0:.2f}s")
+
+def refresh_strength(con, seasons):
+    """
+    Recompute the given seasons only. A new week changes every row's final win% for that season,
+    so season is the grain; other seasons are untouched.
+    """
+    t0 = time.perf_counter()
+    con.execute(text(SQL_STRENGTH_DDL))
+    con.execute(text(f"""
+        DELETE FROM {STRENGTH} WHERE season = ANY(:s);
+        INSERT INTO {STRENGTH}
+        {strength_select_sql(season_filter=True)};
+    """), {"s": list(seasons)})
+    print(f"[strength] {STRENGTH}: seasons {list(seasons)} refreshed in {time.perf_counter()-t0:.2f}s")
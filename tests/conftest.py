@@ -0,0 +1,96 @@
+# The modules are flat scripts in the repo root; make them importable from the tests
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WAREHOUSE_SEASONS = 3   # Synth_Data seasons 2000-2002 in the scratch warehouse
+
+@pytest.fixture(scope="session")
+def scratch_warehouse(tmp_path_factory):
+    """
+    A throwaway database on the configured Postgres server (Db_Conn settings), loaded from a small Synth_Data
+    set by Load_Historical and with every mart built by the CreateSQLView scripts; dropped afterwards.
+    The scripts' module-level engines point at it for the whole session. Skips without a server or CREATEDB.
+    """
+    from sqlalchemy import create_engine, text
+    import Db_Conn
+    import Load_Historical
+    import Mart_Offline
+    import Mart_Refresh
+    import Synth_Data
+    from Bulk_Write import table_columns
+
+    name = f"nfl_test_{os.getpid()}"
+    try:
+        admin = Db_Conn.get_engine().execution_options(isolation_level="AUTOCOMMIT")
+        with admin.connect() as con:
+            con.execute(text(f"CREATE DATABASE {name}"))
+    except Exception as e:   # no server, bad credentials, no CREATEDB right, ...
+        pytest.skip(f"no scratch database on the Postgres server: {type(e).__name__}")
+    eng = create_engine(admin.url.set(database=name))
+    try:
+        data_dir = tmp_path_factory.mktemp("warehouse")
+        Synth_Data.generate(data_dir, seasons=WAREHOUSE_SEASONS, pbp_seasons=0)
+        with pytest.MonkeyPatch.context() as mp:
+            scripts = {k: Mart_Offline._load_script(f"CreateSQLView-{k}")
+                       for k in ("TeamStats", "QBnCoachStats", "Positions", "TeamRankings")}
+            for mod in [Load_Historical, Mart_Refresh, *scripts.values()]:
+                mp.setattr(mod, "engine", eng)
+
+            def cols_present():
+                with eng.connect() as con:
+                    return set(table_columns(con, "hist_weekly"))
+            mp.setattr(scripts["Positions"], "cols_present", cols_present)
+
+            for table in Load_Historical.MART_SOURCES:
+                Load_Historical.load_parquet(table, Load_Historical.source_file(table, data_dir))
+            scripts["TeamStats"].run_build("view")
+            scripts["QBnCoachStats"].build_qb_views()
+            scripts["QBnCoachStats"].refresh_coach_mapping_from_schedules()
+            scripts["QBnCoachStats"].build_coach_views()
+            scripts["Positions"].main()
+            scripts["TeamRankings"].main()
+            with eng.connect() as con:
+                seasons = [r[0] for r in con.execute(text("SELECT DISTINCT season FROM hist_schedules ORDER BY 1"))]
+            yield SimpleNamespace(engine=eng, data_dir=data_dir, scripts=scripts, seasons=seasons)
+    finally:
+        eng.dispose()
+        with admin.connect() as con:
+            con.execute(text(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)"))
+
+@pytest.fixture
+def wh(scratch_warehouse):
+    """A connection to the scratch warehouse inside a transaction that is rolled back afterwards."""
+    with scratch_warehouse.engine.connect() as con:
+        trans = con.begin()
+        try:
+            yield con
+        finally:
+            trans.rollback()
+
+def table_digest(con, table: str) -> tuple[str, int]:
+    """(md5 over every row in a canonical order, row count): equal digests mean equal table contents."""
+    from sqlalchemy import text
+    return tuple(con.execute(text(f"SELECT md5(string_agg(x::text, '|' ORDER BY x::text)), COUNT(*) FROM {table} x")).one())
+
+def withhold_weeks(con, season: int, first_week: int):
+    """Move `season`'s hist_schedules/hist_weekly rows from `first_week` on aside, as if not played yet."""
+    from sqlalchemy import text
+    for t in ("hist_schedules", "hist_weekly"):
+        con.execute(text(f"CREATE TEMP TABLE _held_{t} AS SELECT * FROM {t} WHERE season = :s AND week >= :w"),
+                    {"s": season, "w": first_week})
+        con.execute(text(f"DELETE FROM {t} WHERE season = :s AND week >= :w"), {"s": season, "w": first_week})
+
+def restore_weeks(con) -> list[int]:
+    """Put the withheld weeks back (the in-season load landing); returns them."""
+    from sqlalchemy import text
+    weeks = [r[0] for r in con.execute(text("SELECT DISTINCT week::int FROM _held_hist_weekly ORDER BY 1"))]
+    for t in ("hist_schedules", "hist_weekly"):
+        con.execute(text(f"INSERT INTO {t} SELECT * FROM _held_{t}"))
+        con.execute(text(f"DROP TABLE _held_{t}"))
+    return weeks
@@ -0,0 +1,28 @@
+# Def_Rank.refresh_def_rank against a full rebuild on the scratch warehouse: new weeks landing in the
+# current season, and an edit to an early week that shifts every later as-of rank in that season.
+from sqlalchemy import text
+from conftest import restore_weeks, table_digest, withhold_weeks
+from Def_Rank import DEF_RANK, rebuild_def_rank, refresh_def_rank
+
+def _rebuilt(con) -> tuple[str, int]:
+    rebuild_def_rank(con)
+    return table_digest(con, DEF_RANK)
+
+def test_new_weeks_match_rebuild(scratch_warehouse, wh):
+    season = scratch_warehouse.seasons[-1]
+    withhold_weeks(wh, season, 10)
+    before = _rebuilt(wh)
+    refresh_def_rank(wh, season, restore_weeks(wh))
+    got = table_digest(wh, DEF_RANK)
+    assert got != before
+    assert got == _rebuilt(wh)
+
+def test_edited_early_week_matches_rebuild(scratch_warehouse, wh):
+    first = scratch_warehouse.seasons[0]
+    before = _rebuilt(wh)
+    wh.execute(text("UPDATE hist_weekly SET rushing_yards = rushing_yards + 40 WHERE season = :s AND week = 3"),
+               {"s": first})
+    refresh_def_rank(wh, first, [3])
+    got = table_digest(wh, DEF_RANK)
+    assert got != before
+    assert got == _rebuilt(wh)
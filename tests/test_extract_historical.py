@@ -0,0 +1,115 @@
+# Extract_Historical resume/checksum/retry behaviour, offline: LocalSource serves a small Synth_Data mirror.
+import pandas as pd
+import pytest
+import Extract_Historical as eh
+import Synth_Data
+
+SEASONS = [2001]   # the mirror has 2000-2001, with play-by-play for 2001 only
+
+@pytest.fixture(scope="module")
+def mirror(tmp_path_factory):
+    out = tmp_path_factory.mktemp("mirror")
+    Synth_Data.generate(out, seasons=2, pbp_seasons=1)
+    return out
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(eh, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(eh, "MANIFEST", tmp_path / "manifest.json")
+    monkeypatch.setattr(eh.time, "sleep", lambda s: None)
+    return tmp_path
+
+class CountingSource(eh.LocalSource):
+    """LocalSource that records each fetch and can fail the first `fail` calls of one kind."""
+    calls: list = []
+
+    def __init__(self, root, fail_kind=None, fail=0):
+        super().__init__(root)
+        self.fail_kind, self.fail = fail_kind, fail
+
+    def _fetch(self, kind, seasons, fn):
+        CountingSource.calls.append(kind)
+        if kind == self.fail_kind and CountingSource.calls.count(kind) <= self.fail:
+            raise ConnectionError(f"{kind} dropped")
+        return fn(seasons)
+
+    def import_schedules(self, seasons):
+        return self._fetch("schedules", seasons, super().import_schedules)
+
+    def import_weekly_data(self, seasons):
+        return self._fetch("weekly", seasons, super().import_weekly_data)
+
+    def import_pbp_data(self, seasons):
+        return self._fetch("pbp", seasons, super().import_pbp_data)
+
+@pytest.fixture
+def source(monkeypatch):
+    """Patch get_source; the returned dict is the failure mode (fail_kind, fail). Serial runs stay in-process."""
+    CountingSource.calls = []
+    mode = {}
+    monkeypatch.setattr(eh, "get_source", lambda source_dir=None: CountingSource(source_dir, **mode))
+    return mode
+
+def test_first_run_extracts_and_records_every_file(mirror, data_dir, source):
+    eh.main(SEASONS, workers=1, source_dir=mirror)
+    manifest = eh.load_manifest()
+    assert sorted(manifest) == sorted(name for name, _, _ in eh.extraction_tasks(SEASONS))
+    for name, entry in manifest.items():
+        assert entry["sha256"] == eh.file_digest(data_dir / name)
+        assert len(pd.read_parquet(data_dir / name)) == entry["rows"]
+    assert not list(data_dir.glob("*.part"))
+
+def test_resume_skips_files_complete_in_manifest(mirror, data_dir, source, capsys):
+    eh.main(SEASONS, workers=1, source_dir=mirror)
+    mtimes = {f.name: f.stat().st_mtime_ns for f in data_dir.glob("*.parquet")}
+    CountingSource.calls = []
+    eh.main(SEASONS, workers=1, source_dir=mirror)
+    assert CountingSource.calls == []
+    assert "0 file(s) to extract, 3 already complete" in capsys.readouterr().out
+    assert {f.name: f.stat().st_mtime_ns for f in data_dir.glob("*.parquet")} == mtimes
+
+def test_checksum_mismatch_forces_refetch(mirror, data_dir, source):
+    eh.main(SEASONS, workers=1, source_dir=mirror)
+    weekly = data_dir / "weekly_2001_2001.parquet"
+    good = eh.load_manifest()[weekly.name]
+    df = pd.read_parquet(weekly)
+    df.loc[0, "player_name"] = "Tampered"        # same row count, different bytes
+    df.to_parquet(weekly, index=False)
+    assert not eh.is_complete(weekly, eh.load_manifest())
+
+    CountingSource.calls = []
+    eh.main(SEASONS, workers=1, source_dir=mirror)
+    assert CountingSource.calls == ["weekly"]
+    assert eh.load_manifest()[weekly.name] == good
+    assert eh.file_digest(weekly) == good["sha256"]
+
+def test_retry_recovers_from_transient_failure(mirror, data_dir, source, capsys):
+    source.update(fail_kind="weekly", fail=eh.RETRIES)
+    eh.main(SEASONS, workers=1, source_dir=mirror)
+    out = capsys.readouterr().out
+    assert CountingSource.calls.count("weekly") == eh.RETRIES + 1
+    assert "weekly_2001_2001.parquet: " in out and f"(attempts={eh.RETRIES + 1})" in out
+    assert "weekly_2001_2001.parquet" in eh.load_manifest()
+
+def test_exhausted_retries_fail_without_a_manifest_entry(mirror, data_dir, source, capsys):
+    source.update(fail_kind="pbp", fail=eh.RETRIES + 1)
+    with pytest.raises(SystemExit):
+        eh.main(SEASONS, workers=1, source_dir=mirror)
+    assert "[failed] pbp_2001.parquet: ConnectionError" in capsys.readouterr().out
+    manifest = eh.load_manifest()
+    assert "pbp_2001.parquet" not in manifest and len(manifest) == 2
+    assert not (data_dir / "pbp_2001.parquet").exists() and not list(data_dir.glob("*.part"))
+
+    source.clear()                                # the next run picks up only the failed file
+    CountingSource.calls = []
+    eh.main(SEASONS, workers=1, source_dir=mirror)
+    assert CountingSource.calls == ["pbp"]
+
+def test_parallel_run_matches_serial(mirror, data_dir, tmp_path_factory, monkeypatch):
+    eh.main(SEASONS, workers=1, source_dir=mirror)
+    serial = eh.load_manifest()
+    par = tmp_path_factory.mktemp("parallel")
+    monkeypatch.setattr(eh, "DATA_DIR", par)
+    monkeypatch.setattr(eh, "MANIFEST", par / "manifest.json")
+    eh.main(SEASONS, workers=2, source_dir=mirror)
+    assert {n: e["rows"] for n, e in eh.load_manifest().items()} == {n: e["rows"] for n, e in serial.items()}
@@ -0,0 +1,67 @@
+# Week skipping for ETL_InSzn: content hashes (offline), and the manifest + staged merge against the
+# scratch warehouse -- an unchanged week is skipped, a changed one is re-merged and nothing else is rewritten.
+import pandas as pd
+import polars as pl
+from sqlalchemy import text
+from Bulk_Write import stage_df, merge_staged
+from Load_Manifest import changed_weeks, record_hashes, stored_hashes, week_hashes
+from Partitions import PARTITIONED
+
+def _frame() -> pl.DataFrame:
+    return pl.DataFrame({"week": [1, 1, 2, 2, 3], "player_id": ["a", "b", "a", "b", "a"],
+                         "yards": [10.0, None, 30.0, 40.0, 50.0]})
+
+def test_week_hashes_ignore_row_order():
+    df = _frame()
+    assert week_hashes(df) == week_hashes(df.reverse())
+    assert changed_weeks(week_hashes(df), week_hashes(df.sample(fraction=1.0, shuffle=True, seed=1))) == []
+
+def test_week_hashes_flag_only_changed_weeks():
+    df = _frame()
+    edited = df.with_columns(pl.when(pl.col("week") == 2).then(pl.col("yards") + 1).otherwise(pl.col("yards")))
+    added = pl.concat([df, pl.DataFrame({"week": [3], "player_id": ["b"], "yards": [1.0]})])
+    assert changed_weeks(week_hashes(edited), week_hashes(df)) == [2]
+    assert changed_weeks(week_hashes(added), week_hashes(df)) == [3]
+    assert changed_weeks(week_hashes(df), {}) == [1, 2, 3]
+
+def _season(con, season: int) -> pl.DataFrame:
+    pdf = pd.read_sql(text("SELECT * FROM hist_weekly WHERE season = :s"), con, params={"s": season})
+    return pl.from_pandas(pdf)
+
+def _written_this_txn(con, season: int) -> dict[int, int]:
+    """{week: rows} of `season` inserted or updated by the current transaction."""
+    return dict(con.execute(text("""
+        SELECT week::int, COUNT(*) FROM hist_weekly
+        WHERE season = :s AND xmin::text::bigint = txid_current() % 4294967296
+        GROUP BY 1
+    """), {"s": season}).fetchall())
+
+def test_unchanged_week_skipped_and_changed_week_remerged(scratch_warehouse, wh):
+    season, week = scratch_warehouse.seasons[-1], 5
+    df = _season(wh, season)
+    record_hashes(wh, "hist_weekly", season, week_hashes(df))
+    assert changed_weeks(week_hashes(df), stored_hashes(wh, "hist_weekly", season)) == []
+
+    edited = df.with_columns(
+        pl.when(pl.col("week") == week).then(pl.col("rushing_yards") + 5).otherwise(pl.col("rushing_yards"))
+        .alias("rushing_yards"))
+    new = week_hashes(edited)
+    changed = changed_weeks(new, stored_hashes(wh, "hist_weekly", season))
+    assert changed == [week]
+
+    frame = edited.filter(pl.col("week").is_in(changed))
+    stage = stage_df(scratch_warehouse.engine, "hist_weekly", frame)
+    counts = merge_staged(wh, "hist_weekly", stage, PARTITIONED["hist_weekly"]["pk"], frame.columns,
+                          scope="t.season = :s AND t.week = ANY(:w)", params={"s": season, "w": changed})
+    record_hashes(wh, "hist_weekly", season, {w: new[w] for w in changed})
+    assert counts == {"inserted": 0, "updated": len(frame), "deleted": 0, "duplicates": 0}
+    assert _written_this_txn(wh, season) == {week: len(frame)}
+    assert changed_weeks(week_hashes(_season(wh, season)), stored_hashes(wh, "hist_weekly", season)) == []
+
+def test_manifest_forgets_weeks_rewritten_behind_its_back(scratch_warehouse, wh):
+    season = scratch_warehouse.seasons[-1]
+    df = _season(wh, season)
+    record_hashes(wh, "hist_weekly", season, week_hashes(df))
+    wh.execute(text("DELETE FROM hist_weekly WHERE season = :s AND week = 7 AND player_id IN "
+                    "(SELECT player_id FROM hist_weekly WHERE season = :s AND week = 7 LIMIT 3)"), {"s": season})
+    assert changed_weeks(week_hashes(df), stored_hashes(wh, "hist_weekly", season)) == [7]
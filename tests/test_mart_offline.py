@@ -0,0 +1,69 @@
+# Mart_Offline against a small Synth_Data fixture (offline, ~1s), and parity with the Postgres marts
+# when a warehouse is reachable: NFL_PARITY_DATA_DIR names the parquet it was loaded from
+# (default Mart_Offline.DATA_DIR).
+import os
+from pathlib import Path
+import pandas as pd
+import pytest
+import Mart_Offline
+import Synth_Data
+
+SEASONS = 3
+
+@pytest.fixture(scope="module")
+def synth_dir(tmp_path_factory) -> Path:
+    out = tmp_path_factory.mktemp("synth")
+    Synth_Data.generate(out, seasons=SEASONS, pbp_seasons=0)
+    return out
+
+@pytest.fixture(scope="module")
+def duck(synth_dir):
+    con = Mart_Offline.build(synth_dir)
+    yield con
+    con.close()
+
+def test_every_mart_view_builds_and_has_rows(duck):
+    views = Mart_Offline.mart_views(duck)
+    assert len(views) >= 30
+    empty = [v for v in views if duck.execute(f"SELECT COUNT(*) FROM mart.{v}").fetchone()[0] == 0]
+    assert empty == []
+
+def test_team_splits_count_every_game_twice(duck, synth_dir):
+    sched = pd.read_parquet(next(synth_dir.glob("schedules_*.parquet")))
+    games = duck.execute("SELECT SUM(games) FROM mart.v_team_season_splits").fetchone()[0]
+    assert games == 2 * len(sched)
+    w, l, t = duck.execute("SELECT SUM(wins), SUM(losses), SUM(ties) FROM mart.v_team_season_splits").fetchone()
+    assert w == l and w + l + t == games
+
+def test_player_games_cover_weekly_rows(duck, synth_dir):
+    weekly = pd.read_parquet(next(synth_dir.glob("weekly_*.parquet")), columns=["player_id", "season", "week"])
+    n = duck.execute("SELECT COUNT(*) FROM mart.v_player_games").fetchone()[0]
+    assert n == len(weekly.drop_duplicates())
+
+def test_write_parquet_matches_views(duck, tmp_path):
+    counts = Mart_Offline.write_parquet(duck, tmp_path)
+    for v, n in counts.items():
+        assert len(pd.read_parquet(tmp_path / f"{v}.parquet")) == n
+
+@pytest.fixture(scope="module")
+def warehouse():
+    from sqlalchemy import text
+    from Db_Conn import get_engine
+    try:
+        eng = get_engine()
+        with eng.connect() as con:
+            if not con.execute(text("SELECT to_regclass('mart.v_team_season_splits')")).scalar():
+                pytest.skip("warehouse has no mart views")
+    except Exception as e:   # no server, bad credentials, ...
+        pytest.skip(f"Postgres unreachable: {type(e).__name__}")
+    return eng
+
+def test_parity_with_postgres(warehouse):
+    data_dir = Path(os.environ.get("NFL_PARITY_DATA_DIR", Mart_Offline.DATA_DIR))
+    if not all(any(data_dir.glob(p)) for p in Mart_Offline.SOURCES.values()):
+        pytest.skip(f"no schedules/weekly parquet under {data_dir}")
+    con = Mart_Offline.build(data_dir)
+    try:
+        assert Mart_Offline.parity_check(con, warehouse) == {}
+    finally:
+        con.close()
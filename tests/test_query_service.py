@@ -0,0 +1,36 @@
+# QueryService cache invalidation on the scratch warehouse: every CreateSQLView rebuild bumps the data
+# version inside its transaction, so the next request misses the cache instead of serving pre-rebuild rows.
+import json
+import pytest
+from Load_Manifest import data_version
+from Query_Service import PostgresBackend, QueryService
+
+REBUILDS = {
+    "TeamStats":     lambda m: m.run_build("view"),
+    "QBnCoachStats": lambda m: (m.build_qb_views(), m.refresh_coach_mapping_from_schedules(), m.build_coach_views()),
+    "TeamRankings":  lambda m: m.main(),
+    "Positions":     lambda m: m.main(),
+}
+
+@pytest.fixture
+def service(scratch_warehouse):
+    return QueryService(PostgresBackend(scratch_warehouse.engine))
+
+def _version(eng) -> int:
+    with eng.connect() as con:
+        return data_version(con)
+
+@pytest.mark.parametrize("script", sorted(REBUILDS))
+def test_rebuild_bumps_version_and_misses_cache(scratch_warehouse, service, script):
+    params = {"season": scratch_warehouse.seasons[-1]}
+    body, hit = service.query("team_season_splits", params)
+    assert not hit
+    assert service.query("team_season_splits", params) == (body, True)
+
+    before = _version(scratch_warehouse.engine)
+    REBUILDS[script](scratch_warehouse.scripts[script])
+    assert _version(scratch_warehouse.engine) > before
+
+    body2, hit = service.query("team_season_splits", params)
+    assert not hit
+    assert json.loads(body2)["version"] > json.loads(body)["version"]
@@ -0,0 +1,30 @@
+# Rolling_Features.refresh_features against a full rebuild on the scratch warehouse: new weeks landing in
+# the current season, and a backfilled edit to an early season whose career sums roll into later ones.
+from sqlalchemy import text
+from conftest import restore_weeks, table_digest, withhold_weeks
+from Rolling_Features import FEATURES, rebuild_features, refresh_features
+
+def _rebuilt(con) -> tuple[str, int]:
+    rebuild_features(con)
+    return table_digest(con, FEATURES)
+
+def test_new_weeks_match_rebuild(scratch_warehouse, wh):
+    season = scratch_warehouse.seasons[-1]
+    withhold_weeks(wh, season, 10)
+    before = _rebuilt(wh)
+    weeks = restore_weeks(wh)
+    assert weeks and weeks[0] == 10
+    assert refresh_features(wh, season, weeks) == [season]
+    got = table_digest(wh, FEATURES)
+    assert got != before
+    assert got == _rebuilt(wh)
+
+def test_backfilled_early_week_matches_rebuild(scratch_warehouse, wh):
+    first = scratch_warehouse.seasons[0]
+    before = _rebuilt(wh)
+    wh.execute(text("UPDATE hist_weekly SET rushing_yards = rushing_yards + 7 WHERE season = :s AND week = 3"),
+               {"s": first})
+    assert refresh_features(wh, first, [3]) == scratch_warehouse.seasons
+    got = table_digest(wh, FEATURES)
+    assert got != before
+    assert got == _rebuilt(wh)
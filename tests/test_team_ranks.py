@@ -0,0 +1,28 @@
+# Team_Ranks.refresh_weekly_ranks against a full rebuild on the scratch warehouse: new weeks landing in
+# the current season (carried on from the stored cumulative row), and an edit to an early week.
+from sqlalchemy import text
+from conftest import restore_weeks, table_digest, withhold_weeks
+from Team_Ranks import RANKS, rebuild_weekly_ranks, refresh_weekly_ranks
+
+def _rebuilt(con) -> tuple[str, int]:
+    rebuild_weekly_ranks(con)
+    return table_digest(con, RANKS)
+
+def test_new_weeks_match_rebuild(scratch_warehouse, wh):
+    season = scratch_warehouse.seasons[-1]
+    withhold_weeks(wh, season, 10)
+    before = _rebuilt(wh)
+    refresh_weekly_ranks(wh, season, restore_weeks(wh))
+    got = table_digest(wh, RANKS)
+    assert got != before
+    assert got == _rebuilt(wh)
+
+def test_edited_early_week_matches_rebuild(scratch_warehouse, wh):
+    first = scratch_warehouse.seasons[0]
+    before = _rebuilt(wh)
+    wh.execute(text("UPDATE hist_weekly SET rushing_yards = rushing_yards + 40 WHERE season = :s AND week = 3"),
+               {"s": first})
+    refresh_weekly_ranks(wh, first, [3])
+    got = table_digest(wh, RANKS)
+    assert got != before
+    assert got == _rebuilt(wh)